@@ -1,23 +1,109 @@
 # app/api.py
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import Optional
+import asyncio
+import functools
+import os
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, List, Optional
+
+from por_core.config import PoRConfig
 
 from por_core.simulator import ResonanceSimulator
-from por_core.metrics import stability_score, coherence
+
+from app import binary
+from app.cache import ResultCache, cache_key
+from app.jobs import JobManager
+from app.pool import PoolSaturated, SimulationPool
+from app.scheduler import CostScheduler, OverBudget, estimate_cost
+from app.streaming import StreamRegistry, StreamRun
+from app.tasks import record, run_ensemble, run_simulation
+from app.telemetry import RateWindow, Registry, instrument, resident_memory_bytes
 
 try:
     from por_multimodal.resonance_mm import MultimodalResonance
 except ImportError:
     MultimodalResonance = None
 
-app = FastAPI(title="PoR Suite API", version="0.1.0")
+# Requests with steps * chain_length at or below this run on a thread in the
+# API process: shipping them to a worker costs more than computing them, and
+# it keeps small dashboard calls fast while big runs occupy the pool.
+INLINE_COST = int(os.environ.get("POR_INLINE_COST", 50_000))
+
+# Upper bound on items per /simulate/batch and /multimodal/batch call, and
+# on chains per ensemble job: larger groups are split so they spread across
+# pool workers.
+BATCH_MAX_ITEMS = int(os.environ.get("POR_BATCH_MAX_ITEMS", 1000))
+ENSEMBLE_MAX_CHAINS = int(os.environ.get("POR_ENSEMBLE_MAX_CHAINS", 256))
+
+# Size of each block of a streamed trajectory; one block is computed while
+# the previous one is being sent.
+TRAJECTORY_BLOCK_BYTES = int(os.environ.get("POR_TRAJECTORY_BLOCK_BYTES", 4 << 20))
+
+# Cache-Control max-age for seeded (deterministic) results.
+CACHE_MAX_AGE = int(os.environ.get("POR_CACHE_MAX_AGE", 86400))
+
+pool = SimulationPool.from_env()
+streams = StreamRegistry()
+cache = ResultCache.from_env()
+scheduler = CostScheduler.from_env()
+# Opened in lifespan, so importing the app does not create the job store.
+jobs: Optional[JobManager] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global jobs
+    pool.start()
+    # Jobs are long by definition: always run them in the bulk lane.
+    jobs = JobManager.from_env(functools.partial(dispatch, lane="bulk"))
+    jobs.start()
+    yield
+    await jobs.stop()
+    jobs = None
+    pool.shutdown()
+
+
+app = FastAPI(title="PoR Suite API", version="0.1.0", lifespan=lifespan)
+registry = instrument(app, Registry())
+
+# One resonator per process: it holds the shared CLIP encoder and embedding cache.
+_mm = None
+
+
+def get_multimodal():
+    global _mm
+    if _mm is None:
+        _mm = MultimodalResonance()
+    return _mm
+
+
+_defaults = PoRConfig()
 
 
 class SimulateRequest(BaseModel):
     steps: int = 200
     chain_length: int = 64
     seed: Optional[int] = None
+    noise_level: float = _defaults.noise_level
+    phase_strength: float = _defaults.phase_strength
+
+    def config(self) -> PoRConfig:
+        return PoRConfig(
+            chain_length=self.chain_length,
+            noise_level=self.noise_level,
+            phase_strength=self.phase_strength,
+        )
+
+    def cache_key(self) -> Optional[str]:
+        """Key for the result cache; None for unseeded (non-deterministic) runs."""
+        if self.seed is None:
+            return None
+        return cache_key({"kind": "simulate", **self.model_dump()})
 
 
 class SimulateResponse(BaseModel):
@@ -25,15 +111,395 @@ class SimulateResponse(BaseModel):
     coherence: float
 
 
+# A site-step is one chain element advanced one step, i.e. one unit of
+# estimate_cost: a 64-site chain run for 200 steps is 12,800 site-steps.
+sim_site_steps = registry.counter(
+    "por_sim_site_steps_total", "Simulated site-steps completed.", labels=("lane", "where")
+)
+sim_seconds = registry.counter(
+    "por_sim_seconds_total", "Wall time of simulation calls, pool queueing included.", labels=("lane", "where")
+)
+sim_rate = RateWindow(60.0)
+registry.gauge("por_sim_site_steps_per_second", "Site-steps/s over the last minute.", fn=sim_rate.rate)
+registry.gauge(
+    "por_pool_in_flight", "Pool jobs running, by lane.", labels=("lane",),
+    fn=lambda: {(name,): lane.in_flight for name, lane in pool.lanes.items()},
+)
+registry.gauge(
+    "por_pool_queue_depth", "Pool jobs waiting for a slot, by lane.", labels=("lane",),
+    fn=lambda: {(name,): lane.queued for name, lane in pool.lanes.items()},
+)
+registry.gauge(
+    "por_pool_workers_resident_memory_bytes", "Total resident set size of the pool workers.",
+    fn=lambda: sum(resident_memory_bytes(pid) or 0 for pid in pool.worker_pids()),
+)
+registry.counter(
+    "por_cache_lookups_total", "Result cache lookups by outcome.", labels=("result",),
+    fn=lambda: {(name,): getattr(cache, name) for name in ("hits", "disk_hits", "coalesced", "misses")},
+)
+registry.gauge("por_cache_hit_ratio", "Share of cache lookups served without computing.",
+               fn=lambda: cache.stats()["hit_rate"])
+registry.gauge("por_cache_entries", "Entries in the in-memory result cache.", fn=lambda: cache.stats()["size"])
+registry.counter(
+    "por_scheduler_admitted_total", "Requests admitted, by lane.", labels=("lane",),
+    fn=lambda: {(lane,): n for lane, n in scheduler.admitted.items()},
+)
+registry.counter("por_scheduler_deferred_total", "Requests deferred for budget.", fn=lambda: scheduler.deferred)
+registry.counter("por_scheduler_rejected_total", "Requests rejected for budget.", fn=lambda: scheduler.rejected)
+registry.gauge("por_streams_active", "Open simulation streams.", fn=lambda: len(streams.runs))
+registry.gauge(
+    "por_jobs", "Persisted jobs, by status.", labels=("status",),
+    fn=lambda: {(status,): n for status, n in jobs.store.counts().items()} if jobs else {},
+)
+
+
+async def dispatch(cost: int, fn, *args, lane: str = "interactive"):
+    """Run `fn(*args)` inline on a thread if it is cheap, else on the pool lane."""
+    where = "inline" if cost <= INLINE_COST else "pool"
+    started = time.perf_counter()
+    if where == "inline":
+        result = await run_in_threadpool(fn, *args)
+    else:
+        result = await pool.submit(fn, *args, lane=lane)
+    sim_seconds.inc(time.perf_counter() - started, lane=lane, where=where)
+    sim_site_steps.inc(cost, lane=lane, where=where)
+    sim_rate.add(cost)
+    return result
+
+
+def client_id(request: Request) -> str:
+    """Budget key: an explicit X-Client-Id, else the peer address."""
+    return request.headers.get("x-client-id") or (request.client.host if request.client else "anonymous")
+
+
+def over_budget(e: OverBudget) -> HTTPException:
+    headers = {"Retry-After": str(int(e.retry_after))} if e.retry_after is not None else None
+    return HTTPException(status_code=429, detail=str(e), headers=headers)
+
+
 @app.post("/simulate", response_model=SimulateResponse)
-def simulate(req: SimulateRequest):
-    sim = ResonanceSimulator(chain_length=req.chain_length, seed=req.seed)
-    sim.run_iterations(req.steps)
+async def simulate(req: SimulateRequest, request: Request, response: Response):
+    cost = estimate_cost(req.steps, req.chain_length)
+
+    key = req.cache_key()
+    if key is not None:
+        etag = f'"{key}"'
+        cache_headers = {"ETag": etag, "Cache-Control": f"public, max-age={CACHE_MAX_AGE}"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers=cache_headers)
+
+    try:
+        # Cached results are free; everything else is charged up front.
+        lane = scheduler.lane_for(cost)
+        if key is None or key not in cache:
+            lane = await scheduler.admit(client_id(request), cost)
+
+        def compute():
+            return dispatch(cost, run_simulation, req.steps, req.config(), req.seed, lane=lane)
+
+        if key is None:
+            result = await compute()
+            response.headers["Cache-Control"] = "no-store"
+        else:
+            result, status = await cache.get_or_compute(key, compute)
+            response.headers.update(cache_headers)
+            response.headers["X-Cache"] = status.upper()
+    except OverBudget as e:
+        raise over_budget(e)
+    except PoolSaturated:
+        raise HTTPException(status_code=503, detail="Simulation queue is full.", headers={"Retry-After": "1"})
+    except (asyncio.TimeoutError, TimeoutError):
+        raise HTTPException(status_code=504, detail=f"Simulation exceeded {pool.timeout:.0f}s timeout.")
+
+    return SimulateResponse(**result)
+
+
+class BatchSimulateRequest(BaseModel):
+    # Items are validated one by one so a bad item fails alone.
+    items: List[Dict[str, Any]]
+
+
+class BatchItemResult(BaseModel):
+    index: int
+    result: Optional[SimulateResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSimulateResponse(BaseModel):
+    results: List[BatchItemResult]
+
+
+@app.post("/simulate/batch", response_model=BatchSimulateResponse)
+async def simulate_batch(req: BatchSimulateRequest, request: Request):
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch.")
+
+    results = [BatchItemResult(index=i) for i in range(len(req.items))]
+
+    # Serve seeded items from the cache; group the rest by shape and
+    # config so each group runs as one vectorised ensemble.
+    groups: Dict[tuple, List[tuple]] = {}
+    for i, raw in enumerate(req.items):
+        try:
+            item = SimulateRequest.model_validate(raw)
+        except ValidationError as e:
+            results[i].error = f"invalid request: {e.errors()[0]['msg']}"
+            continue
+        if item.steps < 1 or item.chain_length < 3:
+            results[i].error = "invalid request: steps must be >= 1, chain_length >= 3"
+            continue
+        key = item.cache_key()
+        cached = cache.get(key) if key is not None else None
+        if cached is not None:
+            results[i].result = SimulateResponse(**cached)
+            continue
+        shape = (item.steps, item.chain_length, item.noise_level, item.phase_strength)
+        groups.setdefault(shape, []).append((i, item.seed, key))
+
+    work = []
+    for (steps, chain_length, noise_level, phase_strength), members in groups.items():
+        config = PoRConfig(chain_length=chain_length, noise_level=noise_level, phase_strength=phase_strength)
+        for start in range(0, len(members), ENSEMBLE_MAX_CHAINS):
+            work.append((steps, config, members[start:start + ENSEMBLE_MAX_CHAINS]))
+
+    # The whole batch is admitted (and laned) by its total cost.
+    total = sum(estimate_cost(steps, config.chain_length, len(members)) for steps, config, members in work)
+    try:
+        lane = await scheduler.admit(client_id(request), total) if work else "interactive"
+    except OverBudget as e:
+        raise over_budget(e)
+
+    # Don't let one batch flood the shared queue: run at most as many
+    # groups at once as the pool has slots.
+    slots = asyncio.Semaphore(pool.max_in_flight)
+
+    async def run_job(steps, config, members):
+        async with slots:
+            try:
+                seeds = [seed for _, seed, _ in members]
+                cost = estimate_cost(steps, config.chain_length, len(seeds))
+                outputs = await dispatch(cost, run_ensemble, steps, config, seeds, lane=lane)
+            except PoolSaturated:
+                error = "simulation queue is full"
+            except (asyncio.TimeoutError, TimeoutError):
+                error = f"simulation exceeded {pool.timeout:.0f}s timeout"
+            except Exception as e:
+                error = str(e) or type(e).__name__
+            else:
+                for (i, _, key), out in zip(members, outputs):
+                    results[i].result = SimulateResponse(**out)
+                    if key is not None:
+                        cache.put(key, out)
+                return
+            for i, _, _ in members:
+                results[i].error = error
+
+    await asyncio.gather(*(run_job(*job) for job in work))
+    return BatchSimulateResponse(results=results)
+
 
-    stab = stability_score(sim.chain)
-    coh = coherence(sim.chain)
+@app.get("/simulate/stream")
+async def simulate_stream(
+    request: Request,
+    steps: int = 200,
+    chain_length: int = 64,
+    seed: Optional[int] = None,
+    noise_level: float = _defaults.noise_level,
+    phase_strength: float = _defaults.phase_strength,
+    every: int = 10,
+    snapshot: int = 0,
+):
+    """
+    Stream stability/coherence every `every` steps as Server-Sent Events.
+    `snapshot` > 0 adds the chain downsampled to that many points. The run
+    stops when the client disconnects or DELETEs /simulate/stream/{run_id}.
+    """
+    try:
+        lane = await scheduler.admit(client_id(request), estimate_cost(steps, chain_length))
+    except OverBudget as e:
+        raise over_budget(e)
 
-    return SimulateResponse(stability=stab, coherence=coh)
+    config = PoRConfig(chain_length=chain_length, noise_level=noise_level, phase_strength=phase_strength)
+    run = StreamRun(steps, config, seed, every, snapshot)
+    streams.add(run)
+    run.start(functools.partial(dispatch, lane=lane))
+
+    async def body():
+        try:
+            async for event in run.events():
+                yield event
+        finally:
+            streams.discard(run)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.delete("/simulate/stream/{run_id}")
+async def cancel_stream(run_id: str):
+    # async: cancelling the run's task must happen on the event loop thread.
+    if not streams.cancel(run_id):
+        raise HTTPException(status_code=404, detail="Unknown or finished stream.")
+    return {"run_id": run_id, "cancelled": True}
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    steps: int
+    steps_done: int
+    progress: float
+    error: Optional[str] = None
+    created_at: float
+    updated_at: float
+
+
+class JobSubmitted(BaseModel):
+    id: str
+    status: str
+    deduplicated: bool
+
+
+@app.post("/jobs", response_model=JobSubmitted, status_code=202)
+async def submit_job(req: SimulateRequest, request: Request, response: Response):
+    """Queue a long simulation; identical seeded requests share one job."""
+    # async: JobManager.submit touches the asyncio queue, and must run on the
+    # event loop. Only new jobs are charged; a deduplicated one costs nothing.
+    client, cost = client_id(request), estimate_cost(req.steps, req.chain_length)
+    try:
+        job_id, deduplicated = jobs.submit(req.model_dump(), req.cache_key(),
+                                           admit=lambda: scheduler.admit_job(client, cost))
+    except OverBudget as e:
+        raise over_budget(e)
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return JobSubmitted(id=job_id, status=jobs.status(job_id)["status"], deduplicated=deduplicated)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+def job_status(job_id: str):
+    status = jobs.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    return JobStatus(**status)
+
+
+@app.get("/jobs/{job_id}/result", response_model=SimulateResponse)
+def job_result(job_id: str):
+    status = jobs.status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    if status["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {status['status']}.")
+    return SimulateResponse(**jobs.result(job_id))
+
+
+@app.delete("/jobs/{job_id}", response_model=JobStatus)
+async def cancel_job(job_id: str):
+    if jobs.status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    jobs.cancel(job_id)
+    return JobStatus(**jobs.status(job_id))
+
+
+class TrajectoryRequest(SimulateRequest):
+    every: int = 1
+
+
+async def _recorded_blocks(req: TrajectoryRequest, lane: str):
+    """Yield the recorded trajectory block by block, computing one block ahead."""
+    sim = ResonanceSimulator(seed=req.seed, config=req.config())
+    rows = max(1, TRAJECTORY_BLOCK_BYTES // (8 * req.chain_length))
+    chunk = rows * req.every
+
+    def submit(sim, steps):
+        cost = estimate_cost(steps, req.chain_length)
+        return asyncio.ensure_future(dispatch(cost, record, sim, steps, req.every, lane=lane))
+
+    pos = min(chunk, req.steps)
+    pending = submit(sim, pos)
+    try:
+        while pending is not None:
+            sim, frames = await pending
+            if pos < req.steps:
+                step = min(chunk, req.steps - pos)
+                pending = submit(sim, step)
+                pos += step
+            else:
+                pending = None
+            yield frames
+    finally:
+        if pending is not None:
+            pending.cancel()
+
+
+async def _array_response(request: Request, req: TrajectoryRequest, shape, blocks):
+    media_type = binary.negotiate(request.headers.get("accept"))
+    if media_type is None:
+        raise HTTPException(
+            status_code=406,
+            detail=f"Supported: {binary.JSON}, {binary.NPY}" + (f", {binary.ARROW}" if binary.pa else ""),
+        )
+
+    if media_type == binary.NPY:
+        body = binary.encode_npy(shape, blocks)
+    elif media_type == binary.ARROW:
+        body = binary.encode_arrow(shape, blocks, every=req.every)
+    else:
+        body = binary.encode_json(shape, blocks)
+    return StreamingResponse(body, media_type=media_type, headers={"X-Array-Shape": ",".join(map(str, shape))})
+
+
+async def _admit_trajectory(request: Request, req: TrajectoryRequest) -> str:
+    if req.steps < 1 or req.every < 1 or req.chain_length < 3:
+        raise HTTPException(status_code=422, detail="steps and every must be >= 1, chain_length >= 3.")
+    try:
+        return await scheduler.admit(client_id(request), estimate_cost(req.steps, req.chain_length))
+    except OverBudget as e:
+        raise over_budget(e)
+
+
+@app.post("/simulate/trajectory")
+async def simulate_trajectory(req: TrajectoryRequest, request: Request):
+    """
+    The chain recorded every `every` steps, shape (steps // every, chain_length).
+    Served as JSON, .npy (Accept: application/x-npy) or Arrow IPC
+    (Accept: application/vnd.apache.arrow.stream), streamed block by block.
+    """
+    lane = await _admit_trajectory(request, req)
+    shape = (req.steps // req.every, req.chain_length)
+    return await _array_response(request, req, shape, _recorded_blocks(req, lane))
+
+
+@app.post("/simulate/chain")
+async def simulate_chain(req: SimulateRequest, request: Request):
+    """The final chain, shape (chain_length,), with the same content negotiation."""
+    traj = TrajectoryRequest(**req.model_dump(), every=req.steps)
+    lane = await _admit_trajectory(request, traj)
+
+    async def final_chain():
+        async for frames in _recorded_blocks(traj, lane):
+            if len(frames):
+                yield frames[-1]
+
+    return await _array_response(request, traj, (req.chain_length,), final_chain())
+
+
+@app.get("/simulate/pool")
+def simulate_pool():
+    return pool.stats()
+
+
+@app.get("/simulate/scheduler")
+def simulate_scheduler():
+    return scheduler.stats()
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    return cache.stats()
 
 
 class MultimodalRequest(BaseModel):
@@ -41,13 +507,35 @@ class MultimodalRequest(BaseModel):
     text: str
 
 
+class MultimodalBatchRequest(BaseModel):
+    items: List[MultimodalRequest]
+
+
 @app.post("/multimodal")
 def multimodal(req: MultimodalRequest):
     if MultimodalResonance is None:
         return {"error": "Multimodal module not available on server."}
 
-    mm = MultimodalResonance()
-    result = mm.compare(image_path=req.image_path, text=req.text)
+    try:
+        mm = get_multimodal()
+        result = mm.compare(image_path=req.image_path, text=req.text)
+    except ImportError as e:
+        return {"error": f"Multimodal backend not installed: {e}"}
+    return result
+
+
+@app.post("/multimodal/batch")
+def multimodal_batch(req: MultimodalBatchRequest):
+    if MultimodalResonance is None:
+        return {"error": "Multimodal module not available on server."}
+    if len(req.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {BATCH_MAX_ITEMS} items per batch.")
+
+    try:
+        mm = get_multimodal()
+        result = mm.compare_batch([(item.image_path, item.text) for item in req.items])
+    except ImportError as e:
+        return {"error": f"Multimodal backend not installed: {e}"}
     return result
 
 
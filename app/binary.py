@@ -0,0 +1,136 @@
+# app/binary.py
+"""
+Binary encodings for chains and trajectories.
+
+Arrays are produced block by block and each encoder turns a stream of
+blocks into a stream of bytes, so a large trajectory never has to exist in
+memory (or as JSON floats) all at once.
+"""
+import json
+import struct
+from typing import AsyncIterator, Optional, Sequence
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+NPY = "application/x-npy"
+ARROW = "application/vnd.apache.arrow.stream"
+JSON = "application/json"
+
+_ALIASES = {
+    NPY: NPY,
+    "application/octet-stream": NPY,
+    ARROW: ARROW,
+    JSON: JSON,
+    "*/*": JSON,
+    "application/*": JSON,
+}
+
+
+def negotiate(accept: Optional[str]) -> Optional[str]:
+    """
+    Pick a media type from an Accept header, honouring q-values.
+    Returns None when nothing acceptable is available (-> 406).
+    """
+    if not accept:
+        return JSON
+
+    offers = []
+    for position, part in enumerate(accept.split(",")):
+        media, *params = [p.strip() for p in part.split(";")]
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        offers.append((-q, position, media.lower()))
+
+    for neg_q, _, media in sorted(offers):
+        if neg_q == 0:
+            break
+        chosen = _ALIASES.get(media)
+        if chosen == ARROW and pa is None:
+            continue
+        if chosen is not None:
+            return chosen
+    return None
+
+
+def npy_header(shape: Sequence[int], dtype="<f8") -> bytes:
+    """NPY v1.0 header for a C-ordered array, padded to 64 bytes as np.load expects."""
+    descr = np.lib.format.dtype_to_descr(np.dtype(dtype))
+    text = repr({"descr": descr, "fortran_order": False, "shape": tuple(shape)})
+    pad = (64 - (10 + len(text) + 1) % 64) % 64
+    text = text + " " * pad + "\n"
+    return b"\x93NUMPY\x01\x00" + struct.pack("<H", len(text)) + text.encode("latin1")
+
+
+async def encode_npy(shape: Sequence[int], blocks: AsyncIterator[np.ndarray]) -> AsyncIterator[bytes]:
+    """Stream an array of known `shape` as .npy: the header, then raw little-endian rows."""
+    yield npy_header(shape)
+    async for block in blocks:
+        yield np.ascontiguousarray(block, dtype="<f8").tobytes()
+
+
+async def encode_json(shape: Sequence[int], blocks: AsyncIterator[np.ndarray]) -> AsyncIterator[bytes]:
+    """Stream `{"shape": ..., "data": [...]}` row by row."""
+    yield f'{{"shape": {json.dumps(list(shape))}, "data": ['.encode()
+    first = True
+    async for block in blocks:
+        for row in np.atleast_2d(block) if len(shape) > 1 else block:
+            item = json.dumps(row.tolist() if isinstance(row, np.ndarray) else float(row))
+            yield (item if first else "," + item).encode()
+            first = False
+    yield b"]}"
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back in pieces."""
+
+    closed = False
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+async def encode_arrow(shape: Sequence[int], blocks: AsyncIterator[np.ndarray], every: int = 1) -> AsyncIterator[bytes]:
+    """
+    Stream Arrow IPC record batches with columns `step` (int64) and
+    `chain` (fixed_size_list<float64>), one record batch per block.
+    """
+    width = shape[-1]
+    schema = pa.schema([("step", pa.int64()), ("chain", pa.list_(pa.float64(), width))])
+    sink = _ChunkSink()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    row = 0
+    async for block in blocks:
+        block = np.atleast_2d(np.ascontiguousarray(block, dtype="<f8"))
+        steps = (np.arange(row, row + len(block)) + 1) * every
+        chain = pa.FixedSizeListArray.from_arrays(pa.array(block.reshape(-1)), width)
+        writer.write_batch(pa.record_batch([pa.array(steps), chain], schema=schema))
+        row += len(block)
+        yield sink.take()
+    writer.close()
+    yield sink.take()
@@ -0,0 +1,150 @@
+# app/cache.py
+import asyncio
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+# Bump when a change to por_core alters simulation results, so stale
+# entries (and client ETags) stop matching.
+ENGINE_VERSION = 1
+
+
+def cache_key(payload: dict) -> str:
+    """Stable hash of a JSON-serialisable request payload."""
+    canonical = json.dumps({"engine": ENGINE_VERSION, **payload}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache for deterministic (seeded) simulation results.
+
+      - size-bounded in-memory LRU
+      - optional on-disk store behind it (one JSON file per key), which
+        survives restarts and is shared by all server processes
+      - concurrent requests for the same key are coalesced: one computes,
+        the others await its result
+    """
+
+    def __init__(self, maxsize: int = 1024, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> "ResultCache":
+        """Configure from POR_CACHE_SIZE and POR_CACHE_DIR (disk store off if unset)."""
+        return cls(
+            maxsize=int(os.environ.get("POR_CACHE_SIZE", 1024)),
+            directory=os.environ.get("POR_CACHE_DIR") or None,
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _remember(self, key: str, value: dict):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def __contains__(self, key: str) -> bool:
+        """Membership test that doesn't touch the hit/miss counters."""
+        if key in self._items:
+            return True
+        return self.directory is not None and self._path(key).exists()
+
+    def pending(self, key: str) -> bool:
+        """True while a get_or_compute for `key` is computing; callers would coalesce onto it."""
+        return key in self._pending
+
+    def get(self, key: str) -> Optional[dict]:
+        """Look up memory, then disk (promoting disk hits into memory)."""
+        value = self._lookup(key)
+        if value is None:
+            self.misses += 1
+        return value
+
+    def _lookup(self, key: str) -> Optional[dict]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+        if self.directory is not None:
+            try:
+                value = json.loads(self._path(key).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                self.disk_hits += 1
+                return value
+
+        return None
+
+    def put(self, key: str, value: dict):
+        self._remember(key, value)
+        if self.directory is not None:
+            path = self._path(key)
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(value), encoding="utf-8")
+            os.replace(tmp, path)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[dict]]) -> Tuple[dict, str]:
+        """
+        Return (value, status) where status is "hit", "coalesced" or "miss".
+        The computation runs as its own task, so a requester that goes away
+        doesn't cancel it for the others. Errors propagate to every waiter
+        and are not cached.
+        """
+        value = self._lookup(key)
+        if value is not None:
+            return value, "hit"
+
+        task = self._pending.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task), "coalesced"
+
+        self.misses += 1
+        task = asyncio.ensure_future(self._compute(key, compute))
+        # Retrieve the exception even if every waiter has gone away.
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._pending[key] = task
+        return await asyncio.shield(task), "miss"
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[dict]]) -> dict:
+        try:
+            value = await compute()
+            self.put(key, value)
+            return value
+        finally:
+            self._pending.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.disk_hits + self.misses + self.coalesced
+        served = self.hits + self.disk_hits + self.coalesced
+        return {
+            "size": len(self._items),
+            "maxsize": self.maxsize,
+            "disk": str(self.directory) if self.directory else None,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": served / lookups if lookups else 0.0,
+        }
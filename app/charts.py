@@ -0,0 +1,116 @@
+# app/charts.py
+"""
+Server-side PoR charts.
+
+Charts are drawn with Matplotlib's object-oriented API on the Agg canvas
+(no pyplot global state), inside pool worker processes. One simulation is
+recorded per request and every chart kind is drawn from it, so a page
+asking for all of them pays for the simulation once.
+"""
+import io
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from por_core.config import PoRConfig
+from por_core.metrics import coherence_scores, stability_scores
+from por_core.simulator import ResonanceSimulator
+from app.tasks import check_deadline, record
+
+# Upper bound on recorded snapshots per chart; longer runs are sampled.
+CHART_ROWS = 400
+
+KINDS = ("stabilization", "coherence", "locking", "metrics")
+
+
+def sampled_history(steps: int, config: PoRConfig, seed: Optional[int], deadline: Optional[float] = None):
+    """Record a run at most CHART_ROWS times; returns (step numbers, history)."""
+    every = max(1, steps // CHART_ROWS)
+    sim = ResonanceSimulator(seed=seed, config=config)
+    _, history = record(sim, steps, every, deadline)
+    return (np.arange(len(history)) + 1) * every, history
+
+
+def draw_stabilization(fig, steps: np.ndarray, history: np.ndarray):
+    ax = fig.add_subplot(111)
+    ax.plot(steps, stability_scores(history), linewidth=2)
+    ax.set_title("Stability Over Iterations", fontsize=14)
+    ax.set_xlabel("Iteration")
+    ax.set_ylabel("Stability Score")
+    ax.grid(True)
+
+
+def draw_coherence(fig, steps: np.ndarray, history: np.ndarray):
+    ax = fig.add_subplot(111)
+    image = ax.imshow(
+        coherence_scores(history).reshape(1, -1),
+        aspect="auto",
+        cmap="viridis",
+        extent=(steps[0], steps[-1], 0, 1) if len(steps) else None,
+    )
+    fig.colorbar(image, ax=ax, label="Coherence")
+    ax.set_title("Coherence Heatmap", fontsize=14)
+    ax.set_xlabel("Iteration")
+    ax.set_yticks([])
+
+
+def draw_locking(fig, steps: np.ndarray, history: np.ndarray):
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401 (registers the 3d projection)
+
+    ax = fig.add_subplot(111, projection="3d")
+    X, Y = np.meshgrid(np.arange(history.shape[1]), steps)
+    ax.plot_surface(X, Y, history, cmap="plasma", linewidth=0, antialiased=True)
+    ax.set_title("Resonance Locking Trajectory", fontsize=14)
+    ax.set_xlabel("Chain Position")
+    ax.set_ylabel("Iteration")
+    ax.set_zlabel("Value")
+
+
+def draw_metrics(fig, steps: np.ndarray, history: np.ndarray):
+    ax = fig.add_subplot(111)
+    ax.plot(steps, stability_scores(history), label="Stability", linewidth=2)
+    ax.plot(steps, coherence_scores(history), label="Coherence", linewidth=2)
+    ax.set_title("PoR Metrics Over Time", fontsize=14)
+    ax.set_xlabel("Iteration")
+    ax.set_ylabel("Metric Value")
+    ax.legend()
+    ax.grid(True)
+
+
+DRAW = {
+    "stabilization": (draw_stabilization, (8, 4)),
+    "coherence": (draw_coherence, (8, 4)),
+    "locking": (draw_locking, (7, 5)),
+    "metrics": (draw_metrics, (8, 4)),
+}
+
+
+def render_figure(kind: str, steps: np.ndarray, history: np.ndarray, dpi: int = 100, fmt: str = "png") -> bytes:
+    """Draw one chart kind to image bytes on a private Agg canvas."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    draw, figsize = DRAW[kind]
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    draw(fig, steps, history)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi)
+    return buf.getvalue()
+
+
+def render_charts(
+    kinds: Sequence[str],
+    steps: int,
+    config: PoRConfig,
+    seed: Optional[int],
+    dpi: int = 100,
+    deadline: Optional[float] = None,
+) -> Dict[str, bytes]:
+    """Pool task: simulate once and render each requested chart as PNG."""
+    step_numbers, history = sampled_history(steps, config, seed, deadline)
+    images = {}
+    for kind in kinds:
+        check_deadline(deadline)
+        images[kind] = render_figure(kind, step_numbers, history, dpi)
+    return images
@@ -1,14 +1,10 @@
 # app/cli.py
 import typer
-from typing import Optional
+from typing import List, Optional
 
-from por_core.simulator import ResonanceSimulator
-from por_core.metrics import stability_score, coherence
-
-try:
-    from por_multimodal.resonance_mm import MultimodalResonance
-except ImportError:
-    MultimodalResonance = None
+# Heavy dependencies (NumPy via por_core, CLIP/torch via por_multimodal)
+# are imported inside the commands that use them, so `--help` and the
+# other commands start fast. benchmarks/runners/startup_time.py enforces it.
 
 app = typer.Typer(help="PoR Suite CLI — run resonance simulations and benchmarks.")
 
@@ -20,6 +16,9 @@ def simulate(
     seed: Optional[int] = typer.Option(None, help="Random seed for reproducibility."),
 ):
     """Run a basic resonance simulation using por_core.ResonanceSimulator."""
+    from por_core.simulator import ResonanceSimulator
+    from por_core.metrics import stability_score, coherence
+
     typer.echo(f"Running PoR simulation: steps={steps}, chain_length={chain_length}, seed={seed}")
 
     sim = ResonanceSimulator(chain_length=chain_length, seed=seed)
@@ -38,38 +37,45 @@ def multimodal(
     text: str = typer.Argument(..., help="Text description to compare with image."),
 ):
     """Run a multimodal resonance check (image + text)."""
-    if MultimodalResonance is None:
+    try:
+        from por_multimodal.resonance_mm import MultimodalResonance
+    except ImportError:
         typer.echo("Multimodal module not available. Check por_multimodal imports.")
         raise typer.Exit(code=1)
 
     typer.echo("Running multimodal resonance...")
-    mm = MultimodalResonance()
-    result = mm.compare(image_path=image_path, text=text)
+    try:
+        result = MultimodalResonance().compare(image_path=image_path, text=text)
+    except ImportError as e:
+        typer.echo(f"Multimodal backend not installed: {e}")
+        raise typer.Exit(code=1)
 
     score = result.get("score")
     typer.echo(f"Resonance score: {score:.4f}" if score is not None else f"Result: {result}")
 
+    timings = result.get("timings_ms")
+    if timings:
+        typer.echo(
+            f"Timings: embed_image={timings['embed_image']:.1f}ms "
+            f"embed_text={timings['embed_text']:.1f}ms "
+            f"resonance={timings['resonance']:.2f}ms"
+        )
+
 
 @app.command()
 def benchmark(
-    config: str = typer.Option("benchmarks/configs/reasoning_v1.yaml", help="Path to PoR benchmark config."),
+    config: Optional[List[str]] = typer.Option(
+        None, help="Track config; repeat for several (default: reasoning, memory and creative)."
+    ),
+    out_dir: str = typer.Option("benchmark_results", help="Directory for per-track results and summary.json."),
+    workers: Optional[int] = typer.Option(None, help="Tasks in flight at once, across all tracks."),
 ):
-    """Thin wrapper over benchmark runners."""
-    import subprocess
-    import sys
-
-    cmd = [
-        sys.executable,
-        "benchmarks/runners/run_solo.py",
-        "--config",
-        config,
-        "--model",
-        "gpt-4.1",
-        "--out",
-        "solo_results.json",
-    ]
-    typer.echo(f"Running benchmark:\n{' '.join(cmd)}")
-    subprocess.run(cmd, check=False)
+    """Run solo and resonance for each track concurrently on the dummy models, then score PoR-Gain."""
+    from benchmarks.runners.suite import DEFAULT_CONFIGS, format_summary, run_suite
+
+    summary = run_suite(config or DEFAULT_CONFIGS, out_dir, workers)
+    typer.echo(format_summary(summary))
+    typer.echo(f"Saved benchmark summary → {out_dir}/summary.json")
 
 
 def main():
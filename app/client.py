@@ -0,0 +1,93 @@
+# app/client.py
+"""
+Client helpers for the PoR Suite API's array endpoints
+(/simulate/trajectory and /simulate/chain).
+
+Decoders return NumPy views over the response body rather than copies.
+"""
+import ast
+import json
+import struct
+import urllib.request
+from typing import Optional, Tuple
+
+import numpy as np
+
+NPY = "application/x-npy"
+ARROW = "application/vnd.apache.arrow.stream"
+
+
+def decode_npy(buf) -> np.ndarray:
+    """
+    Decode a .npy payload as a read-only view over `buf` (bytes, bytearray
+    or memoryview) without copying the data.
+    """
+    view = memoryview(buf)
+    if bytes(view[:6]) != b"\x93NUMPY":
+        raise ValueError("not an .npy payload")
+    if view[6] == 1:
+        (header_len,) = struct.unpack("<H", view[8:10])
+        offset = 10
+    else:
+        (header_len,) = struct.unpack("<I", view[8:12])
+        offset = 12
+    header = ast.literal_eval(bytes(view[offset:offset + header_len]).decode("latin1"))
+    if header["fortran_order"]:
+        raise ValueError("Fortran-ordered arrays are not supported")
+
+    shape = tuple(header["shape"])
+    count = int(np.prod(shape)) if shape else 1
+    data = np.frombuffer(view, dtype=header["descr"], count=count, offset=offset + header_len)
+    return data.reshape(shape)
+
+
+def decode_arrow(buf) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Decode an Arrow IPC stream into (steps, chains) arrays.
+    A single record batch is returned as zero-copy views; several batches
+    are concatenated (one copy). Requires pyarrow.
+    """
+    import pyarrow as pa
+
+    reader = pa.ipc.open_stream(pa.py_buffer(buf))
+    width = reader.schema.field("chain").type.list_size
+    steps, chains = [], []
+    for batch in reader:
+        steps.append(batch.column("step").to_numpy(zero_copy_only=True))
+        values = batch.column("chain").flatten().to_numpy(zero_copy_only=True)
+        chains.append(values.reshape(-1, width))
+
+    if len(chains) == 1:
+        return steps[0], chains[0]
+    if not chains:
+        return np.empty(0, dtype=np.int64), np.empty((0, width))
+    return np.concatenate(steps), np.concatenate(chains)
+
+
+def fetch(
+    base_url: str,
+    endpoint: str = "/simulate/trajectory",
+    fmt: str = "npy",
+    timeout: Optional[float] = None,
+    **request,
+):
+    """
+    POST a simulation request and decode the array response.
+    `fmt` is "npy" (returns an array), "arrow" (returns (steps, chains))
+    or "json" (returns an array, decoded the slow way).
+    """
+    accept = {"npy": NPY, "arrow": ARROW, "json": "application/json"}[fmt]
+    req = urllib.request.Request(
+        base_url.rstrip("/") + endpoint,
+        data=json.dumps(request).encode("utf-8"),
+        headers={"Content-Type": "application/json", "Accept": accept},
+        method="POST",
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        body = resp.read()
+
+    if fmt == "npy":
+        return decode_npy(body)
+    if fmt == "arrow":
+        return decode_arrow(body)
+    return np.asarray(json.loads(body)["data"])
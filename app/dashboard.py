@@ -1,48 +1,228 @@
 # app/dashboard.py
-from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Form, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from pydantic import BaseModel
+
+from por_core.config import PoRConfig
+
+from app.cache import ResultCache, cache_key
+from app.charts import KINDS, render_charts
+from app.pool import PoolSaturated, SimulationPool
+from app.runs import RunManager
+from app.telemetry import Registry, instrument
+
+# Chunks at or below this cost (steps * chain_length) run on a thread in
+# the dashboard process; larger ones go to the worker pool.
+INLINE_COST = int(os.environ.get("POR_INLINE_COST", 50_000))
+
+CHART_MAX_STEPS = int(os.environ.get("POR_CHART_MAX_STEPS", 1_000_000))
+# Charts hold a (rows x chain_length) history and draw a surface over it.
+CHART_MAX_CHAIN_LENGTH = int(os.environ.get("POR_CHART_MAX_CHAIN_LENGTH", 4096))
+# Background runs queued or running at once; more are refused with a 429.
+# Run steps share the chart bound, so every run's charts can be drawn.
+RUNS_MAX_ACTIVE = int(os.environ.get("POR_DASHBOARD_MAX_ACTIVE", 8))
+CACHE_MAX_AGE = int(os.environ.get("POR_CACHE_MAX_AGE", 86400))
 
-from por_core.simulator import ResonanceSimulator
-from por_core.metrics import stability_score, coherence
+pool = SimulationPool.from_env()
+# Rendered charts (PNG bytes per kind) by input hash, in memory only.
+charts = ResultCache(maxsize=int(os.environ.get("POR_CHART_CACHE_SIZE", 64)))
 
-app = FastAPI(title="PoR Dashboard")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool.start()
+    yield
+    runs.shutdown()
+    pool.shutdown()
+
+
+app = FastAPI(title="PoR Dashboard", lifespan=lifespan)
+registry = instrument(app, Registry())
+sim_site_steps = registry.counter("por_sim_site_steps_total", "Simulated site-steps completed.")
+registry.gauge("por_dashboard_runs_active", "Dashboard runs queued or running.", fn=lambda: runs.active())
+registry.gauge(
+    "por_pool_queue_depth", "Pool jobs waiting for a slot, by lane.", labels=("lane",),
+    fn=lambda: {(name,): lane.queued for name, lane in pool.lanes.items()},
+)
+registry.counter(
+    "por_chart_cache_lookups_total", "Chart cache lookups by outcome.", labels=("result",),
+    fn=lambda: {(name,): getattr(charts, name) for name in ("hits", "coalesced", "misses")},
+)
 
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="docs/visuals"), name="static")
 
 
+async def dispatch(cost: int, fn, *args):
+    """Run one chunk of a dashboard run inline if it is cheap, else on the pool."""
+    if cost <= INLINE_COST:
+        result = await run_in_threadpool(fn, *args)
+    else:
+        result = await pool.submit(fn, *args)
+    sim_site_steps.inc(cost)
+    return result
+
+
+runs = RunManager(dispatch, max_runs=int(os.environ.get("POR_DASHBOARD_MAX_RUNS", 256)))
+
+_defaults = PoRConfig()
+
+
+class RunRequest(BaseModel):
+    steps: int = 200
+    chain_length: int = 64
+    seed: Optional[int] = None
+    noise_level: float = _defaults.noise_level
+    phase_strength: float = _defaults.phase_strength
+
+
+def submit(req: RunRequest):
+    if not 1 <= req.steps <= CHART_MAX_STEPS or req.chain_length < 3:
+        raise HTTPException(status_code=422, detail=f"steps must be 1..{CHART_MAX_STEPS} and chain_length >= 3.")
+    if runs.active() >= RUNS_MAX_ACTIVE:
+        raise HTTPException(
+            status_code=429,
+            detail=f"{RUNS_MAX_ACTIVE} runs already in progress; wait for one to finish.",
+            headers={"Retry-After": "5"},
+        )
+    config = PoRConfig(
+        chain_length=req.chain_length,
+        noise_level=req.noise_level,
+        phase_strength=req.phase_strength,
+    )
+    return runs.submit(req.steps, config, req.seed)
+
+
+def get_run(run_id: str):
+    run = runs.get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown run.")
+    return run
+
+
 @app.get("/", response_class=HTMLResponse)
-async def index(request: Request):
+async def index(request: Request, run: Optional[str] = None):
+    current = runs.get(run) if run else None
     return templates.TemplateResponse(
+        request,
         "index.html",
-        {"request": request, "stability": None, "coherence": None},
+        {"run": current.summary() if current else None},
     )
 
 
-@app.post("/run", response_class=HTMLResponse)
+@app.post("/run")
 async def run_simulation(
-    request: Request,
     steps: int = Form(200),
     chain_length: int = Form(64),
 ):
-    sim = ResonanceSimulator(chain_length=chain_length)
-    sim.run_iterations(steps)
+    """Form endpoint: start a run in the background and show its live page."""
+    run = submit(RunRequest(steps=steps, chain_length=chain_length))
+    return RedirectResponse(f"/?run={run.run_id}", status_code=303)
 
-    stab = stability_score(sim.chain)
-    coh = coherence(sim.chain)
 
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "stability": f"{stab:.6f}",
-            "coherence": f"{coh:.6f}",
-        },
+@app.post("/runs", status_code=202)
+async def create_run(req: RunRequest):
+    return submit(req).summary()
+
+
+@app.get("/runs/{run_id}")
+def run_arrays(run_id: str):
+    """Status plus the recorded step / stability / coherence arrays."""
+    return get_run(run_id).arrays()
+
+
+@app.get("/runs/{run_id}/events")
+async def run_events(run_id: str, request: Request, since: int = 0):
+    """Live progress as Server-Sent Events; reconnects resume after Last-Event-ID."""
+    run = get_run(run_id)
+    last = request.headers.get("last-event-id")
+    if last is not None and last.isdigit():
+        since = int(last) + 1
+    return StreamingResponse(
+        run.events(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
 
+async def chart_response(request: Request, kind: str, steps: int, config: PoRConfig, seed: int, dpi: int):
+    """
+    Render (or reuse) one chart. All kinds are rendered together in one
+    pool task and cached by input hash; an unchanged chart answers
+    If-None-Match with 304.
+    """
+    if kind not in KINDS:
+        raise HTTPException(status_code=404, detail=f"Unknown chart; choose from {', '.join(KINDS)}.")
+    if (not 1 <= steps <= CHART_MAX_STEPS or not 3 <= config.chain_length <= CHART_MAX_CHAIN_LENGTH
+            or not 30 <= dpi <= 300):
+        raise HTTPException(
+            status_code=422,
+            detail=f"steps must be 1..{CHART_MAX_STEPS}, chain_length 3..{CHART_MAX_CHAIN_LENGTH} and dpi 30..300.",
+        )
+
+    key = cache_key({
+        "kind": "charts",
+        "steps": steps,
+        "chain_length": config.chain_length,
+        "noise_level": config.noise_level,
+        "phase_strength": config.phase_strength,
+        "seed": seed,
+        "dpi": dpi,
+    })
+    headers = {"ETag": f'"{key}-{kind}"', "Cache-Control": f"public, max-age={CACHE_MAX_AGE}"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+
+    try:
+        images, status = await charts.get_or_compute(
+            key, lambda: pool.submit(render_charts, KINDS, steps, config, seed, dpi)
+        )
+    except PoolSaturated:
+        raise HTTPException(status_code=503, detail="Render queue is full.", headers={"Retry-After": "1"})
+    except (asyncio.TimeoutError, TimeoutError):
+        raise HTTPException(status_code=504, detail=f"Rendering exceeded {pool.timeout:.0f}s timeout.")
+    return Response(images[kind], media_type="image/png", headers={**headers, "X-Cache": status.upper()})
+
+
+@app.get("/charts/{kind}.png")
+async def chart(
+    kind: str,
+    request: Request,
+    steps: int = 200,
+    chain_length: int = 64,
+    seed: int = 0,
+    noise_level: float = _defaults.noise_level,
+    phase_strength: float = _defaults.phase_strength,
+    dpi: int = 100,
+):
+    """Stabilization curve, coherence heatmap, locking trajectory or metrics chart for a config and seed."""
+    config = PoRConfig(chain_length=chain_length, noise_level=noise_level, phase_strength=phase_strength)
+    return await chart_response(request, kind, steps, config, seed, dpi)
+
+
+@app.get("/runs/{run_id}/charts/{kind}.png")
+async def run_chart(run_id: str, kind: str, request: Request, dpi: int = 100):
+    """A chart for a dashboard run's config and seed (reproduced, not read from the live run)."""
+    run = get_run(run_id)
+    return await chart_response(request, kind, run.steps, run.config, run.seed, dpi)
+
+
+@app.delete("/runs/{run_id}")
+async def cancel_run(run_id: str):
+    # async: cancelling the run's task must happen on the event loop thread.
+    run = get_run(run_id)
+    runs.cancel(run_id)
+    return run.summary()
+
+
 def run():
     import uvicorn
 
@@ -0,0 +1,282 @@
+# app/jobs.py
+import asyncio
+import json
+import os
+import pickle
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+from por_core.config import PoRConfig
+from por_core.metrics import stability_score, coherence
+from por_core.simulator import ResonanceSimulator
+
+from app.pool import PoolSaturated
+from app.tasks import advance
+
+# Work (steps * chain_length) per chunk. Cancellation, progress and
+# checkpoints all happen at chunk boundaries.
+JOB_CHUNK_COST = 2_000_000
+
+ACTIVE = ("queued", "running")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id           TEXT PRIMARY KEY,
+    request_hash TEXT,
+    request      TEXT NOT NULL,
+    status       TEXT NOT NULL,
+    steps_done   INTEGER NOT NULL DEFAULT 0,
+    checkpoint   BLOB,
+    result       TEXT,
+    error        TEXT,
+    created_at   REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_request_hash ON jobs (request_hash);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+
+class JobStore:
+    """
+    SQLite persistence for simulation jobs.
+    A job row holds the request, its status, the steps completed so far,
+    a pickled simulator checkpoint and, once done, the result.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, args=()):
+        with self._lock:
+            return self._db.execute(sql, args).fetchall()
+
+    def create(self, request: dict, request_hash: Optional[str]) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (id, request_hash, request, status, created_at, updated_at) VALUES (?, ?, ?, 'queued', ?, ?)",
+            (job_id, request_hash, json.dumps(request), now, now),
+        )
+        return job_id
+
+    def get(self, job_id: str) -> Optional[sqlite3.Row]:
+        rows = self._execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    def find_reusable(self, request_hash: str) -> Optional[sqlite3.Row]:
+        """Newest queued, running or done job for this request."""
+        rows = self._execute(
+            "SELECT * FROM jobs WHERE request_hash = ? AND status IN ('queued', 'running', 'done') "
+            "ORDER BY created_at DESC LIMIT 1",
+            (request_hash,),
+        )
+        return rows[0] if rows else None
+
+    def unfinished(self):
+        return self._execute("SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at")
+
+    def update(self, job_id: str, **fields):
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self._execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def cancel(self, job_id: str) -> bool:
+        """Mark an active job cancelled. Returns False if it already finished."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', updated_at = ? WHERE id = ? AND status IN ('queued', 'running')",
+                (time.time(), job_id),
+            )
+            return cur.rowcount > 0
+
+    def counts(self) -> dict:
+        """Number of jobs per status."""
+        return {row[0]: row[1] for row in self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")}
+
+    def close(self):
+        self._db.close()
+
+
+class JobManager:
+    """
+    Runs persisted jobs on a fixed number of background workers.
+
+      - submissions are deduplicated by request hash (seeded runs only)
+      - unseeded runs get a random seed at submission, stored with the
+        request, so a resumed run stays reproducible
+      - workers advance each run chunk by chunk through `dispatch`, the
+        same inline-or-pool path the HTTP endpoints use, and checkpoint
+        the simulator every `checkpoint_seconds`
+      - on start, queued and interrupted jobs are picked up again from
+        their last checkpoint
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        dispatch: Callable[..., Awaitable],
+        workers: int = 2,
+        checkpoint_seconds: float = 5.0,
+    ):
+        self.store = store
+        self.dispatch = dispatch
+        self.workers = workers
+        self.checkpoint_seconds = checkpoint_seconds
+        self.progress: Dict[str, int] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._submit_lock = threading.Lock()
+        self._tasks = []
+
+    @classmethod
+    def from_env(cls, dispatch: Callable[..., Awaitable]) -> "JobManager":
+        """Configure from POR_JOBS_DB, POR_JOB_WORKERS and POR_JOB_CHECKPOINT_SECONDS."""
+        return cls(
+            JobStore(os.environ.get("POR_JOBS_DB", ".por/jobs.sqlite3")),
+            dispatch,
+            workers=int(os.environ.get("POR_JOB_WORKERS", 2)),
+            checkpoint_seconds=float(os.environ.get("POR_JOB_CHECKPOINT_SECONDS", 5.0)),
+        )
+
+    def start(self):
+        for row in self.store.unfinished():
+            self._queue.put_nowait(row["id"])
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.store.close()
+
+    def find(self, request_hash: Optional[str]) -> Optional[str]:
+        """The job a submission of this request would be deduplicated to, if any."""
+        if request_hash is None:
+            return None
+        existing = self.store.find_reusable(request_hash)
+        return existing["id"] if existing is not None else None
+
+    def submit(self, request: dict, request_hash: Optional[str], admit: Optional[Callable[[], None]] = None):
+        """
+        Queue a run, or return the existing job for the same request. Returns
+        (job_id, deduplicated). `admit()` is called only when a new job is
+        about to be created, and may raise to refuse it. Call from the event
+        loop: the queue is not thread-safe.
+        """
+        # Lookup and insert as one step, so identical concurrent submissions
+        # share one job and only the first is admitted.
+        with self._submit_lock:
+            existing = self.find(request_hash)
+            if existing is not None:
+                return existing, True
+            if admit is not None:
+                admit()
+            if request.get("seed") is None:
+                request = {**request, "seed": secrets.randbits(63)}
+            job_id = self.store.create(request, request_hash)
+        self._queue.put_nowait(job_id)
+        return job_id, False
+
+    def cancel(self, job_id: str) -> bool:
+        return self.store.cancel(job_id)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        row = self.store.get(job_id)
+        if row is None:
+            return None
+        request = json.loads(row["request"])
+        steps_done = self.progress.get(job_id, row["steps_done"])
+        steps = request["steps"]
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            "steps": steps,
+            "steps_done": steps_done,
+            "progress": steps_done / steps if steps else 1.0,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def result(self, job_id: str) -> Optional[dict]:
+        row = self.store.get(job_id)
+        if row is None or row["result"] is None:
+            return None
+        return json.loads(row["result"])
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.store.update(job_id, status="failed", error=str(e) or type(e).__name__)
+            finally:
+                self.progress.pop(job_id, None)
+
+    async def _run(self, job_id: str):
+        row = self.store.get(job_id)
+        if row is None or row["status"] not in ACTIVE:
+            return
+
+        request = json.loads(row["request"])
+        steps = request["steps"]
+        if row["checkpoint"] is not None:
+            checkpoint = row["checkpoint"]
+            sim = pickle.loads(checkpoint)
+            pos = row["steps_done"]
+        else:
+            config = PoRConfig(
+                chain_length=request["chain_length"],
+                noise_level=request["noise_level"],
+                phase_strength=request["phase_strength"],
+            )
+            sim = ResonanceSimulator(seed=request["seed"], config=config)
+            checkpoint = pickle.dumps(sim)
+            pos = 0
+
+        self.store.update(job_id, status="running")
+        chain_length = sim.config.chain_length
+        chunk = max(1, JOB_CHUNK_COST // chain_length)
+        last_checkpoint = time.monotonic()
+
+        while pos < steps:
+            if self.store.get(job_id)["status"] == "cancelled":
+                return
+            stop = min(steps, pos + chunk)
+            try:
+                sim, _ = await self.dispatch((stop - pos) * chain_length, advance, sim, pos, stop, steps, steps)
+            except PoolSaturated:
+                await asyncio.sleep(0.5)
+                continue
+            except asyncio.CancelledError:
+                # Server shutting down: keep the last finished chunk for the
+                # restart. `sim` itself may be partway through the cancelled
+                # chunk, since inline chunks keep advancing it on a thread.
+                self.store.update(job_id, steps_done=pos, checkpoint=checkpoint)
+                raise
+            pos = stop
+            checkpoint = pickle.dumps(sim)
+            self.progress[job_id] = pos
+
+            if time.monotonic() - last_checkpoint >= self.checkpoint_seconds:
+                self.store.update(job_id, steps_done=pos, checkpoint=checkpoint)
+                last_checkpoint = time.monotonic()
+
+        if self.store.get(job_id)["status"] == "cancelled":
+            return
+        result = {"stability": stability_score(sim.chain), "coherence": coherence(sim.chain)}
+        self.store.update(job_id, status="done", steps_done=steps, checkpoint=None, result=json.dumps(result))
@@ -0,0 +1,181 @@
+# app/pool.py
+import asyncio
+import functools
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from app.tasks import warmup
+
+LANES = ("interactive", "bulk")
+
+
+class PoolSaturated(Exception):
+    """Raised when the pool's wait queue is full and a job cannot be admitted."""
+
+
+class Lane:
+    """Admission state for one priority lane of the pool."""
+
+    def __init__(self, name: str, max_in_flight: int, max_queue: int):
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.slots = asyncio.Semaphore(max_in_flight)
+        self.in_flight = 0
+        self.queued = 0
+
+    def stats(self) -> dict:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+        }
+
+
+class SimulationPool:
+    """
+    Bounded, async front door to a process pool for CPU-bound simulation work.
+
+      - at most `max_in_flight` jobs run at once
+      - work is submitted to the "interactive" or "bulk" lane; bulk work
+        may use at most `max_in_flight - interactive_slots` slots, so the
+        reserved slots are always free for interactive work
+      - each lane lets at most `max_queue` further jobs wait for a slot;
+        beyond that `submit` raises PoolSaturated instead of growing the
+        backlog
+      - every job gets a deadline (queue wait included); workers receive it
+        as `deadline=` and abort once it passes, so a timed-out job frees
+        its process instead of running to completion
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        max_queue: int = 32,
+        timeout: float = 30.0,
+        interactive_slots: Optional[int] = None,
+        bulk_queue: Optional[int] = None,
+    ):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        reserved = interactive_slots if interactive_slots is not None else max(1, self.max_in_flight // 4)
+        self.lanes: Dict[str, Lane] = {
+            "interactive": Lane("interactive", self.max_in_flight, max_queue),
+            "bulk": Lane("bulk", max(1, self.max_in_flight - reserved), bulk_queue or max_queue),
+        }
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+
+    @classmethod
+    def from_env(cls, prefix: str = "POR_POOL_") -> "SimulationPool":
+        """
+        Build a pool from environment variables:
+        POR_POOL_WORKERS, POR_POOL_MAX_IN_FLIGHT, POR_POOL_MAX_QUEUE, POR_POOL_TIMEOUT,
+        POR_POOL_INTERACTIVE_SLOTS, POR_POOL_BULK_QUEUE.
+        """
+        def env(name, cast, default):
+            value = os.environ.get(prefix + name)
+            return cast(value) if value else default
+
+        return cls(
+            max_workers=env("WORKERS", int, None),
+            max_in_flight=env("MAX_IN_FLIGHT", int, None),
+            max_queue=env("MAX_QUEUE", int, 32),
+            timeout=env("TIMEOUT", float, 30.0),
+            interactive_slots=env("INTERACTIVE_SLOTS", int, None),
+            bulk_queue=env("BULK_QUEUE", int, None),
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return sum(lane.in_flight for lane in self.lanes.values())
+
+    @property
+    def queued(self) -> int:
+        return sum(lane.queued for lane in self.lanes.values())
+
+    def start(self):
+        """Create the worker processes and warm them up."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            for _ in range(self.max_workers):
+                self._executor.submit(warmup)
+
+    def shutdown(self):
+        """Stop the pool and its workers; jobs still running are abandoned."""
+        if self._executor is not None:
+            # A busy worker can outlive a SIGTERMed parent and keep its
+            # pipes open, so don't leave workers to exit on their own.
+            processes = list(self._executor._processes.values())
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            for proc in processes:
+                proc.terminate()
+            self._executor = None
+
+    async def submit(self, fn, *args, lane: str = "interactive", timeout: Optional[float] = None, **kwargs):
+        """
+        Run `fn(*args, deadline=..., **kwargs)` in a worker process.
+        Raises PoolSaturated when the lane's queue is full and
+        asyncio.TimeoutError when the job (including time spent queued)
+        exceeds its timeout.
+        """
+        state = self.lanes[lane]
+        if state.in_flight + state.queued >= state.max_in_flight + state.max_queue:
+            raise PoolSaturated(f"{lane}: {state.in_flight} running, {state.queued} queued")
+
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = time.time() + timeout
+
+        async def acquire():
+            await state.slots.acquire()
+            try:
+                await self._slots.acquire()
+            except BaseException:
+                state.slots.release()
+                raise
+
+        state.queued += 1
+        try:
+            await asyncio.wait_for(acquire(), timeout)
+        finally:
+            state.queued -= 1
+
+        state.in_flight += 1
+        try:
+            self.start()
+            loop = asyncio.get_running_loop()
+            call = functools.partial(fn, *args, deadline=deadline, **kwargs)
+            remaining = max(0.0, timeout - (time.monotonic() - started))
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, call), remaining)
+        finally:
+            state.in_flight -= 1
+            self._slots.release()
+            state.slots.release()
+
+    def worker_pids(self):
+        """Process ids of the live workers (empty before start)."""
+        if self._executor is None:
+            return []
+        return [pid for pid, proc in list(self._executor._processes.items()) if proc.is_alive()]
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.max_workers,
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+        }
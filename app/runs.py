@@ -0,0 +1,165 @@
+# app/runs.py
+import asyncio
+import secrets
+import time
+import uuid
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+
+from por_core.config import PoRConfig
+from por_core.simulator import ResonanceSimulator
+from app.streaming import CHUNK_COST, sse
+from app.tasks import advance
+
+# Metric points recorded per run, whatever its length: enough for a smooth
+# chart, small enough to resend to every viewer that (re)connects.
+CHART_POINTS = 500
+
+FINISHED = ("done", "cancelled", "error")
+
+
+class DashboardRun:
+    """
+    A background simulation whose metrics are recorded as arrays.
+
+    Unlike StreamRun, nothing is dropped and any number of viewers can
+    follow it: each one replays the recorded frames (from a given index,
+    for reconnects) and then waits for new ones.
+    """
+
+    def __init__(self, steps: int, config: PoRConfig, seed: Optional[int] = None):
+        self.run_id = uuid.uuid4().hex
+        self.steps = steps
+        self.config = config
+        # Unseeded runs get a seed up front so they can be reproduced.
+        self.seed = seed if seed is not None else secrets.randbits(31)
+        self.every = max(1, steps // CHART_POINTS)
+        self.status = "queued"
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+
+        self.step: List[int] = []
+        self.stability: List[float] = []
+        self.coherence: List[float] = []
+
+        self._changed = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def start(self, dispatch: Callable[..., Awaitable]):
+        """Start the run; `dispatch(cost, fn, *args)` runs one chunk."""
+        self._task = asyncio.create_task(self._produce(dispatch))
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _produce(self, dispatch):
+        sim = ResonanceSimulator(seed=self.seed, config=self.config)
+        chain_length = self.config.chain_length
+        chunk = max(self.every, CHUNK_COST // chain_length // self.every * self.every)
+
+        pos = 0
+        self.status = "running"
+        self._notify()
+        try:
+            while pos < self.steps:
+                stop = min(self.steps, pos + chunk)
+                sim, frames = await dispatch(
+                    (stop - pos) * chain_length,
+                    advance, sim, pos, stop, self.steps, self.every,
+                )
+                for frame in frames:
+                    self.step.append(frame["step"])
+                    self.stability.append(frame["stability"])
+                    self.coherence.append(frame["coherence"])
+                pos = stop
+                self._notify()
+            self.status = "done"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as e:
+            self.status = "error"
+            self.error = str(e) or type(e).__name__
+        finally:
+            self._notify()
+
+    def frame(self, i: int) -> dict:
+        return {"step": self.step[i], "stability": self.stability[i], "coherence": self.coherence[i]}
+
+    def summary(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "status": self.status,
+            "error": self.error,
+            "steps": self.steps,
+            "chain_length": self.config.chain_length,
+            "seed": self.seed,
+            "every": self.every,
+            "progress": self.step[-1] / self.steps if self.step else 0.0,
+        }
+
+    def arrays(self) -> dict:
+        return {**self.summary(), "step": self.step, "stability": self.stability, "coherence": self.coherence}
+
+    async def events(self, since: int = 0):
+        """
+        Yield Server-Sent Events: "start", one "metrics" event per recorded
+        frame from index `since` (event ids are frame indices, so a
+        reconnecting EventSource resumes via Last-Event-ID), then the final
+        status.
+        """
+        yield sse("start", self.summary())
+        i = max(0, since)
+        while True:
+            changed = self._changed
+            while i < len(self.step):
+                yield sse("metrics", self.frame(i), id=i)
+                i += 1
+            if self.status in FINISHED:
+                yield sse(self.status, self.summary())
+                return
+            await changed.wait()
+
+
+class RunManager:
+    """Dashboard runs by id; the oldest finished runs are forgotten past `max_runs`."""
+
+    def __init__(self, dispatch: Callable[..., Awaitable], max_runs: int = 256):
+        self.dispatch = dispatch
+        self.max_runs = max_runs
+        self.runs: "OrderedDict[str, DashboardRun]" = OrderedDict()
+
+    def submit(self, steps: int, config: PoRConfig, seed: Optional[int] = None) -> DashboardRun:
+        run = DashboardRun(steps, config, seed)
+        self.runs[run.run_id] = run
+        run.start(self.dispatch)
+        self._evict()
+        return run
+
+    def _evict(self):
+        for run_id in [r for r, run in self.runs.items() if run.status in FINISHED]:
+            if len(self.runs) <= self.max_runs:
+                break
+            del self.runs[run_id]
+
+    def get(self, run_id: str) -> Optional[DashboardRun]:
+        return self.runs.get(run_id)
+
+    def cancel(self, run_id: str) -> bool:
+        run = self.runs.get(run_id)
+        if run is None or run.status in FINISHED:
+            return False
+        run.cancel()
+        return True
+
+    def active(self) -> int:
+        return sum(run.status not in FINISHED for run in self.runs.values())
+
+    def shutdown(self):
+        for run in self.runs.values():
+            run.cancel()
@@ -0,0 +1,160 @@
+# app/scheduler.py
+import asyncio
+import math
+import os
+import time
+from typing import Dict, Optional
+
+
+def estimate_cost(steps: int, chain_length: int, chains: int = 1) -> int:
+    """
+    Cost of a run in work units. Run time is roughly linear in
+    steps * chain_length (each step is one noise draw and one phase lock
+    over the chain), and an ensemble scales with its number of chains.
+    """
+    return max(1, steps) * max(1, chain_length) * max(1, chains)
+
+
+class OverBudget(Exception):
+    """
+    Raised when a client's request cannot fit its budget soon enough.
+    `retry_after` is None when the request can never fit; it should be
+    submitted as a job instead.
+    """
+
+    def __init__(self, retry_after: Optional[float], message: Optional[str] = None):
+        if message is None and retry_after is None:
+            message = "request cost exceeds the per-client budget; submit it to /jobs"
+        elif message is None:
+            message = f"client budget exhausted; retry in {retry_after:.0f}s"
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Cost units per second with a burst allowance. Tokens may go negative while a deferred request waits."""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+
+class CostScheduler:
+    """
+    Admission control for simulation requests.
+
+      - each request is costed up front (see estimate_cost)
+      - cheap requests go to the "interactive" pool lane, expensive ones
+        to "bulk", so dashboard calls keep reserved workers while sweeps run
+      - each client has a token-bucket budget of cost units; a request
+        that overdraws it is deferred until the budget refills, or rejected
+        with a Retry-After if that would take longer than `max_defer`
+      - jobs are charged to the same budget without waiting: it may run
+        into debt, up to `job_backlog` seconds of refill per client
+    """
+
+    def __init__(
+        self,
+        interactive_cost: int = 1_000_000,
+        client_rate: Optional[float] = None,
+        client_burst: Optional[float] = None,
+        max_defer: float = 2.0,
+        job_backlog: float = 3600.0,
+    ):
+        self.interactive_cost = interactive_cost
+        self.client_rate = client_rate
+        self.client_burst = client_burst or (client_rate * 10 if client_rate else None)
+        self.max_defer = max_defer
+        self.job_backlog = job_backlog
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.admitted = {"interactive": 0, "bulk": 0}
+        self.deferred = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "CostScheduler":
+        """
+        Configure from POR_INTERACTIVE_COST, POR_CLIENT_BUDGET (cost units/s;
+        unset disables budgets), POR_CLIENT_BURST, POR_MAX_DEFER and
+        POR_JOB_BACKLOG (seconds).
+        """
+        rate = os.environ.get("POR_CLIENT_BUDGET")
+        burst = os.environ.get("POR_CLIENT_BURST")
+        return cls(
+            interactive_cost=int(os.environ.get("POR_INTERACTIVE_COST", 1_000_000)),
+            client_rate=float(rate) if rate else None,
+            client_burst=float(burst) if burst else None,
+            max_defer=float(os.environ.get("POR_MAX_DEFER", 2.0)),
+            job_backlog=float(os.environ.get("POR_JOB_BACKLOG", 3600.0)),
+        )
+
+    def lane_for(self, cost: int) -> str:
+        return "interactive" if cost <= self.interactive_cost else "bulk"
+
+    def _bucket(self, client: str) -> TokenBucket:
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            self._prune()
+            bucket = self.buckets[client] = TokenBucket(self.client_rate, self.client_burst)
+        bucket.refill()
+        return bucket
+
+    async def admit(self, client: str, cost: int) -> str:
+        """Charge `cost` to `client`, waiting if needed. Returns the lane to run in."""
+        lane = self.lane_for(cost)
+
+        if self.client_rate:
+            bucket = self._bucket(client)
+            wait = (cost - bucket.tokens) / self.client_rate
+            if wait > self.max_defer:
+                self.rejected += 1
+                fits_ever = cost <= self.client_burst + self.client_rate * self.max_defer
+                raise OverBudget(retry_after=math.ceil(wait) if fits_ever else None)
+            bucket.tokens -= cost
+            if wait > 0:
+                self.deferred += 1
+                await asyncio.sleep(wait)
+
+        self.admitted[lane] += 1
+        return lane
+
+    def admit_job(self, client: str, cost: int):
+        """Charge a queued job's `cost` to `client` up front, without waiting."""
+        if self.client_rate:
+            bucket = self._bucket(client)
+            debt = (cost - bucket.tokens) / self.client_rate
+            if debt > self.job_backlog:
+                self.rejected += 1
+                if cost > self.client_burst + self.client_rate * self.job_backlog:
+                    raise OverBudget(None, "job cost exceeds the per-client job backlog")
+                raise OverBudget(math.ceil(debt - self.job_backlog))
+            bucket.tokens -= cost
+        self.admitted["bulk"] += 1
+
+    def _prune(self, limit: int = 10_000):
+        """Forget clients whose buckets have refilled, once there are many."""
+        if len(self.buckets) < limit:
+            return
+        for client, bucket in list(self.buckets.items()):
+            bucket.refill()
+            if bucket.tokens >= bucket.burst:
+                del self.buckets[client]
+
+    def stats(self) -> dict:
+        return {
+            "interactive_cost": self.interactive_cost,
+            "client_budget": self.client_rate,
+            "client_burst": self.client_burst,
+            "job_backlog": self.job_backlog,
+            "admitted": dict(self.admitted),
+            "deferred": self.deferred,
+            "rejected": self.rejected,
+            "clients": len(self.buckets),
+        }
@@ -0,0 +1,108 @@
+# app/streaming.py
+import asyncio
+import json
+import uuid
+from typing import Awaitable, Callable, Dict, Optional
+
+from por_core.config import PoRConfig
+from por_core.simulator import ResonanceSimulator
+from app.tasks import advance
+
+# Target work (steps * chain_length) per chunk sent to a worker. Cancelling
+# a run takes effect at the next chunk boundary.
+CHUNK_COST = 200_000
+
+
+class StreamRun:
+    """
+    One streamed simulation: a producer task pushes frames into a bounded
+    buffer, and the HTTP response drains it.
+
+    When the buffer is full the oldest frame is dropped instead of waiting,
+    so a slow client never stalls the simulation; the number of dropped
+    frames is reported in every event.
+    """
+
+    def __init__(self, steps: int, config: PoRConfig, seed: Optional[int], every: int, snapshot: int, buffer: int = 64):
+        self.run_id = uuid.uuid4().hex
+        self.steps = steps
+        self.config = config
+        self.seed = seed
+        self.every = max(1, every)
+        self.snapshot = snapshot
+        self.dropped = 0
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+        self._task: Optional[asyncio.Task] = None
+
+    def _push(self, event: str, data: dict):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait((event, data))
+
+    def start(self, dispatch: Callable[..., Awaitable]):
+        """Start producing; `dispatch(cost, fn, *args)` runs one chunk."""
+        self._task = asyncio.create_task(self._produce(dispatch))
+
+    def cancel(self):
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def _produce(self, dispatch):
+        sim = ResonanceSimulator(seed=self.seed, config=self.config)
+        chain_length = self.config.chain_length
+        chunk = max(self.every, CHUNK_COST // chain_length // self.every * self.every)
+
+        pos = 0
+        try:
+            while pos < self.steps:
+                stop = min(self.steps, pos + chunk)
+                sim, frames = await dispatch(
+                    (stop - pos) * chain_length,
+                    advance, sim, pos, stop, self.steps, self.every, self.snapshot,
+                )
+                for frame in frames:
+                    self._push("metrics", frame)
+                pos = stop
+            self._push("done", {"step": self.steps})
+        except asyncio.CancelledError:
+            self._push("cancelled", {"step": pos})
+            raise
+        except Exception as e:
+            self._push("error", {"detail": str(e) or type(e).__name__})
+
+    async def events(self):
+        """Yield Server-Sent Events until the run finishes."""
+        yield sse("start", {"run_id": self.run_id, "steps": self.steps, "every": self.every})
+        while True:
+            event, data = await self.queue.get()
+            data["dropped"] = self.dropped
+            yield sse(event, data)
+            if event != "metrics":
+                return
+
+
+def sse(event: str, data: dict, id: Optional[int] = None) -> str:
+    prefix = f"id: {id}\n" if id is not None else ""
+    return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+class StreamRegistry:
+    """Live streamed runs by id, so a client can cancel one explicitly."""
+
+    def __init__(self):
+        self.runs: Dict[str, StreamRun] = {}
+
+    def add(self, run: StreamRun):
+        self.runs[run.run_id] = run
+
+    def discard(self, run: StreamRun):
+        run.cancel()
+        self.runs.pop(run.run_id, None)
+
+    def cancel(self, run_id: str) -> bool:
+        run = self.runs.get(run_id)
+        if run is None:
+            return False
+        run.cancel()
+        return True
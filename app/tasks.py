@@ -0,0 +1,139 @@
+# app/tasks.py
+"""
+Top-level functions executed inside pool worker processes.
+They must stay importable and picklable: no closures, plain arguments in,
+plain dicts out.
+"""
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from por_core.config import PoRConfig
+from por_core.ensemble import ResonanceEnsemble
+from por_core.simulator import ResonanceSimulator
+from por_core.metrics import stability_score, coherence
+
+# Steps run between deadline checks. Small enough that a timed-out
+# simulation releases its worker quickly, large enough to be free.
+CHECK_EVERY = 256
+
+
+class SimulationTimeout(TimeoutError):
+    """Raised inside a worker once a simulation passes its deadline."""
+
+
+def check_deadline(deadline: Optional[float]):
+    if deadline is not None and time.time() > deadline:
+        raise SimulationTimeout("simulation exceeded its deadline")
+
+
+def warmup(deadline: Optional[float] = None) -> bool:
+    """No-op used to start worker processes (and import NumPy) ahead of traffic."""
+    return True
+
+
+def run_simulation(
+    steps: int,
+    config: PoRConfig,
+    seed: Optional[int] = None,
+    deadline: Optional[float] = None,
+) -> dict:
+    """Run one simulation and return its final stability & coherence."""
+    sim = ResonanceSimulator(seed=seed, config=config)
+
+    done = 0
+    while done < steps:
+        check_deadline(deadline)
+        chunk = min(CHECK_EVERY, steps - done)
+        sim.run_iterations(chunk)
+        done += chunk
+
+    return {
+        "stability": stability_score(sim.chain),
+        "coherence": coherence(sim.chain),
+    }
+
+
+def run_ensemble(
+    steps: int,
+    config: PoRConfig,
+    seeds: List[Optional[int]],
+    deadline: Optional[float] = None,
+) -> List[dict]:
+    """
+    Run one simulation per seed as a single vectorised ensemble.
+    Results are in seed order and match run_simulation for the same seed.
+    """
+    ens = ResonanceEnsemble(seeds, config=config)
+
+    done = 0
+    while done < steps:
+        check_deadline(deadline)
+        chunk = min(CHECK_EVERY, steps - done)
+        ens.run_iterations(chunk)
+        done += chunk
+
+    metrics = ens.metrics()
+    return [
+        {"stability": float(stab), "coherence": float(coh)}
+        for stab, coh in zip(metrics["stability"], metrics["coherence"])
+    ]
+
+
+def snapshot_frame(sim: ResonanceSimulator, step: int, snapshot: int = 0) -> dict:
+    """Metrics for the current chain, plus an optional downsampled copy of it."""
+    frame = {
+        "step": step,
+        "stability": stability_score(sim.chain),
+        "coherence": coherence(sim.chain),
+    }
+    if snapshot:
+        idx = np.linspace(0, len(sim.chain) - 1, min(snapshot, len(sim.chain))).round().astype(int)
+        frame["chain"] = sim.chain[idx].tolist()
+    return frame
+
+
+def advance(
+    sim: ResonanceSimulator,
+    start: int,
+    stop: int,
+    total: int,
+    every: int,
+    snapshot: int = 0,
+    deadline: Optional[float] = None,
+) -> Tuple[ResonanceSimulator, List[dict]]:
+    """
+    Advance `sim` from step `start` to `stop`, recording a frame every
+    `every` steps and at the final step `total`.
+    The simulator (chain + generator state) travels with the call, so a
+    long run can be split into chunks that stop early when cancelled.
+    """
+    frames = []
+    pos = start
+    while pos < stop:
+        check_deadline(deadline)
+        nxt = min(stop, (pos // every + 1) * every)
+        sim.run_iterations(nxt - pos)
+        pos = nxt
+        if pos % every == 0 or pos == total:
+            frames.append(snapshot_frame(sim, pos, snapshot))
+    return sim, frames
+
+
+def record(
+    sim: ResonanceSimulator,
+    steps: int,
+    every: int,
+    deadline: Optional[float] = None,
+) -> Tuple[ResonanceSimulator, np.ndarray]:
+    """Advance `sim` by `steps`, returning the chain recorded every `every` steps."""
+    blocks = []
+    done = 0
+    while done < steps:
+        check_deadline(deadline)
+        chunk = min(max(every, CHECK_EVERY // every * every), steps - done)
+        blocks.append(sim.record(chunk, every))
+        done += chunk
+    frames = np.concatenate(blocks) if blocks else np.empty((0, len(sim.chain)))
+    return sim, frames
@@ -0,0 +1 @@
+# PoR-Gain benchmark suite
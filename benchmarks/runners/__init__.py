@@ -0,0 +1 @@
+# Benchmark runners: importable, and runnable as scripts.
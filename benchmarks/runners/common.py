@@ -0,0 +1,186 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Iterator, List, Optional, Set, Tuple
+
+from benchmarks.runners.joins import bucket_of
+from benchmarks.runners.turnstore import codec_for, compress_block, iter_lines, recover
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def resolve(path) -> Path:
+    """Paths in configs are relative to the repo root; accept cwd-relative ones too."""
+    path = Path(path)
+    if path.is_absolute() or path.exists():
+        return path
+    return REPO_ROOT / path
+
+
+def load_config(path) -> dict:
+    import yaml  # simple YAML loader
+    with open(resolve(path), "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+
+def iter_jsonl(path) -> Iterator[dict]:
+    """Stream the rows of a JSONL file (plain, .gz or .zst)."""
+    for line in iter_lines(resolve(path)):
+        if line.strip():
+            yield json.loads(line)
+
+
+def read_jsonl(path) -> List[dict]:
+    return list(iter_jsonl(path))
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """"i/N" -> (i, N), with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like i/N, got {value!r}") from None
+    if not 0 <= index < count:
+        raise ValueError(f"shard index must be in 0..{count - 1}, got {value!r}")
+    return index, count
+
+
+def shard_of(task_id, count: int) -> int:
+    """Stable shard of a task id: the same on every process, machine and run."""
+    return bucket_of(str(task_id), count)
+
+
+def iter_tasks(cfg: dict, skip: Optional[Set[str]] = None, shard: Optional[Tuple[int, int]] = None) -> Iterator[dict]:
+    """Stream a track's dataset, leaving out task ids in `skip` and, with shard=(i, N), other shards' tasks."""
+    for task in iter_jsonl(cfg["dataset_path"]):
+        if skip and task["id"] in skip:
+            continue
+        if shard is not None and shard_of(task["id"], shard[1]) != shard[0]:
+            continue
+        yield task
+
+
+def load_tasks(cfg: dict) -> List[dict]:
+    return list(iter_tasks(cfg))
+
+
+def write_jsonl(rows: Iterable[dict], path) -> Path:
+    out_path = Path(path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(out_path, "w", encoding="utf-8") as f:
+        for r in rows:
+            f.write(json.dumps(r, ensure_ascii=False) + "\n")
+    return out_path
+
+
+def completed_ids(path, key: str = "task_id") -> Set[str]:
+    """
+    Ids already written to a runner output, for --resume. A torn last line
+    (the writer died mid-row) is cut off so appending continues cleanly.
+    """
+    path = Path(path)
+    if not path.exists():
+        return set()
+    if codec_for(path) != "none":
+        return {json.loads(line)[key] for line in recover(path) if line.strip()}
+    done = set()
+    with open(path, "r+b") as f:
+        good = 0
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(json.loads(line)[key])
+            except (ValueError, KeyError):
+                break
+            good += len(line)
+        f.truncate(good)
+    return done
+
+
+class JsonlWriter:
+    """
+    Append-as-you-go JSONL output. Every row is flushed to the OS as it is
+    written; the file is fsynced every `fsync_every` rows or
+    `fsync_interval` seconds, whichever comes first, and on close.
+
+    For .gz / .zst paths the rows since the last fsync are written as one
+    compressed block instead (see turnstore.py).
+    """
+
+    def __init__(self, path, append: bool = False, fsync_every: int = 100, fsync_interval: float = 5.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.codec = codec_for(self.path)
+        self._f = open(self.path, "ab" if append else "wb")
+        self._block: List[str] = []
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def write(self, row: dict):
+        self.write_line(json.dumps(row, ensure_ascii=False) + "\n")
+
+    def write_line(self, line: str):
+        """Write an already serialised row (ending in a newline)."""
+        if self.codec == "none":
+            self._f.write(line.encode("utf-8"))
+            self._f.flush()
+        else:
+            self._block.append(line)
+        self.count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        if self._block:
+            self._f.write(compress_block("".join(self._block).encode("utf-8"), self.codec))
+            self._block = []
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def close(self):
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+async def for_each(items: Iterable, fn: Callable[..., Awaitable], concurrency: int):
+    """Await fn(item) for every item, at most `concurrency` at a time, pulling items lazily."""
+    pending = iter(items)
+
+    async def worker():
+        for item in pending:
+            await fn(item)
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+def add_output_args(parser):
+    """The streaming-output options shared by the runners."""
+    parser.add_argument("--resume", action="store_true",
+                        help="Keep --out and skip task ids already in it (default: overwrite)")
+    parser.add_argument("--fsync-every", type=int, default=100, help="fsync the output every N results")
+    parser.add_argument("--shard", type=_shard_arg, metavar="i/N",
+                        help="Run only the tasks whose id hashes to shard i of N (merge with merge_shards.py)")
+
+
+def _shard_arg(value: str):
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
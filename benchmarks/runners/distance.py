@@ -0,0 +1,129 @@
+"""
+Semantic distance between benchmark texts, computed in batches.
+
+Backends:
+
+    ngram   hashed character n-gram vectors (n = 2..4, lower-cased, padded),
+            cosine distance; NumPy only, deterministic across runs
+    clip    CLIP text embeddings via por_multimodal.clip_loader (torch + clip)
+    length  the original |len(a) - len(b)| / 100 placeholder
+
+Every distinct string in a batch is embedded once, and vectors are kept in
+an LRU (por_multimodal's EmbeddingCache) so text repeated across turns and
+batches, e.g. each turn's input being the previous turn's output, is not
+embedded again.
+"""
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+
+from por_multimodal.resonance_mm import EmbeddingCache
+
+BACKENDS = ("ngram", "clip", "length")
+
+_FNV_OFFSET = np.uint32(0x811C9DC5)
+_FNV_PRIME = np.uint32(0x01000193)
+_GOLDEN = np.uint32(0x9E3779B1)
+
+
+class NgramEncoder:
+    """Bag of hashed character n-grams, `dim` (a power of two) buckets per vector."""
+
+    def __init__(self, dim: int = 1024, ngrams: Tuple[int, ...] = (2, 3, 4)):
+        if dim & (dim - 1):
+            raise ValueError("dim must be a power of two")
+        self.dim = dim
+        self.shift = np.uint32(32 - dim.bit_length() + 1)
+        self.ngrams = ngrams
+
+    def embed_texts(self, texts: Sequence[str]) -> np.ndarray:
+        if not len(texts):
+            return np.zeros((0, self.dim), dtype=np.float32)
+        encoded = [np.frombuffer(f" {t.lower()} ".encode("utf-32-le"), dtype=np.uint32) for t in texts]
+        lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+        codes = np.concatenate(encoded)
+        row = np.repeat(np.arange(len(texts)), lengths)
+        # Code points left in the string from each position (1 at its last character).
+        room = np.repeat(np.cumsum(lengths), lengths) - np.arange(len(codes))
+
+        # FNV-1a, extended one code point at a time: after the pass for n,
+        # h[i] is the hash of codes[i:i + n] (wrapping uint32 arithmetic).
+        flat = []
+        h = (_FNV_OFFSET ^ codes) * _FNV_PRIME
+        for n in range(2, max(self.ngrams) + 1):
+            h = (h[:-1] ^ codes[n - 1:]) * _FNV_PRIME
+            if n in self.ngrams:
+                start = np.flatnonzero(room[:len(h)] >= n)
+                bucket = ((h[start] ^ np.uint32(n)) * _GOLDEN) >> self.shift
+                flat.append(row[start] * self.dim + bucket)
+        counts = np.bincount(np.concatenate(flat), minlength=len(texts) * self.dim)
+        return counts.reshape(len(texts), self.dim).astype(np.float32)
+
+
+class Batched:
+    """Feeds an encoder at most `size` texts per call."""
+
+    def __init__(self, encoder, size: int = 1024):
+        self.encoder = encoder
+        self.size = size
+
+    def embed_texts(self, texts):
+        texts = list(texts)
+        return np.concatenate(
+            [self.encoder.embed_texts(texts[i:i + self.size]) for i in range(0, len(texts), self.size)]
+        )
+
+
+class LengthDistance:
+    """The original placeholder: |len(a) - len(b)| / 100."""
+
+    def distances(self, a: Sequence[str], b: Sequence[str]) -> np.ndarray:
+        len_a = np.fromiter(map(len, a), dtype=np.int64, count=len(a))
+        len_b = np.fromiter(map(len, b), dtype=np.int64, count=len(b))
+        return np.abs(len_a - len_b) / 100
+
+
+class EmbeddingDistance:
+    """Cosine distance (1 - cos) between cached, unit-normalised embeddings."""
+
+    # Pairs per dot-product chunk, bounding the gathered vectors' memory.
+    CHUNK = 4096
+
+    def __init__(self, encoder, batch_size: int = 1024, cache_size: int = 16384):
+        self.cache = EmbeddingCache(Batched(encoder, batch_size), maxsize=cache_size)
+
+    def distances(self, a: Sequence[str], b: Sequence[str]) -> np.ndarray:
+        if not len(a):
+            return np.zeros(0)
+        index: Dict[str, int] = {}
+        ia = np.array([index.setdefault(s, len(index)) for s in a])
+        ib = np.array([index.setdefault(s, len(index)) for s in b])
+        vecs, _ = self.cache.texts(list(index))
+        cos = np.concatenate([
+            np.einsum("ij,ij->i", vecs[ia[i:i + self.CHUNK]], vecs[ib[i:i + self.CHUNK]], dtype=np.float64)
+            for i in range(0, len(ia), self.CHUNK)
+        ])
+        # Identical strings share an index; keep them at exactly 0 despite float32 rounding.
+        return np.where(ia == ib, 0.0, np.clip(1.0 - cos, 0.0, None))
+
+
+def make_engine(backend: str = "ngram", cache_size: int = 16384):
+    if backend == "ngram":
+        return EmbeddingDistance(NgramEncoder(), cache_size=cache_size)
+    if backend == "clip":
+        from por_multimodal.clip_loader import CLIPLoader
+
+        return EmbeddingDistance(CLIPLoader(), batch_size=256, cache_size=cache_size)
+    if backend == "length":
+        return LengthDistance()
+    raise ValueError(f"unknown distance backend {backend!r}; choose from {', '.join(BACKENDS)}")
+
+
+_engines: Dict[str, object] = {}
+
+
+def get_engine(backend: str = "ngram"):
+    """The process-wide engine for a backend, created on first use."""
+    if backend not in _engines:
+        _engines[backend] = make_engine(backend)
+    return _engines[backend]
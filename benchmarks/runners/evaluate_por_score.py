@@ -1,11 +1,50 @@
-import json
+"""
+Score resonance runs and their PoR-Gain over the solo run of the same task.
+
+    python benchmarks/runners/evaluate_por_score.py --solo solo.jsonl --res resonance.jsonl \\
+        --config benchmarks/configs/reasoning_v1.yaml --out eval.jsonl --workers 4
+
+The two files are merge-joined on task_id without loading either: inputs
+already sorted by task_id stream straight through; otherwise they are
+sorted externally (--chunk-rows rows in memory at a time). With --workers
+N both inputs are first split into N buckets by a hash of task_id and each
+bucket is sorted, joined and scored in its own process. Turn distances are
+computed --batch-size rows at a time by the --distance backend (see
+distance.py).
+
+Output rows are in task_id order (per bucket when --workers > 1). A
+resonance row without turns is written with null scores and an "error".
+"""
 import argparse
-from pathlib import Path
+import json
+import os
+import shutil
 import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import numpy as np  # noqa: E402
+
+from benchmarks.runners.common import load_config, resolve  # noqa: E402
+from benchmarks.runners.distance import BACKENDS, get_engine  # noqa: E402
+from benchmarks.runners.joins import Unsorted, external_sort, merge_join, partition, sorted_rows  # noqa: E402
+from benchmarks.runners.turnstore import turns  # noqa: E402
+
+DEFAULT_DISTANCE = "ngram"
+
+def semantic_distance(a: str, b: str, distance: str = DEFAULT_DISTANCE) -> float:
+    return float(semantic_distances([a], [b], distance)[0])
 
-def semantic_distance(a: str, b: str) -> float:
-    # TODO: replace with real embedding distance (GPT/Grok)
-    return abs(len(a) - len(b)) / 100
+def semantic_distances(a: Sequence[str], b: Sequence[str], distance: str = DEFAULT_DISTANCE) -> np.ndarray:
+    """semantic_distance over two equal-length sequences of strings at once."""
+    return get_engine(distance).distances(a, b)
 
 def compute_task_score(resonance_turns):
     # Placeholder heuristic: more stable chain = higher score
@@ -33,78 +72,163 @@ def compute_por_gain(solo_score, multi_score):
         return 0
     return (multi_score - solo_score) / solo_score
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--solo", required=True, help="solo run jsonl")
-    parser.add_argument("--res", required=True, help="resonance run jsonl")
-    parser.add_argument("--config", required=True)
-    parser.add_argument("--out", required=True)
-    args = parser.parse_args()
-
-    import yaml
-    with open(args.config, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
-
+def score_batch(pairs: Sequence[Tuple[dict, Optional[dict]]], cfg: dict,
+                distance: str = DEFAULT_DISTANCE) -> List[dict]:
+    """
+    Score (resonance row, solo row or None) pairs; the batched equivalent of
+    compute_task_score / compute_harmonic_score / compute_drift_score.
+    A row without turns cannot be scored: it gets null scores and an "error".
+    """
     w1 = cfg["weights"]["w1"]
     w2 = cfg["weights"]["w2"]
     w3 = cfg["weights"]["w3"]
 
-    # Load solo results
-    solo_map = {}
-    with open(args.solo, "r", encoding="utf-8") as f:
-        for line in f:
-            r = json.loads(line)
-            solo_map[r["task_id"]] = r
-
-    # Load resonance results
-    res_map = {}
-    with open(args.res, "r", encoding="utf-8") as f:
-        for line in f:
-            r = json.loads(line)
-            res_map[r["task_id"]] = r
+    counts = np.array([len(res_r["turns"]) for res_r, _ in pairs], dtype=np.int64)
+    inputs, a_outputs, b_outputs = [], [], []
+    for res_r, _ in pairs:
+        for _, inp, a, b in turns(res_r):
+            inputs.append(inp)
+            a_outputs.append(a)
+            b_outputs.append(b)
+    n = len(b_outputs)
+    row = np.repeat(np.arange(len(pairs)), counts)
+    # a_output vs b_output (harmony) and input vs b_output (drift) in one call.
+    d = semantic_distances(a_outputs + inputs, b_outputs * 2, distance) if n else np.zeros(0)
+    per_row = np.maximum(counts, 1)
+    harmonic = np.maximum(0.0, 1.0 - np.bincount(row, weights=d[:n], minlength=len(pairs)) / per_row)
+    drift = np.maximum(0.0, 1.0 - np.bincount(row, weights=d[n:], minlength=len(pairs)) / per_row)
+    task = np.minimum(1.0, 0.5 + counts * 0.05)
+    total = w1 * task + w2 * harmonic + w3 * drift
 
     outputs = []
-
-    for task_id in res_map:
-        res_r = res_map[task_id]
-        solo_r = solo_map.get(task_id)
-
-        turns = res_r["turns"]
-
-        # compute 3 metric components
-        task_score = compute_task_score(turns)
-        harmonic_score = compute_harmonic_score(turns)
-        drift_score = compute_drift_score(turns)
-
-        # weighted PoR total
-        por_total = (
-            w1 * task_score +
-            w2 * harmonic_score +
-            w3 * drift_score
-        )
-
-        # PoR Gain
-        solo_score = solo_r.get("task_score", 0)
-        por_gain = compute_por_gain(solo_score, task_score)
-
+    for i, (res_r, solo_r) in enumerate(pairs):
+        solo_score = (solo_r or {}).get("task_score", 0)
+        task_score = float(task[i])
+        if not counts[i]:
+            outputs.append({
+                "task_id": res_r["task_id"],
+                "solo_score": solo_score,
+                "task_score": task_score,
+                "harmonic_score": None,
+                "drift_score": None,
+                "por_total": None,
+                "por_gain": None,
+                "error": "no resonance turns",
+            })
+            continue
         outputs.append({
-            "task_id": task_id,
+            "task_id": res_r["task_id"],
             "solo_score": solo_score,
             "task_score": task_score,
-            "harmonic_score": harmonic_score,
-            "drift_score": drift_score,
-            "por_total": por_total,
-            "por_gain": por_gain,
+            "harmonic_score": float(harmonic[i]),
+            "drift_score": float(drift[i]),
+            "por_total": float(total[i]),
+            "por_gain": compute_por_gain(solo_score, task_score),
         })
+    return outputs
+
+def evaluate(solo_results, res_results, cfg: dict, distance: str = DEFAULT_DISTANCE):
+    """Score each resonance result and its PoR-Gain over the solo result for the same task (in memory)."""
+    solo_map = {r["task_id"]: r for r in solo_results}
+    res_map = {r["task_id"]: r for r in res_results}
+    if not res_map:
+        return []
+    return score_batch([(res_r, solo_map.get(task_id)) for task_id, res_r in res_map.items()], cfg, distance)
+
+def _batches(joined: Iterator[Tuple[str, str, Optional[str]]], size: int) -> Iterator[List[Tuple[dict, Optional[dict]]]]:
+    batch = []
+    for _, res_line, solo_line in joined:
+        batch.append((json.loads(res_line), json.loads(solo_line) if solo_line else None))
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _write_scores(joined, cfg: dict, out, batch_size: int, distance: str) -> int:
+    n = 0
+    for batch in _batches(joined, batch_size):
+        for r in score_batch(batch, cfg, distance):
+            out.write(json.dumps(r, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+def evaluate_files(solo_path, res_path, cfg: dict, out_path, tmp_dir: Optional[str] = None,
+                   chunk_rows: int = 100_000, batch_size: int = 1024, distance: str = DEFAULT_DISTANCE) -> int:
+    """
+    Stream-score two runner outputs into `out_path`; returns rows written.
+    Sorted inputs are joined directly, anything else via external sort.
+    """
+    tmp_out = Path(f"{out_path}.tmp")
+    try:
+        try:
+            with open(tmp_out, "w", encoding="utf-8") as out:
+                n = _write_scores(merge_join(sorted_rows(res_path), sorted_rows(solo_path)), cfg, out, batch_size,
+                                  distance)
+        except Unsorted:
+            with open(tmp_out, "w", encoding="utf-8") as out:
+                n = _write_scores(
+                    merge_join(external_sort(res_path, tmp_dir, chunk_rows),
+                               external_sort(solo_path, tmp_dir, chunk_rows)),
+                    cfg, out, batch_size, distance,
+                )
+    except BaseException:
+        tmp_out.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_out, out_path)
+    return n
+
+def evaluate_sharded(solo_path, res_path, cfg: dict, out_path, workers: int, tmp_dir: Optional[str] = None,
+                     chunk_rows: int = 100_000, batch_size: int = 1024, distance: str = DEFAULT_DISTANCE) -> int:
+    """Hash-partition both inputs into `workers` buckets and evaluate each bucket in its own process."""
+    work = Path(tempfile.mkdtemp(prefix="por-eval-", dir=tmp_dir))
+    try:
+        res_buckets, solo_buckets = partition([res_path, solo_path], workers, work)
+        parts = [work / f"scores{b}.jsonl" for b in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            counts = list(pool.map(
+                evaluate_files,
+                solo_buckets, res_buckets, [cfg] * workers, parts,
+                [str(work)] * workers, [chunk_rows] * workers, [batch_size] * workers, [distance] * workers,
+            ))
+        tmp_out = Path(f"{out_path}.tmp")
+        with open(tmp_out, "wb") as out:
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        os.replace(tmp_out, out_path)
+        return sum(counts)
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--solo", required=True, help="solo run jsonl")
+    parser.add_argument("--res", required=True, help="resonance run jsonl")
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--out", required=True)
+    parser.add_argument("--workers", type=int, default=1, help="Processes (inputs are hash-partitioned)")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Rows held in memory per external sort run")
+    parser.add_argument("--batch-size", type=int, default=1024, help="Rows scored per NumPy batch")
+    parser.add_argument("--tmp-dir", help="Directory for sort runs and buckets (default: system temp)")
+    parser.add_argument("--distance", choices=BACKENDS, default=DEFAULT_DISTANCE,
+                        help="Turn distance: hashed char n-grams, CLIP text embeddings or the length placeholder")
+    args = parser.parse_args()
 
+    cfg = load_config(args.config)
+    solo_path, res_path = resolve(args.solo), resolve(args.res)
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        for o in outputs:
-            f.write(json.dumps(o, ensure_ascii=False) + "\n")
+    started = time.perf_counter()
+    if args.workers > 1:
+        n = evaluate_sharded(solo_path, res_path, cfg, out_path, args.workers, args.tmp_dir,
+                             args.chunk_rows, args.batch_size, args.distance)
+    else:
+        n = evaluate_files(solo_path, res_path, cfg, out_path, args.tmp_dir,
+                           args.chunk_rows, args.batch_size, args.distance)
 
-    print(f"Saved PoR evaluation → {out_path}")
+    print(f"Saved PoR evaluation of {n} tasks → {out_path} ({time.perf_counter() - started:.2f}s)")
 
 if __name__ == "__main__":
     main()
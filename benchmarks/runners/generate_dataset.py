@@ -0,0 +1,206 @@
+"""
+Synthetic task files for benchmarking the runners at realistic sizes.
+
+    python benchmarks/runners/generate_dataset.py --size 1000000 \\
+        --prompt-words lognormal:60:0.8 --out-dir benchmarks/datasets/synthetic
+
+Writes <out-dir>/<track>_tasks.jsonl (.gz / .zst with --suffix) in the
+layout of benchmarks/datasets, plus <out-dir>/<track>.yaml: the track's
+config with dataset_path pointing at the new file, ready for the runners.
+
+    reasoning   arithmetic, ordering and syllogism questions with reference answers
+    memory      a fact to remember, filler, then a question about the fact
+    creative    co-writing briefs on random genres and topics
+
+Prompt lengths (in words) are drawn from --prompt-words; prompts are padded
+with filler sentences to reach them (a template's own words are the
+minimum):
+
+    fixed:N                 every prompt N words
+    uniform:LO:HI           uniform between LO and HI
+    lognormal:MEDIAN:SIGMA  long-tailed, like real prompts (capped at --max-words)
+
+Output is deterministic for a given --seed, and a smaller --size is a
+prefix of a larger one.
+"""
+import argparse
+import json
+import math
+import random
+import sys
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+import yaml  # noqa: E402
+
+from benchmarks.runners.common import REPO_ROOT, JsonlWriter, load_config  # noqa: E402
+
+TRACKS = ("reasoning", "memory", "creative")
+
+_ITEMS = ["apples", "pears", "marbles", "books", "coins", "stamps", "shells", "pencils", "cards", "tickets"]
+_NAMES = ["Ava", "Ben", "Chen", "Dara", "Eli", "Fatima", "Gus", "Hana", "Ivan", "Jo", "Kofi", "Lena"]
+_NONSENSE = ["Bloops", "Razzles", "Wimbos", "Flurbs", "Glims", "Quorps", "Snazzles", "Trobs", "Zents", "Mivs"]
+_THINGS = ["color", "number", "city", "animal", "password", "planet", "fruit", "instrument"]
+_VALUES = ["TURQUOISE", "SAFFRON", "OBSIDIAN", "LAVENDER", "COBALT", "MAGENTA", "AMBER", "VERMILION",
+           "4817", "9203", "OSLO", "LIMA", "OTTER", "FALCON", "NEPTUNE", "KIWI", "OBOE", "MARIMBA"]
+_GENRES = ["sci-fi", "fantasy", "mystery", "solarpunk", "noir", "fairy-tale", "horror", "comedy"]
+_TOPICS = ["floating cities above an ocean world", "a library that rewrites itself at night",
+           "the last lighthouse keeper on a tidally locked moon", "a market where memories are traded",
+           "a train that never stops", "a forest that migrates every winter", "a clockmaker who can pause rain",
+           "two rival orchestras on a generation ship"]
+_FOCUS = ["coherence and one central idea", "vivid sensory detail", "a surprising final twist",
+          "a single consistent voice", "dialogue between two characters"]
+_FILLER = ("the a of and to in is was that for on with as by at from it this an be are or which "
+           "river stone window quiet market signal garden paper engine winter copper harbor lantern "
+           "morning ladder orchard thread mirror valley compass meadow bridge archive kettle cloud "
+           "walks carries opens follows remembers builds answers crosses gathers turns listens waits "
+           "slowly nearby often together later again softly never always almost").split()
+
+
+def parse_lengths(spec: str, max_words: int = 4000) -> Callable[[random.Random], int]:
+    """A sampler of prompt lengths in words from "fixed:N", "uniform:LO:HI" or "lognormal:MEDIAN:SIGMA"."""
+    kind, _, rest = spec.partition(":")
+    try:
+        args = [float(x) for x in rest.split(":")] if rest else []
+        if kind == "fixed" and len(args) == 1:
+            n = int(args[0])
+            return lambda rng: n
+        if kind == "uniform" and len(args) == 2:
+            lo, hi = int(args[0]), int(args[1])
+            return lambda rng: rng.randint(lo, hi)
+        if kind == "lognormal" and len(args) == 2:
+            mu, sigma = math.log(args[0]), args[1]
+            return lambda rng: min(max_words, int(rng.lognormvariate(mu, sigma)))
+    except ValueError:
+        pass
+    raise ValueError(f"bad prompt length spec {spec!r}; use fixed:N, uniform:LO:HI or lognormal:MEDIAN:SIGMA")
+
+
+# Filler is sliced from one fixed random word sequence at a random offset,
+# which is much cheaper than drawing every word.
+_CORPUS_WORDS = 1 << 16
+_corpus = random.Random("filler").choices(_FILLER, k=_CORPUS_WORDS)
+
+
+def filler(rng: random.Random, words: int) -> str:
+    """About `words` words of filler sentences."""
+    ws = []
+    while len(ws) < words:
+        start = int(rng.random() * _CORPUS_WORDS)
+        ws += _corpus[start:start + words - len(ws)]
+    sentences, i = [], 0
+    while i < words:
+        n = 8 + int(rng.random() * 7)  # 8-14 words per sentence
+        sentences.append(" ".join(ws[i:i + n]).capitalize() + ".")
+        i += n
+    return " ".join(sentences)
+
+
+def _reasoning(rng: random.Random):
+    kind = rng.randrange(4)
+    if kind == 0:
+        item = rng.choice(_ITEMS)
+        a, b = rng.randint(2, 50), rng.randint(1, 50)
+        c = rng.randint(1, a + b)
+        return (f"You have {a} {item} and buy {b} more. Then you give away {c} {item}. "
+                f"How many {item} are left?", str(a + b - c))
+    if kind == 1:
+        item = rng.choice(_ITEMS)
+        a, b = rng.randint(2, 30), rng.randint(2, 30)
+        return f"A box holds {a} {item}. How many {item} are in {b} boxes?", str(a * b)
+    if kind == 2:
+        p, q, r = rng.sample(_NAMES, 3)
+        return f"{p} is taller than {q}, and {q} is taller than {r}. Who is the shortest?", r
+    x, y, z = rng.sample(_NONSENSE, 3)
+    if rng.random() < 0.5:
+        return (f"If all {x} are {y}, and some {y} are {z}, is it necessarily true that some {x} are {z}? "
+                f"Answer 'yes' or 'no' and explain.", "no")
+    return (f"If all {x} are {y}, and all {y} are {z}, is it necessarily true that all {x} are {z}? "
+            f"Answer 'yes' or 'no' and explain.", "yes")
+
+
+def generate(track: str, size: int, lengths: Callable[[random.Random], int], seed: int = 0) -> Iterator[dict]:
+    """`size` tasks of a track, each prompt padded to a length drawn from `lengths`."""
+    if track not in TRACKS:
+        raise ValueError(f"unknown track {track!r}; choose from {', '.join(TRACKS)}")
+    rng = random.Random(f"{track}:{seed}")
+    for i in range(size):
+        target = lengths(rng)
+        task = {"id": f"{track}_{i + 1:07d}", "track": track}
+        if track == "reasoning":
+            question, answer = _reasoning(rng)
+            pad = target - len(question.split())
+            task["prompt"] = (filler(rng, pad) + "\n\n" + question) if pad > 0 else question
+            task["reference_answer"] = answer
+        elif track == "memory":
+            thing, value = rng.choice(_THINGS), rng.choice(_VALUES)
+            head = f"Remember this: the secret {thing} is {value}. I will ask you about it later."
+            tail = f"Now, answer: What is the secret {thing}?"
+            pad = target - len(head.split()) - len(tail.split())
+            task["prompt"] = f"{head}\n\n{filler(rng, pad)}\n\n{tail}" if pad > 0 else f"{head}\n\n{tail}"
+            task["reference_answer"] = value
+        else:
+            lo = rng.randint(2, 5)
+            brief = (f"Co-write a short {rng.choice(_GENRES)} concept of {lo}–{lo + 2} sentences about "
+                     f"{rng.choice(_TOPICS)}, focusing on {rng.choice(_FOCUS)}.")
+            pad = target - len(brief.split())
+            task["prompt"] = f"{brief}\n\nBackground notes: {filler(rng, pad)}" if pad > 0 else brief
+        yield task
+
+
+def write_dataset(track: str, size: int, out_path, lengths: Callable[[random.Random], int], seed: int = 0) -> int:
+    n, lines = 0, []
+    # Written 1000 lines at a time: JsonlWriter flushes every write.
+    with JsonlWriter(out_path, fsync_every=100, fsync_interval=60.0) as out:
+        for task in generate(track, size, lengths, seed):
+            lines.append(json.dumps(task, ensure_ascii=False) + "\n")
+            if len(lines) == 1000:
+                out.write_line("".join(lines))
+                n, lines = n + len(lines), []
+        if lines:
+            out.write_line("".join(lines))
+            n += len(lines)
+    return n
+
+
+def write_config(track: str, dataset_path, out_path, steps: Optional[int] = None) -> Path:
+    """The track's bundled config, pointed at `dataset_path`."""
+    cfg = load_config(REPO_ROOT / "benchmarks" / "configs" / f"{track}_v1.yaml")
+    cfg["dataset_path"] = str(Path(dataset_path).resolve())
+    if steps is not None:
+        cfg["resonance"]["steps"] = steps
+    out_path = Path(out_path)
+    out_path.write_text(yaml.safe_dump(cfg, sort_keys=False), encoding="utf-8")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic benchmark task files of any size.")
+    parser.add_argument("--track", action="append", choices=TRACKS, help="Track (repeatable; default: all)")
+    parser.add_argument("--size", type=int, default=10_000, help="Tasks per track")
+    parser.add_argument("--prompt-words", default="lognormal:40:0.75", help="Prompt length distribution (words)")
+    parser.add_argument("--max-words", type=int, default=4000, help="Cap for lognormal prompt lengths")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", type=int, help="Resonance steps in the written configs (default: the track's)")
+    parser.add_argument("--suffix", default=".jsonl", choices=(".jsonl", ".jsonl.gz", ".jsonl.zst"))
+    parser.add_argument("--out-dir", default="benchmarks/datasets/synthetic")
+    args = parser.parse_args()
+
+    try:
+        lengths = parse_lengths(args.prompt_words, args.max_words)
+    except ValueError as e:
+        parser.error(str(e))
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for track in args.track or TRACKS:
+        path = out_dir / f"{track}_tasks{args.suffix}"
+        n = write_dataset(track, args.size, path, lengths, args.seed)
+        cfg = write_config(track, path, out_dir / f"{track}.yaml", args.steps)
+        print(f"Saved {n} {track} tasks → {path} (config: {cfg})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Minimal asyncio HTTP/1.1 client shared by the load generator and the
+benchmark model clients.
+"""
+import asyncio
+import ssl
+import urllib.parse
+
+
+class HttpError(Exception):
+    pass
+
+
+class HttpClient:
+    """
+    Minimal asyncio HTTP/1.1 client with a keep-alive connection pool
+    (stdlib only, so the generator itself stays cheap and predictable).
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 256, timeout: float = 60.0):
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme not in ("http", "https"):
+            raise ValueError("only http:// and https:// targets are supported")
+        self.host = url.hostname
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.port = url.port or (443 if self.ssl else 80)
+        self.prefix = url.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def request(self, method: str, path: str, body: bytes = b"", headers: dict = None, on_data=None,
+                      on_start=None):
+        """
+        Send one request; returns (status, body bytes). on_data(bytes), if
+        given, is called with each piece of the body as it arrives: each
+        chunk of a chunked body, else the whole body once. on_start(), if
+        given, is called once a connection slot is free, before connecting.
+        """
+        async with self._slots:
+            if on_start is not None:
+                on_start()
+            conn = self._idle.pop() if self._idle else None
+            try:
+                if conn is None:
+                    conn = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+                    )
+                status, data, keep_alive = await asyncio.wait_for(
+                    self._exchange(conn, method, path, body, headers or {}, on_data), self.timeout
+                )
+            except BaseException:
+                if conn is not None:
+                    conn[1].close()
+                raise
+            if keep_alive:
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+            return status, data
+
+    async def _exchange(self, conn, method, path, body, headers, on_data=None):
+        reader, writer = conn
+        lines = [f"{method} {self.prefix}{path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin1") + body)
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise HttpError("connection closed by server")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        keep_alive = response_headers.get("connection", "").lower() != "close"
+        if response_headers.get("transfer-encoding", "").lower() == "chunked":
+            parts = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                parts.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+                if on_data is not None:
+                    on_data(parts[-1])
+            return status, b"".join(parts), keep_alive
+        elif "content-length" in response_headers:
+            data = await reader.readexactly(int(response_headers["content-length"]))
+        elif status in (204, 304) or method == "HEAD":
+            data = b""
+        else:
+            data = await reader.read()
+            keep_alive = False
+        if on_data is not None and data:
+            on_data(data)
+        return status, data, keep_alive
+
+    async def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle = []
@@ -0,0 +1,140 @@
+"""
+Bounded-memory building blocks for joining runner outputs on task_id.
+
+    sorted_rows     stream a JSONL file, raising Unsorted if ids go backwards
+    external_sort   sort a JSONL file of any size in chunks, merging spilled runs
+    partition       split JSONL files into N buckets by a stable hash of the id
+    merge_join      join two id-sorted row streams
+
+Rows are carried as raw JSON lines plus their id until they are needed, and
+ids are compared as strings.
+"""
+import heapq
+import json
+import re
+import tempfile
+import zlib
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from benchmarks.runners.turnstore import iter_lines
+
+# Runner rows put task_id before any nested object, so the first match is
+# the top-level key. Lines where it is missing fall back to a full parse.
+_TASK_ID = re.compile(r'"task_id":\s*("(?:[^"\\]|\\.)*"|[^,}\s]+)')
+
+
+class Unsorted(Exception):
+    pass
+
+
+def row_key(line: str) -> str:
+    m = _TASK_ID.search(line)
+    value = json.loads(m.group(1)) if m else json.loads(line)["task_id"]
+    return str(value)
+
+
+def keyed_lines(path) -> Iterator[Tuple[str, str]]:
+    for line in iter_lines(path):
+        if line.strip():
+            yield row_key(line), line
+
+
+def sorted_rows(path) -> Iterator[Tuple[str, str]]:
+    """(key, line) pairs of a file that should already be sorted; raises Unsorted otherwise."""
+    last = None
+    for key, line in keyed_lines(path):
+        if last is not None and key < last:
+            raise Unsorted(f"{path}: {key!r} after {last!r}")
+        last = key
+        yield key, line
+
+
+def _spill(chunk: List[Tuple[str, str]], tmp_dir: str) -> str:
+    chunk.sort(key=lambda kv: kv[0])
+    f = tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=tmp_dir, suffix=".run", delete=False)
+    with f:
+        for key, line in chunk:
+            f.write(json.dumps(key) + "\t" + line.rstrip("\n") + "\n")
+    return f.name
+
+
+def _read_run(path: str) -> Iterator[Tuple[str, str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for entry in f:
+            key, _, line = entry.partition("\t")
+            yield json.loads(key), line
+
+
+def external_sort(path, tmp_dir: Optional[str] = None, chunk_rows: int = 100_000) -> Iterator[Tuple[str, str]]:
+    """
+    (key, line) pairs of `path` in key order, holding at most `chunk_rows`
+    rows in memory. Rows with equal keys keep their file order.
+    """
+    runs, chunk = [], []
+    try:
+        for key, line in keyed_lines(path):
+            chunk.append((key, line))
+            if len(chunk) >= chunk_rows:
+                runs.append(_spill(chunk, tmp_dir))
+                chunk = []
+        if not runs:
+            chunk.sort(key=lambda kv: kv[0])
+            yield from chunk
+            return
+        if chunk:
+            runs.append(_spill(chunk, tmp_dir))
+        chunk = []
+        yield from heapq.merge(*(_read_run(r) for r in runs), key=lambda kv: kv[0])
+    finally:
+        for r in runs:
+            Path(r).unlink(missing_ok=True)
+
+
+def bucket_of(key: str, buckets: int) -> int:
+    return zlib.crc32(key.encode("utf-8")) % buckets
+
+
+def partition(paths: Iterable, buckets: int, out_dir) -> List[List[Path]]:
+    """
+    Write each input's rows to `buckets` files by a stable hash of the id.
+    Returns, per input, its bucket files.
+    """
+    out_dir = Path(out_dir)
+    result = []
+    for n, path in enumerate(paths):
+        files = [out_dir / f"input{n}-bucket{b}.jsonl" for b in range(buckets)]
+        handles = [open(p, "w", encoding="utf-8") for p in files]
+        try:
+            for key, line in keyed_lines(path):
+                handles[bucket_of(key, buckets)].write(line if line.endswith("\n") else line + "\n")
+        finally:
+            for h in handles:
+                h.close()
+        result.append(files)
+    return result
+
+
+def _last_per_key(rows: Iterator[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+    """Collapse runs of equal keys to their last row (later rows win, as in a dict)."""
+    current = None
+    for key, line in rows:
+        if current is not None and key != current[0]:
+            yield current
+        current = (key, line)
+    if current is not None:
+        yield current
+
+
+def merge_join(left: Iterator[Tuple[str, str]], right: Iterator[Tuple[str, str]]) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """
+    Left outer join of two key-sorted streams: (key, left line, right line
+    or None) for every distinct left key. Duplicate keys resolve to the
+    last row on either side.
+    """
+    left, right = _last_per_key(left), _last_per_key(right)
+    r = next(right, None)
+    for key, line in left:
+        while r is not None and r[0] < key:
+            r = next(right, None)
+        yield key, line, r[1] if r is not None and r[0] == key else None
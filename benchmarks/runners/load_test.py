@@ -0,0 +1,374 @@
+"""
+Load generator for the PoR API and dashboard.
+
+Starts `app.api` or `app.dashboard` locally (or targets --url), drives it
+with a weighted request mix and writes a JSON report with throughput,
+p50/p95/p99 latency and SLO checks per endpoint, so runs can be compared
+between commits:
+
+    python benchmarks/runners/load_test.py --mix benchmarks/configs/load_api_v1.yaml \\
+        --mode closed --concurrency 16 --duration 30 --out load_api.json
+
+    python benchmarks/runners/load_test.py --mix benchmarks/configs/load_api_v1.yaml \\
+        --mode open --rate 200 --duration 30 --baseline load_api.json
+
+Open loop sends at a fixed rate regardless of how the server keeps up, and
+measures latency from each request's scheduled send time (so a stalled
+server shows up as latency, not as a lower send rate). Closed loop keeps
+a fixed number of requests outstanding.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if __package__ in (None, ""):
+    sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.runners.http_client import HttpClient, HttpError  # noqa: E402
+
+DEFAULT_MIX = {
+    "api": REPO_ROOT / "benchmarks" / "configs" / "load_api_v1.yaml",
+    "dashboard": REPO_ROOT / "benchmarks" / "configs" / "load_dashboard_v1.yaml",
+}
+
+PERCENTILES = (50, 95, 99)
+
+
+def _fill(value, rng: random.Random):
+    """Replace "$rand" placeholders (e.g. a seed that should miss the cache)."""
+    if value == "$rand":
+        return rng.randrange(2**31)
+    if isinstance(value, dict):
+        return {k: _fill(v, rng) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_fill(v, rng) for v in value]
+    return value
+
+
+class Endpoint:
+    """One weighted entry of a request mix."""
+
+    def __init__(self, spec: dict):
+        self.name = spec["name"]
+        self.weight = float(spec.get("weight", 1))
+        self.method = spec.get("method", "POST" if ("json" in spec or "form" in spec) else "GET").upper()
+        self.path = spec["path"]
+        self.json = spec.get("json")
+        self.form = spec.get("form")
+        self.headers = dict(spec.get("headers") or {})
+        self.slo = dict(spec.get("slo") or {})
+
+    def build(self, rng: random.Random):
+        headers = dict(self.headers)
+        body = b""
+        if self.json is not None:
+            body = json.dumps(_fill(self.json, rng)).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        elif self.form is not None:
+            body = urllib.parse.urlencode(_fill(self.form, rng)).encode("ascii")
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        return self.method, self.path, body, headers
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = defaultdict(list)   # endpoint -> latencies (s) of 2xx/3xx responses
+        self.statuses = defaultdict(Counter)
+        self.dropped = 0
+
+    def add(self, endpoint: str, latency: float, status):
+        self.statuses[endpoint][str(status)] += 1
+        if isinstance(status, int) and status < 400:
+            self.samples[endpoint].append(latency)
+
+
+async def _send(client, endpoint, rng, recorder, started, measured=True):
+    method, path, body, headers = endpoint.build(rng)
+    try:
+        status, _ = await client.request(method, path, body, headers)
+    except asyncio.TimeoutError:
+        status = "timeout"
+    except (OSError, HttpError, asyncio.IncompleteReadError, ValueError) as e:
+        status = type(e).__name__
+    if measured:
+        recorder.add(endpoint.name, time.perf_counter() - started, status)
+
+
+def _picker(mix, rng):
+    weights = [e.weight for e in mix]
+    return lambda: rng.choices(mix, weights)[0]
+
+
+async def closed_loop(client, mix, recorder, concurrency, warmup, duration, seed):
+    rng = random.Random(seed)
+    pick = _picker(mix, rng)
+    measure_from = time.perf_counter() + warmup
+    stop = measure_from + duration
+
+    async def user():
+        while True:
+            started = time.perf_counter()
+            if started >= stop:
+                break
+            await _send(client, pick(), rng, recorder, started, measured=started >= measure_from)
+
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def open_loop(client, mix, recorder, rate, warmup, duration, seed, poisson, max_outstanding):
+    rng = random.Random(seed)
+    pick = _picker(mix, rng)
+    start = time.perf_counter()
+    measure_from, stop = start + warmup, start + warmup + duration
+    outstanding = set()
+    intended = start
+
+    while intended < stop:
+        delay = intended - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # Requests are attributed to the window they were scheduled in.
+        measured = intended >= measure_from
+        if len(outstanding) >= max_outstanding:
+            recorder.dropped += measured
+        else:
+            task = asyncio.ensure_future(_send(client, pick(), rng, recorder, intended, measured))
+            outstanding.add(task)
+            task.add_done_callback(outstanding.discard)
+        intended += rng.expovariate(rate) if poisson else 1.0 / rate
+
+    if outstanding:
+        await asyncio.gather(*outstanding)
+
+
+def percentile(sorted_values, p: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarise(latencies, statuses: Counter, duration: float) -> dict:
+    latencies = sorted(latencies)
+    total = sum(statuses.values())
+    ok = len(latencies)
+    summary = {
+        "requests": total,
+        "ok": ok,
+        "errors": total - ok,
+        "error_rate": (total - ok) / total if total else 0.0,
+        "throughput_rps": ok / duration if duration else 0.0,
+        "statuses": dict(sorted(statuses.items())),
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            **{f"p{p}": percentile(latencies, p) * 1000 for p in PERCENTILES},
+            "mean": sum(latencies) / ok * 1000,
+            "max": latencies[-1] * 1000,
+        }
+    return summary
+
+
+def check_slo(summary: dict, slo: dict) -> dict:
+    """Compare a summary against limits like {"p95_ms": 250, "error_rate": 0.01}."""
+    checks = {}
+    for name, limit in slo.items():
+        if name == "error_rate":
+            actual = summary["error_rate"]
+        elif name == "min_rps":
+            actual = summary["throughput_rps"]
+        else:
+            actual = summary.get("latency_ms", {}).get(name.replace("_ms", ""), float("inf"))
+        ok = actual >= limit if name == "min_rps" else actual <= limit
+        checks[name] = {"limit": limit, "actual": actual, "ok": ok}
+    return checks
+
+
+def git_revision() -> dict:
+    def git(*args):
+        out = subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True)
+        return out.stdout.strip() if out.returncode == 0 else None
+
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(target: str, port: int, env: dict, timeout: float = 60.0) -> subprocess.Popen:
+    """Start `uvicorn app.<target>:app` from the repo root and wait until it answers."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"app.{target}:app", "--host", "127.0.0.1",
+         "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT), **env},
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"app.{target} exited with code {proc.returncode}")
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=1):
+                return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"app.{target} did not start within {timeout:.0f}s")
+
+
+def print_report(report: dict, baseline: dict = None):
+    def fmt(summary, key):
+        return f"{summary.get('latency_ms', {}).get(key, float('nan')):9.1f}"
+
+    print(f"\n{'endpoint':<22}{'reqs':>8}{'err%':>7}{'rps':>9}{'p50':>10}{'p95':>10}{'p99':>10}  (ms)")
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        print(f"{name:<22}{s['requests']:>8}{s['error_rate'] * 100:>7.1f}{s['throughput_rps']:>9.1f}"
+              f"{fmt(s, 'p50')} {fmt(s, 'p95')} {fmt(s, 'p99')}")
+        old = baseline and (baseline["total"] if name == "TOTAL" else baseline["endpoints"].get(name))
+        if old:
+            deltas = []
+            for key in ("p50", "p95", "p99"):
+                a, b = old.get("latency_ms", {}).get(key), s.get("latency_ms", {}).get(key)
+                if a and b:
+                    deltas.append(f"{key} {(b - a) / a * 100:+.0f}%")
+            if old["throughput_rps"]:
+                deltas.insert(0, f"rps {(s['throughput_rps'] - old['throughput_rps']) / old['throughput_rps'] * 100:+.0f}%")
+            print(f"{'':<22}vs {baseline['meta']['git'].get('commit')}: " + ", ".join(deltas))
+
+    failed = [(name, check) for name, checks in report["slo"].items() for check, v in checks.items() if not v["ok"]]
+    for name, check in failed:
+        v = report["slo"][name][check]
+        print(f"SLO FAIL {name}: {check} = {v['actual']:.3f} (limit {v['limit']})")
+    if report["dropped"]:
+        print(f"{report['dropped']} requests not sent: --max-outstanding reached")
+
+
+async def run_load(args, mix, slo, base_url):
+    client = HttpClient(base_url, max_connections=args.max_connections, timeout=args.timeout)
+    recorder = Recorder()
+    try:
+        if args.mode == "closed":
+            await closed_loop(client, mix, recorder, args.concurrency, args.warmup, args.duration, args.seed)
+        else:
+            await open_loop(client, mix, recorder, args.rate, args.warmup, args.duration, args.seed,
+                            args.poisson, args.max_outstanding)
+    finally:
+        await client.close()
+
+    endpoints = {e.name: summarise(recorder.samples[e.name], recorder.statuses[e.name], args.duration) for e in mix}
+    total = summarise(
+        [x for e in mix for x in recorder.samples[e.name]],
+        sum((recorder.statuses[e.name] for e in mix), Counter()),
+        args.duration,
+    )
+    slo_report = {e.name: check_slo(endpoints[e.name], e.slo) for e in mix if e.slo}
+    if slo:
+        slo_report["TOTAL"] = check_slo(total, slo)
+    return endpoints, total, slo_report, recorder.dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the PoR API or dashboard.")
+    parser.add_argument("--mix", help="YAML request mix (default: the bundled mix for --target)")
+    parser.add_argument("--target", choices=sorted(DEFAULT_MIX), help="App to start locally (default: from the mix)")
+    parser.add_argument("--url", help="Test a running server instead of starting one")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=8, help="Closed loop: requests kept outstanding")
+    parser.add_argument("--rate", type=float, default=50.0, help="Open loop: requests per second")
+    parser.add_argument("--poisson", action="store_true", help="Open loop: exponential inter-arrival times")
+    parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--max-outstanding", type=int, default=2000, help="Open loop: cap on in-flight requests")
+    parser.add_argument("--max-connections", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mix and $rand values")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Environment for the spawned server (repeatable)")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--baseline", help="Earlier JSON report to compare against")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 if an SLO fails")
+    args = parser.parse_args()
+
+    import yaml
+    mix_path = args.mix or DEFAULT_MIX[args.target or "api"]
+    with open(mix_path, "r", encoding="utf-8") as f:
+        cfg = yaml.safe_load(f)
+    mix = [Endpoint(spec) for spec in cfg["mix"]]
+    target = args.target or cfg.get("target", "api")
+
+    proc = None
+    if args.url:
+        base_url = args.url
+    else:
+        port = free_port()
+        env = dict(cfg.get("env") or {})
+        env.update(item.split("=", 1) for item in args.env)
+        proc = spawn_server(target, port, {k: str(v) for k, v in env.items()})
+        base_url = f"http://127.0.0.1:{port}"
+
+    try:
+        endpoints, total, slo_report, dropped = asyncio.run(run_load(args, mix, cfg.get("slo"), base_url))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    report = {
+        "meta": {
+            "git": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "target": args.url or f"app.{target}",
+            "mix": str(mix_path),
+            "mode": args.mode,
+            "concurrency": args.concurrency if args.mode == "closed" else None,
+            "rate": args.rate if args.mode == "open" else None,
+            "poisson": args.poisson,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+        },
+        "total": total,
+        "endpoints": endpoints,
+        "slo": slo_report,
+        "dropped": dropped,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved load report → {out_path}")
+
+    if args.check and any(not v["ok"] for checks in slo_report.values() for v in checks.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
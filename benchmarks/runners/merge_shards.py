@@ -0,0 +1,117 @@
+"""
+Merge the outputs of a sharded run into one file, checking coverage.
+
+    for i in 0 1 2 3; do
+        python benchmarks/runners/run_solo.py --config cfg.yaml --model gpt5 \\
+            --shard $i/4 --out solo.$i.jsonl &
+    done; wait
+    python benchmarks/runners/merge_shards.py --config cfg.yaml --shards 4 \\
+        --out solo.jsonl solo.0.jsonl solo.1.jsonl solo.2.jsonl solo.3.jsonl
+
+Checks that no task id appears twice, that every dataset task (--config)
+is present and nothing else is, that no file ends in a torn row, and (with
+--shards N) that each file holds a single shard's tasks. Inputs are copied
+line by line in argument order; the output is only written when every
+check passes, unless --force (duplicates then keep their first row).
+"""
+import argparse
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import JsonlWriter, iter_tasks, load_config, resolve, shard_of  # noqa: E402
+from benchmarks.runners.joins import row_key  # noqa: E402
+from benchmarks.runners.turnstore import iter_lines  # noqa: E402
+
+EXAMPLES = 10
+
+
+def merge_shards(paths: List, out_path, expected=None, shards=None, force: bool = False) -> Dict:
+    """
+    Concatenate `paths` into `out_path`, validating as it goes; returns a
+    report dict whose "ok" says whether every check passed.
+    """
+    out_path = Path(out_path)
+    tmp_out = out_path.with_name(f".{out_path.name}")
+    seen = set()
+    report = {"files": [], "rows": 0, "duplicates": [], "unexpected": [], "torn": [], "mixed_shards": []}
+    with JsonlWriter(tmp_out, append=False) as out:
+        for path in paths:
+            rows, file_shards = 0, set()
+            for line in iter_lines(resolve(path)):
+                if not line.strip():
+                    continue
+                if not line.endswith("\n"):
+                    report["torn"].append(str(path))
+                    break
+                key = row_key(line)
+                if shards:
+                    file_shards.add(shard_of(key, shards))
+                if key in seen:
+                    report["duplicates"].append(key)
+                    continue
+                if expected is not None and key not in expected:
+                    report["unexpected"].append(key)
+                seen.add(key)
+                out.write_line(line)
+                rows += 1
+            if len(file_shards) > 1:
+                report["mixed_shards"].append(str(path))
+            report["files"].append({"path": str(path), "rows": rows,
+                                    "shard": f"{min(file_shards)}/{shards}" if len(file_shards) == 1 else None})
+            report["rows"] += rows
+    report["missing"] = sorted(expected - seen) if expected is not None else []
+    report["ok"] = not any(report[k] for k in ("duplicates", "unexpected", "torn", "mixed_shards", "missing"))
+    if report["ok"] or force:
+        os.replace(tmp_out, out_path)
+    else:
+        tmp_out.unlink(missing_ok=True)
+    return report
+
+
+def format_report(report: Dict) -> str:
+    lines = []
+    for f in report["files"]:
+        lines.append(f"  {f['path']}: {f['rows']} rows" + (f" (shard {f['shard']})" if f["shard"] else ""))
+    for name, label in (("missing", "missing task ids"), ("duplicates", "duplicate task ids"),
+                        ("unexpected", "task ids not in the dataset")):
+        ids = report[name]
+        if ids:
+            more = f" (+{len(ids) - EXAMPLES} more)" if len(ids) > EXAMPLES else ""
+            lines.append(f"  {len(ids)} {label}: {', '.join(ids[:EXAMPLES])}{more}")
+    for path in report["torn"]:
+        lines.append(f"  {path}: ends in a torn row (re-run that shard with --resume)")
+    for path in report["mixed_shards"]:
+        lines.append(f"  {path}: holds tasks from more than one shard")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", nargs="+", help="Shard outputs (plain, .gz or .zst)")
+    parser.add_argument("--out", required=True, help="Merged output (.gz / .zst: block-compressed)")
+    parser.add_argument("--config", help="Track config; every dataset task must appear exactly once")
+    parser.add_argument("--shards", type=int, help="Shard count N the inputs were run with (--shard i/N)")
+    parser.add_argument("--force", action="store_true", help="Write the output even if a check fails")
+    args = parser.parse_args()
+
+    expected = {str(t["id"]) for t in iter_tasks(load_config(args.config))} if args.config else None
+    out_path = Path(args.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+
+    report = merge_shards(args.inputs, out_path, expected, args.shards, args.force)
+    print(format_report(report))
+    if report["ok"]:
+        print(f"Merged {report['rows']} rows from {len(args.inputs)} files → {out_path}")
+    elif args.force:
+        print(f"Merged {report['rows']} rows from {len(args.inputs)} files → {out_path} despite the problems above")
+    else:
+        raise SystemExit(f"error: shard outputs do not cover the dataset cleanly; {out_path} not written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+"""
+Model clients for the benchmark runners.
+
+A `ModelClient` turns (model, prompt) into a response. `Models` routes each
+model name to its provider's client and applies a global limit on calls
+in flight plus optional per-model request rates:
+
+    models = Models.from_config(cfg, backend="http", concurrency=32, rates={"gpt5": 5})
+    answer = await models.complete("gpt5", "prompt")
+
+Providers are configured through the environment, per provider name in
+the track config (`models.solo[].provider`):
+
+    POR_<PROVIDER>_BASE_URL   OpenAI-compatible endpoint, e.g. https://api.openai.com
+    POR_<PROVIDER>_API_KEY    sent as a bearer token
+
+With a ResponseCache, answers are looked up before any rate limit or
+network call; see response_cache.py.
+
+Transient failures (connection errors, timeouts, HTTP 429 and 5xx) are
+retried with exponential backoff. With a telemetry sink, every call emits a
+record (see telemetry.py):
+
+    {"model": "gpt5", "task_id": "r1", "step": 0, "role": "a", "cached": false,
+     "queue_ms": 0.1, "wall_ms": 212.4, "ttft_ms": 180.2,
+     "prompt_tokens": 31, "completion_tokens": 12, "retries": 0, "error": null}
+
+wall_ms covers the call itself including retries and backoff; queue_ms is
+the wait for the rate limiter and the in-flight limit. ttft_ms (time to the
+first streamed chunk) is only set with stream=True, and token counts only
+when the provider reports usage. ttft_ms is measured from when the request
+gets a connection slot, so waiting for one is not counted; an endpoint that
+sends its events as one non-chunked body only reports the time to the whole
+body.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from benchmarks.runners.http_client import HttpClient, HttpError
+from benchmarks.runners.response_cache import CacheMiss, ResponseCache, response_key
+
+
+class ModelError(Exception):
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+@dataclass
+class Completion:
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    ttft: Optional[float] = None  # seconds to the first streamed chunk
+
+
+class ModelClient:
+    """Interface: one provider's way of answering a prompt."""
+
+    # Identifies who answered, as part of the response cache key.
+    source = "model"
+
+    async def complete(self, model: str, prompt: str, temperature: Optional[float] = None,
+                       max_tokens: Optional[int] = None) -> Completion:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class DummyClient(ModelClient):
+    """Offline answers from a plain function fn(prompt, model)."""
+
+    def __init__(self, fn: Callable[[str, str], str]):
+        self.fn = fn
+        self.source = f"dummy:{fn.__name__}"
+
+    async def complete(self, model, prompt, temperature=None, max_tokens=None):
+        return Completion(self.fn(prompt, model))
+
+
+class OpenAIChatClient(ModelClient):
+    """Any OpenAI-compatible /v1/chat/completions endpoint, over pooled keep-alive connections."""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, max_connections: int = 64,
+                 timeout: float = 120.0, source: str = "openai-compatible", stream: bool = False):
+        self.source = source
+        self.stream = stream
+        self.http = HttpClient(base_url, max_connections=max_connections, timeout=timeout)
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+
+    @classmethod
+    def from_env(cls, provider: str, **kwargs) -> "OpenAIChatClient":
+        prefix = f"POR_{provider.upper()}_"
+        base_url = os.environ.get(prefix + "BASE_URL")
+        if not base_url:
+            raise ModelError(f"no endpoint for provider {provider!r}; set {prefix}BASE_URL or pass --base-url")
+        return cls(base_url, os.environ.get(prefix + "API_KEY"), source=provider, **kwargs)
+
+    async def complete(self, model, prompt, temperature=None, max_tokens=None):
+        payload = {"model": model, "messages": [{"role": "user", "content": prompt}]}
+        if temperature is not None:
+            payload["temperature"] = temperature
+        if max_tokens is not None:
+            payload["max_tokens"] = max_tokens
+        if self.stream:
+            payload["stream"] = True
+            payload["stream_options"] = {"include_usage": True}
+        started, first = [], []
+
+        def on_start():
+            started.append(time.perf_counter())
+
+        def on_data(_):
+            if not first:
+                first.append(time.perf_counter() - started[-1])
+
+        try:
+            status, body = await self.http.request(
+                "POST", "/v1/chat/completions", json.dumps(payload).encode("utf-8"), self.headers,
+                on_data if self.stream else None, on_start if self.stream else None,
+            )
+        except (OSError, HttpError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+            raise ModelError(f"{model}: {type(e).__name__}: {e}", retryable=True) from e
+        if status != 200:
+            raise ModelError(f"{model}: HTTP {status}: {body[:200].decode('utf-8', 'replace')}",
+                             retryable=status == 429 or status >= 500)
+        try:
+            text, usage = _read_events(body) if self.stream else _read_message(body)
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise ModelError(f"{model}: malformed response: {body[:200].decode('utf-8', 'replace')}") from e
+        return Completion(text, usage.get("prompt_tokens"), usage.get("completion_tokens"),
+                          first[0] if first else None)
+
+    async def close(self):
+        await self.http.close()
+
+
+def _read_message(body: bytes):
+    """Content and usage of a plain JSON chat completion."""
+    data = json.loads(body)
+    content = data["choices"][0]["message"]["content"]
+    if not isinstance(content, str):
+        raise TypeError("no message content")
+    return content, data.get("usage") or {}
+
+
+def _read_events(body: bytes):
+    """
+    Content and usage of a streamed (server-sent events) chat completion.
+    An endpoint that ignores "stream" answers with plain JSON instead.
+    """
+    parts, usage, events = [], {}, 0
+    for line in body.decode("utf-8").splitlines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        event = json.loads(data)
+        events += 1
+        for choice in event.get("choices") or []:
+            parts.append(choice.get("delta", {}).get("content") or "")
+        usage = event.get("usage") or usage
+    if not events:
+        return _read_message(body)
+    return "".join(parts), usage
+
+
+class RateLimiter:
+    """Token bucket: at most `rate` acquisitions per second, bursts up to `burst`."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst or max(1.0, rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Models:
+    """Routes model names to clients under a global in-flight limit and per-model rates."""
+
+    # Seconds before the first retry; doubled on each further one.
+    BACKOFF = 0.5
+
+    def __init__(self, clients: Dict[str, ModelClient], default: Optional[ModelClient] = None,
+                 concurrency: int = 16, rates: Optional[Dict[str, float]] = None, params: Optional[dict] = None,
+                 cache: Optional[ResponseCache] = None, retries: int = 2,
+                 telemetry: Optional[Callable[[dict], None]] = None):
+        self.clients = clients
+        self.default = default
+        self.limit = asyncio.Semaphore(concurrency)
+        self.limiters = {model: RateLimiter(rps) for model, rps in (rates or {}).items() if rps}
+        self.params = params or {}
+        self.cache = cache
+        self.retries = retries
+        self.telemetry = telemetry
+        self.tags: dict = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        cfg: dict,
+        backend: str = "dummy",
+        base_url: Optional[str] = None,
+        concurrency: int = 16,
+        rates: Optional[Dict[str, float]] = None,
+        max_connections: int = 64,
+        dummy: Optional[Callable[[str, str], str]] = None,
+        cache: Optional[ResponseCache] = None,
+        retries: int = 2,
+        stream: bool = False,
+    ) -> "Models":
+        """
+        Clients for every model a track config names. Rates come from an
+        optional `rps` on each `models.solo` entry, overridden by `rates`.
+        """
+        solo = cfg.get("models", {}).get("solo", [])
+        all_rates = {m["name"]: m["rps"] for m in solo if m.get("rps")}
+        all_rates.update(rates or {})
+        params = call_params(cfg)
+
+        if backend == "dummy":
+            if dummy is None:
+                raise ValueError("the dummy backend needs a dummy answer function")
+            return cls({}, DummyClient(dummy), concurrency, all_rates, params, cache, retries)
+        if backend != "http":
+            raise ValueError(f"unknown backend {backend!r}")
+        if base_url:
+            # One endpoint (e.g. the stub server) for every model.
+            client = OpenAIChatClient(base_url, max_connections=max_connections, stream=stream)
+            return cls({}, client, concurrency, all_rates, params, cache, retries)
+
+        by_provider: Dict[str, ModelClient] = {}
+        clients = {}
+        for m in solo:
+            provider = m.get("provider", "default")
+            if provider not in by_provider:
+                by_provider[provider] = OpenAIChatClient.from_env(
+                    provider, max_connections=max_connections, stream=stream
+                )
+            clients[m["name"]] = by_provider[provider]
+        return cls(clients, None, concurrency, all_rates, params, cache, retries)
+
+    def bind(self, params: Optional[dict] = None, default: Optional[ModelClient] = None, **tags) -> "Models":
+        """
+        A view on the same clients, limits, cache and telemetry sink with
+        other call params, fallback client or telemetry tags. Close only the
+        original.
+        """
+        view = copy.copy(self)
+        if params is not None:
+            view.params = params
+        if default is not None:
+            view.default = default
+        view.tags = {**self.tags, **tags}
+        return view
+
+    async def complete(self, model: str, prompt: str, **tags) -> str:
+        """
+        The model's answer to `prompt`. `tags` (e.g. task_id, step, role)
+        are copied into the call's telemetry record.
+        """
+        client = self.clients.get(model, self.default)
+        if client is None:
+            raise ModelError(f"no client configured for model {model!r}")
+        key = None
+        if self.cache is not None:
+            key = response_key(client.source, model, prompt, **self.params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                self._record(model, tags, cached=True)
+                return cached
+            if self.cache.replay:
+                raise CacheMiss(f"{model}: no cached response for {prompt[:60]!r}")
+
+        limiter = self.limiters.get(model)
+        queued = wall = 0.0
+        attempt = 0
+        while True:
+            t0 = time.perf_counter()
+            if limiter is not None:
+                await limiter.acquire()
+            async with self.limit:
+                t1 = time.perf_counter()
+                queued += t1 - t0
+                try:
+                    result, error = await client.complete(model, prompt, **self.params), None
+                except ModelError as e:
+                    error = e
+                wall += time.perf_counter() - t1
+            if error is None:
+                break
+            if not error.retryable or attempt >= self.retries:
+                self._record(model, tags, queued=queued, wall=wall, retries=attempt, error=str(error))
+                raise error
+            delay = self.BACKOFF * 2 ** attempt * random.uniform(0.5, 1.5)
+            await asyncio.sleep(delay)
+            wall += delay
+            attempt += 1
+
+        # An empty answer is more likely a broken response than a real one.
+        if key is not None and result.text:
+            self.cache.put(key, model, result.text)
+        self._record(model, tags, queued=queued, wall=wall, retries=attempt, result=result)
+        return result.text
+
+    def _record(self, model: str, tags: dict, cached: bool = False, queued: float = 0.0, wall: float = 0.0,
+                retries: int = 0, result: Optional[Completion] = None, error: Optional[str] = None):
+        if self.telemetry is None:
+            return
+        self.telemetry({
+            "model": model,
+            **self.tags,
+            **tags,
+            "cached": cached,
+            "queue_ms": round(queued * 1000, 3),
+            "wall_ms": round(wall * 1000, 3),
+            "ttft_ms": round(result.ttft * 1000, 3) if result and result.ttft is not None else None,
+            "prompt_tokens": result.prompt_tokens if result else None,
+            "completion_tokens": result.completion_tokens if result else None,
+            "retries": retries,
+            "error": error,
+        })
+
+    async def close(self):
+        for client in {id(c): c for c in [*self.clients.values(), self.default] if c}.values():
+            await client.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+def call_params(cfg: dict) -> dict:
+    """Sampling params for a track's model calls, from its `resonance` section."""
+    resonance = cfg.get("resonance", {})
+    return {"temperature": resonance.get("temperature"), "max_tokens": resonance.get("max_tokens_per_turn")}
+
+
+def add_model_args(parser: argparse.ArgumentParser):
+    """The model-client options shared by the runners."""
+    parser.add_argument("--backend", choices=("dummy", "http"), default="dummy",
+                        help="dummy: offline placeholder answers; http: OpenAI-compatible endpoints")
+    parser.add_argument("--base-url", help="One endpoint for every model (e.g. the stub model server)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Model calls (and task loops) in flight")
+    parser.add_argument("--rate", action="append", default=[], metavar="MODEL=RPS",
+                        help="Per-model request rate limit (repeatable)")
+    parser.add_argument("--max-connections", type=int, default=64, help="Pooled connections per endpoint")
+    parser.add_argument("--cache", default=os.environ.get("POR_RESPONSE_CACHE"),
+                        help="SQLite response cache file (default: $POR_RESPONSE_CACHE; off if unset)")
+    parser.add_argument("--cache-ttl", type=float, default=None, help="Ignore cached responses older than this (s)")
+    parser.add_argument("--replay", action="store_true", help="Answer only from --cache; fail on a miss")
+    parser.add_argument("--retries", type=int, default=2, help="Retries per call on connection errors, 429 and 5xx")
+    parser.add_argument("--stream", action="store_true", help="Stream completions (records time to first token)")
+    parser.add_argument("--telemetry", metavar="PATH",
+                        help="Write one JSONL record per model call (latency, tokens, retries); see telemetry.py")
+
+
+def parse_rates(items):
+    """["gpt5=5", ...] -> {"gpt5": 5.0} (requests per second)."""
+    rates = {}
+    for item in items:
+        model, _, value = item.partition("=")
+        rates[model] = float(value)
+    return rates
+
+
+def models_from_args(cfg: dict, args: argparse.Namespace, dummy: Callable[[str, str], str]) -> Models:
+    if args.replay and not args.cache:
+        raise SystemExit("--replay needs --cache")
+    cache = ResponseCache(args.cache, ttl=args.cache_ttl, replay=args.replay) if args.cache else None
+    return Models.from_config(
+        cfg,
+        backend=args.backend,
+        base_url=args.base_url,
+        concurrency=args.concurrency,
+        rates=parse_rates(args.rate),
+        max_connections=args.max_connections,
+        dummy=dummy,
+        cache=cache,
+        retries=args.retries,
+        stream=args.stream,
+    )
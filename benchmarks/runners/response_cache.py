@@ -0,0 +1,95 @@
+"""
+Disk-backed prompt → response cache for benchmark model calls.
+
+Entries are keyed by a hash of (source, model, prompt, temperature,
+max_tokens), where source names the client that answered (a provider, or
+the dummy function), and stored in SQLite in WAL mode so several runner
+processes can share one file. Entries older than `ttl` seconds are
+ignored and replaced.
+
+In replay mode a miss raises CacheMiss instead of calling the model, so
+re-scoring a finished benchmark is guaranteed not to touch any model.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key        TEXT PRIMARY KEY,
+    model      TEXT NOT NULL,
+    response   TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class CacheMiss(Exception):
+    pass
+
+
+def response_key(source: str, model: str, prompt: str, temperature=None, max_tokens=None) -> str:
+    canonical = json.dumps(
+        {"source": source, "model": model, "prompt": prompt, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path: str, ttl: Optional[float] = None, replay: bool = False):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit plus a generous busy timeout: concurrent writers wait for
+        # the WAL lock instead of failing.
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self.path = path
+        self.ttl = ttl
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def get(self, key: str) -> Optional[str]:
+        sql, args = "SELECT response FROM responses WHERE key = ?", (key,)
+        if self.ttl is not None:
+            sql += " AND created_at >= ?"
+            args += (time.time() - self.ttl,)
+        with self._lock:
+            row = self._db.execute(sql, args).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key: str, model: str, response: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model, response, time.time()),
+            )
+        self.writes += 1
+
+    def purge_expired(self) -> int:
+        if self.ttl is None:
+            return 0
+        with self._lock:
+            return self._db.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
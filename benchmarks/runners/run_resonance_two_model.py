@@ -1,76 +1,113 @@
-import json
 import argparse
+import asyncio
+import sys
 from pathlib import Path
 
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import (
+    JsonlWriter, add_output_args, completed_ids, for_each, iter_jsonl, iter_tasks, load_config,
+)
+from benchmarks.runners.models import Models, ModelError, add_model_args, models_from_args
+from benchmarks.runners.response_cache import CacheMiss
+from benchmarks.runners.telemetry import format_summary, open_sink, summarize
+from benchmarks.runners.turnstore import pack_row
+
 def dummy_model(prompt: str, model_name: str) -> str:
     # TODO: Replace with real API (GPT/Grok/Llama)
     return f"[{model_name} ANSWER] {prompt[:80]}..."
 
-def resonance_loop(model_a: str, model_b: str, prompt: str, steps: int = 6):
+def resonance_result(track: str, task: dict, model_a: str, model_b: str, steps: int, turns: list) -> dict:
+    return {
+        "mode": "resonance",
+        "track": track,
+        "task_id": task["id"],
+        "model_pair": [model_a, model_b],
+        "steps": steps,
+        "turns": turns,
+        "harmonic_score": 1.0,  # placeholder
+        "drift_score": 1.0      # placeholder
+    }
+
+async def resonance_loop_async(models: Models, model_a: str, model_b: str, prompt: str, steps: int = 6,
+                               task_id=None):
+    """
+    The turns of a two-model loop: each step, model A answers the context
+    and model B answers A; B's answer is the next context. Calls are
+    awaited on `models`, tagged with task_id, step and role.
+    """
     turns = []
     context = prompt
 
     for step in range(steps):
-        ans_a = dummy_model(context, model_a)
-        ans_b = dummy_model(ans_a, model_b)
+        ans_a = await models.complete(model_a, context, task_id=task_id, step=step, role="a")
+        ans_b = await models.complete(model_b, ans_a, task_id=task_id, step=step, role="b")
 
-        turn = {
+        turns.append({
             "step": step,
             "input": context,
             "a_output": ans_a,
             "b_output": ans_b,
-        }
-
-        turns.append(turn)
-        context = ans_b   # update loop context
+        })
+        context = ans_b
 
     return turns
 
+async def run_resonance_async(cfg: dict, model_a: str, model_b: str, models: Models, emit,
+                              tasks=None, concurrency: int = 16):
+    """
+    Run the two-model resonance loop on every task of a track, with up to
+    `concurrency` tasks' loops in progress at once (turns within a task
+    stay sequential). Each result is passed to
+    emit(result) as soon as its task finishes, so in completion order.
+    """
+    steps = cfg["resonance"]["steps"]
+    track = cfg["track"]
+
+    async def one(task):
+        turns = await resonance_loop_async(models, model_a, model_b, task["prompt"], steps, task["id"])
+        emit(resonance_result(track, task, model_a, model_b, steps, turns))
+
+    await for_each(tasks if tasks is not None else iter_tasks(cfg), one, concurrency)
+
+async def _run(cfg, model_a, model_b, args):
+    done = completed_ids(args.out) if args.resume else set()
+    models = models_from_args(cfg, args, dummy_model)
+    telemetry = open_sink(args.telemetry, args.resume, args.fsync_every) if args.telemetry else None
+    models.telemetry = telemetry.write if telemetry else None
+    try:
+        with JsonlWriter(args.out, append=args.resume, fsync_every=args.fsync_every) as out:
+            emit = (lambda row: out.write(pack_row(row))) if args.compact else out.write
+            await run_resonance_async(cfg, model_a, model_b, models, emit,
+                                      iter_tasks(cfg, skip=done, shard=args.shard), args.concurrency)
+        return len(done), out.count
+    finally:
+        if models.cache is not None:
+            print(f"Response cache: {models.cache.stats()}")
+        await models.close()
+        if telemetry is not None:
+            telemetry.close()
+            print(format_summary(summarize(iter_jsonl(args.telemetry))))
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", required=True)
     parser.add_argument("--pair", required=True, help="Format: modelA,modelB")
-    parser.add_argument("--out", required=True)
+    parser.add_argument("--out", required=True, help="Output JSONL (.gz / .zst: block-compressed)")
+    parser.add_argument("--compact", action="store_true",
+                        help="Store each row's texts once, with turns as indices (see turnstore.py)")
+    add_output_args(parser)
+    add_model_args(parser)
     args = parser.parse_args()
 
-    import yaml
-    with open(args.config, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
-
-    dataset_path = cfg["dataset_path"]
-    steps = cfg["resonance"]["steps"]
-    track = cfg["track"]
-
     modelA, modelB = args.pair.split(",")
+    try:
+        skipped, written = asyncio.run(_run(load_config(args.config), modelA, modelB, args))
+    except (CacheMiss, ModelError) as e:
+        raise SystemExit(f"error: {e}")
 
-    results = []
-
-    with open(dataset_path, "r", encoding="utf-8") as f:
-        for line in f:
-            task = json.loads(line)
-            prompt = task["prompt"]
-
-            turns = resonance_loop(modelA, modelB, prompt, steps)
-
-            results.append({
-                "mode": "resonance",
-                "track": track,
-                "task_id": task["id"],
-                "model_pair": [modelA, modelB],
-                "steps": steps,
-                "turns": turns,
-                "harmonic_score": 1.0,  # placeholder
-                "drift_score": 1.0      # placeholder
-            })
-
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-
-    with open(out_path, "w", encoding="utf-8") as f:
-        for r in results:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-
-    print(f"Saved {len(results)} resonance results → {out_path}")
+    print(f"Saved {written} resonance results → {args.out}" + (f" ({skipped} already there)" if skipped else ""))
 
 if __name__ == "__main__":
     main()
@@ -1,50 +1,79 @@
-import json
 import argparse
+import asyncio
+import sys
 from pathlib import Path
 
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import (
+    JsonlWriter, add_output_args, completed_ids, for_each, iter_jsonl, iter_tasks, load_config,
+)
+from benchmarks.runners.models import Models, ModelError, add_model_args, models_from_args
+from benchmarks.runners.response_cache import CacheMiss
+from benchmarks.runners.telemetry import format_summary, open_sink, summarize
+
 def dummy_model_answer(prompt: str) -> str:
     # TODO: replace with real GPT/Grok/Llama call
     return f"[DUMMY_ANSWER] {prompt[:60]}..."
 
+def dummy_solo_model(prompt: str, model_name: str) -> str:
+    return dummy_model_answer(prompt)
+
+def solo_result(track: str, task: dict, model: str, ans: str) -> dict:
+    return {
+        "mode": "solo",
+        "track": track,
+        "task_id": task["id"],
+        "model_name": model,
+        "response": ans,
+        "task_score": 0.0,   # placeholder
+        "ha_score": 1.0,
+        "drift_score": 1.0
+    }
+
+async def run_solo_async(cfg: dict, model: str, models: Models, emit, tasks=None, concurrency: int = 16):
+    """Answer every task of a track with one model, up to `concurrency` at once; emit(result) per task as it finishes."""
+    track = cfg["track"]
+
+    async def one(task):
+        ans = await models.complete(model, task["prompt"], task_id=task["id"], role="solo")
+        emit(solo_result(track, task, model, ans))
+
+    await for_each(tasks if tasks is not None else iter_tasks(cfg), one, concurrency)
+
+async def _run(cfg, model, args):
+    done = completed_ids(args.out) if args.resume else set()
+    models = models_from_args(cfg, args, dummy_solo_model)
+    telemetry = open_sink(args.telemetry, args.resume, args.fsync_every) if args.telemetry else None
+    models.telemetry = telemetry.write if telemetry else None
+    try:
+        with JsonlWriter(args.out, append=args.resume, fsync_every=args.fsync_every) as out:
+            await run_solo_async(cfg, model, models, out.write, iter_tasks(cfg, skip=done, shard=args.shard), args.concurrency)
+        return len(done), out.count
+    finally:
+        if models.cache is not None:
+            print(f"Response cache: {models.cache.stats()}")
+        await models.close()
+        if telemetry is not None:
+            telemetry.close()
+            print(format_summary(summarize(iter_jsonl(args.telemetry))))
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", required=True, help="Path to YAML config")
     parser.add_argument("--model", required=True, help="Model name (for logging)")
-    parser.add_argument("--out", required=True, help="Output JSONL path")
+    parser.add_argument("--out", required=True, help="Output JSONL path (.gz / .zst: block-compressed)")
+    add_output_args(parser)
+    add_model_args(parser)
     args = parser.parse_args()
 
-    import yaml  # simple YAML loader
-    with open(args.config, "r", encoding="utf-8") as f:
-        cfg = yaml.safe_load(f)
-
-    dataset_path = cfg["dataset_path"]
-    track = cfg["track"]
+    try:
+        skipped, written = asyncio.run(_run(load_config(args.config), args.model, args))
+    except (CacheMiss, ModelError) as e:
+        raise SystemExit(f"error: {e}")
 
-    results = []
-    with open(dataset_path, "r", encoding="utf-8") as f:
-        for line in f:
-            task = json.loads(line)
-            ans = dummy_model_answer(task["prompt"])
-
-            result = {
-                "mode": "solo",
-                "track": track,
-                "task_id": task["id"],
-                "model_name": args.model,
-                "response": ans,
-                "task_score": 0.0,   # placeholder
-                "ha_score": 1.0,
-                "drift_score": 1.0
-            }
-            results.append(result)
-
-    out_path = Path(args.out)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        for r in results:
-            f.write(json.dumps(r, ensure_ascii=False) + "\n")
-
-    print(f"Saved {len(results)} solo results to {out_path}")
+    print(f"Saved {written} solo results to {args.out}" + (f" ({skipped} already there)" if skipped else ""))
 
 if __name__ == "__main__":
     main()
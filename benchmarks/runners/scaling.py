@@ -0,0 +1,162 @@
+"""
+Runner and evaluator throughput and peak memory at increasing dataset sizes.
+
+    python benchmarks/runners/scaling.py --sizes 1000,10000,100000 --out scaling.json
+    python benchmarks/runners/scaling.py --sizes 10000,100000 --backend stub --latency-ms 50 \\
+        --concurrency 256 --steps 4
+
+For each size a synthetic dataset is generated (generate_dataset.py), then
+run_solo.py, run_resonance_two_model.py and evaluate_por_score.py run on it
+as separate processes with the track config's first solo model and first
+pair. Each stage reports wall time, rows per second and the process's peak
+RSS; with the stub backend a local stub model server answers every call
+after --latency-ms. Outputs go to --work-dir and are removed unless --keep.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import List, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import REPO_ROOT, load_config  # noqa: E402
+from benchmarks.runners.distance import BACKENDS  # noqa: E402
+from benchmarks.runners.generate_dataset import TRACKS, parse_lengths, write_config, write_dataset  # noqa: E402
+
+RUNNERS = REPO_ROOT / "benchmarks" / "runners"
+
+
+def run_measured(cmd: List[str], log_path: Path) -> dict:
+    """Run a command to completion; returns its wall seconds and peak RSS in MB."""
+    started = time.perf_counter()
+    with open(log_path, "wb") as log:
+        proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=log, stderr=subprocess.STDOUT,
+                                env={**os.environ, "PYTHONPATH": str(REPO_ROOT)})
+        # wait4 (not wait) to get this child's own resource usage.
+        _, status, usage = os.wait4(proc.pid, 0)
+    seconds = time.perf_counter() - started
+    proc.returncode = code = os.waitstatus_to_exitcode(status)  # reaped above
+    if code != 0:
+        raise RuntimeError(f"{' '.join(cmd)} failed ({code}):\n{log_path.read_text()[-2000:]}")
+    # ru_maxrss is in KiB on Linux and bytes on macOS.
+    peak = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    return {"seconds": seconds, "peak_rss_mb": round(peak, 1)}
+
+
+def run_size(size: int, track: str, work: Path, lengths, args, base_url: Optional[str]) -> List[dict]:
+    suffix = ".jsonl.zst" if args.compress else ".jsonl"
+    dataset = work / f"{track}_{size}_tasks{suffix}"
+    started = time.perf_counter()
+    write_dataset(track, size, dataset, lengths, args.seed)
+    gen_seconds = time.perf_counter() - started
+    config = write_config(track, dataset, work / f"{track}_{size}.yaml", args.steps)
+    cfg = load_config(config)
+    model = cfg["models"]["solo"][0]["name"]
+    a, b = cfg["models"]["multi_pairs"][0]
+    steps = cfg["resonance"]["steps"]
+
+    model_args = ["--concurrency", str(args.concurrency)]
+    if base_url:
+        model_args += ["--backend", "http", "--base-url", base_url]
+    solo_out, res_out = work / f"solo_{size}{suffix}", work / f"resonance_{size}{suffix}"
+    eval_out = work / f"eval_{size}.jsonl"
+    res_extra = ["--compact"] if args.compress else []
+    stages = [
+        ("solo", size, [sys.executable, str(RUNNERS / "run_solo.py"), "--config", str(config),
+                        "--model", model, "--out", str(solo_out)] + model_args),
+        ("resonance", size, [sys.executable, str(RUNNERS / "run_resonance_two_model.py"), "--config", str(config),
+                             "--pair", f"{a},{b}", "--out", str(res_out)] + res_extra + model_args),
+        ("evaluate", size, [sys.executable, str(RUNNERS / "evaluate_por_score.py"), "--config", str(config),
+                            "--solo", str(solo_out), "--res", str(res_out), "--out", str(eval_out),
+                            "--workers", str(args.eval_workers), "--distance", args.distance]),
+    ]
+
+    results = [{"size": size, "stage": "generate", "rows": size, "seconds": gen_seconds,
+                "rows_per_s": size / gen_seconds, "peak_rss_mb": None,
+                "bytes": dataset.stat().st_size}]
+    print(format_row(results[0]), flush=True)
+    for stage, rows, cmd in stages:
+        m = run_measured(cmd, work / f"{stage}_{size}.log")
+        result = {"size": size, "stage": stage, "rows": rows, **m, "rows_per_s": rows / m["seconds"]}
+        if stage == "resonance":
+            result["calls_per_s"] = rows * steps * 2 / m["seconds"]
+        results.append(result)
+        print(format_row(result), flush=True)
+    return results
+
+
+def format_row(r: dict) -> str:
+    peak = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+    return (f"{r['size']:>10} {r['stage']:<10} {r['seconds']:>9.2f} {r['rows_per_s']:>11.0f} {peak:>9}"
+            + (f"   ({r['calls_per_s']:.0f} model calls/s)" if "calls_per_s" in r else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure runner and evaluator scaling on synthetic datasets.")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="Comma-separated task counts")
+    parser.add_argument("--track", choices=TRACKS, default="reasoning")
+    parser.add_argument("--prompt-words", default="lognormal:40:0.75", help="Prompt length distribution (words)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--steps", type=int, help="Resonance steps (default: the track config's)")
+    parser.add_argument("--backend", choices=("dummy", "stub"), default="dummy",
+                        help="dummy: in-process answers; stub: a local stub model server")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Stub model latency per call")
+    parser.add_argument("--port", type=int, default=8901, help="Stub model server port")
+    parser.add_argument("--concurrency", type=int, default=64, help="Runner --concurrency")
+    parser.add_argument("--eval-workers", type=int, default=1, help="Evaluator --workers")
+    parser.add_argument("--distance", choices=BACKENDS, default="ngram", help="Evaluator --distance")
+    parser.add_argument("--compress", action="store_true", help="zstd datasets and outputs, compact resonance rows")
+    parser.add_argument("--work-dir", help="Where datasets and outputs go (default: a temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the work directory")
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    lengths = parse_lengths(args.prompt_words)
+    work = Path(args.work_dir) if args.work_dir else Path(tempfile.mkdtemp(prefix="por-scaling-"))
+    work.mkdir(parents=True, exist_ok=True)
+
+    if args.backend == "stub":
+        from benchmarks.runners.stub_model_server import running
+
+        server = running(args.port, latency_ms=args.latency_ms)
+    else:
+        server = nullcontext(None)
+
+    print(f"{'size':>10} {'stage':<10} {'seconds':>9} {'rows/s':>11} {'peak MB':>9}")
+    results = []
+    try:
+        with server as base_url:
+            for size in sizes:
+                results += run_size(size, args.track, work, lengths, args, base_url)
+    finally:
+        if not args.keep and not args.work_dir:
+            shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        "env": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "params": {k: v for k, v in vars(args).items() if k not in ("out", "keep", "work_dir")},
+        "results": results,
+    }
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved scaling report → {out_path}")
+
+
+if __name__ == "__main__":
+    main()
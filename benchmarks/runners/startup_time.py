@@ -0,0 +1,135 @@
+"""
+Cold-start budget for the `app` CLI.
+
+Runs `python -m app.cli <args>` several times per scenario and checks:
+
+  - startup time over a bare interpreter (`python -c pass`), best of N
+    runs, against a per-scenario budget in milliseconds
+  - the modules it imports (from `python -X importtime`) against a list
+    of heavy dependencies that scenario must not load
+
+    python benchmarks/runners/startup_time.py --runs 7 --out startup.json
+    python benchmarks/runners/startup_time.py --budget help=200 --budget simulate=200
+    python benchmarks/runners/startup_time.py --report-time
+
+Exits with status 1 if any scenario is over budget or imports a forbidden
+module. With --report-time, times are only reported and just the imports
+are checked: wall-clock budgets are too noisy for shared CI runners.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+HEAVY = ("numpy", "torch", "clip", "PIL", "matplotlib", "fastapi", "por_core", "por_multimodal")
+
+# name -> (CLI arguments, default budget in ms over bare Python, modules it must not import)
+SCENARIOS = {
+    "help": (["--help"], 300, HEAVY),
+    "simulate": (["simulate", "--steps", "1"], 300, tuple(m for m in HEAVY if m not in ("numpy", "por_core"))),
+}
+
+
+def run(args, env):
+    started = time.perf_counter()
+    proc = subprocess.run(args, cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} failed:\n{proc.stderr}")
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr: str):
+    """Return ({module: cumulative_us}, top-level [(module, cumulative_us)], total self us)."""
+    modules, top, total = {}, [], 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = len(name) - len(name.lstrip())
+        name = name.strip()
+        modules[name] = int(cumulative)
+        total += int(self_us)
+        if depth == 1:
+            top.append((name, int(cumulative)))
+    return modules, sorted(top, key=lambda t: -t[1]), total
+
+
+def measure(name, cli_args, budget_ms, forbidden, runs, env, check_time=True):
+    python = [sys.executable]
+    bare = min(run(python + ["-c", "pass"], env)[0] for _ in range(runs))
+    walls = [run(python + ["-m", "app.cli"] + cli_args, env)[0] for _ in range(runs)]
+    _, stderr = run(python + ["-X", "importtime", "-m", "app.cli"] + cli_args, env)
+    modules, top, total = parse_importtime(stderr)
+
+    loaded = sorted(m for m in modules if m.split(".")[0] in forbidden)
+    startup_ms = (min(walls) - bare) * 1000
+    return {
+        "args": cli_args,
+        "startup_ms": startup_ms,
+        "wall_ms": {"min": min(walls) * 1000, "median": statistics.median(walls) * 1000},
+        "python_ms": bare * 1000,
+        "import_ms": total / 1000,
+        "top_imports_ms": {m: us / 1000 for m, us in top[:10]},
+        "budget_ms": budget_ms,
+        "forbidden_imported": sorted({m.split(".")[0] for m in loaded}),
+        "over_budget": startup_ms > budget_ms,
+        "ok": (startup_ms <= budget_ms or not check_time) and not loaded,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the CLI's cold-start time and imports.")
+    parser.add_argument("--runs", type=int, default=5, help="Runs per scenario (best is used)")
+    parser.add_argument("--budget", action="append", default=[], metavar="SCENARIO=MS",
+                        help="Override a scenario's budget (ms over bare Python)")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), help="Scenarios to run")
+    parser.add_argument("--report-time", action="store_true",
+                        help="Report startup time without failing on it; only forbidden imports fail")
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    budgets = {name: budget for name, (_, budget, _) in SCENARIOS.items()}
+    for item in args.budget:
+        name, _, value = item.partition("=")
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario {name!r}")
+        budgets[name] = float(value)
+
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+
+    report = {}
+    for name, (cli_args, _, forbidden) in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        result = report[name] = measure(name, cli_args, budgets[name], forbidden, args.runs, env,
+                                        check_time=not args.report_time)
+        status = "ok" if result["ok"] else "FAIL"
+        if result["ok"] and result["over_budget"]:
+            status = "ok (over time budget, not checked)"
+        print(f"{name:<10} {result['startup_ms']:7.1f} ms over bare Python "
+              f"(budget {result['budget_ms']:.0f} ms, imports {result['import_ms']:.1f} ms)  {status}")
+        for module, ms in list(result["top_imports_ms"].items())[:5]:
+            print(f"{'':<10} {ms:7.1f} ms  {module}")
+        if result["forbidden_imported"]:
+            print(f"{'':<10} imports heavy modules: {', '.join(result['forbidden_imported'])}")
+
+    if args.out:
+        out_path = Path(args.out)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved startup report → {out_path}")
+
+    if not all(result["ok"] for result in report.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
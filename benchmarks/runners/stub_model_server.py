@@ -0,0 +1,164 @@
+"""
+Local stand-in for an OpenAI-compatible chat endpoint, for benchmarking
+runner throughput offline.
+
+    python benchmarks/runners/stub_model_server.py --port 8900 --latency-ms 200 --jitter-ms 50
+    python benchmarks/runners/run_resonance_two_model.py --config benchmarks/configs/reasoning_v1.yaml \\
+        --pair gpt5,llama3 --backend http --base-url http://127.0.0.1:8900 --concurrency 64 --out res.jsonl
+
+Every call sleeps for the configured latency (without blocking other
+calls) and answers "[<model> ANSWER] <first 80 chars of the prompt>...",
+the same text as the dummy runners. With "stream": true the answer is sent
+as server-sent events, one word per event, --token-ms apart. --error-rate
+answers that fraction of calls with HTTP 503, to exercise retries.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+LATENCY_MS = float(os.environ.get("POR_STUB_LATENCY_MS", 100))
+JITTER_MS = float(os.environ.get("POR_STUB_JITTER_MS", 0))
+TOKEN_MS = float(os.environ.get("POR_STUB_TOKEN_MS", 0))
+ERROR_RATE = float(os.environ.get("POR_STUB_ERROR_RATE", 0))
+
+app = FastAPI(title="PoR stub model server")
+stats = {"requests": 0, "errors": 0}
+
+
+class Message(BaseModel):
+    role: str
+    content: str
+
+
+class ChatRequest(BaseModel):
+    model: str
+    messages: List[Message]
+    temperature: Optional[float] = None
+    max_tokens: Optional[int] = None
+    stream: bool = False
+    stream_options: Optional[dict] = None
+
+
+@app.get("/health")
+def health():
+    return {"status": "ok", **stats}
+
+
+@app.post("/v1/chat/completions")
+async def chat(req: ChatRequest):
+    stats["requests"] += 1
+    delay = max(0.0, LATENCY_MS + random.uniform(-JITTER_MS, JITTER_MS)) / 1000
+    await asyncio.sleep(delay)
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        stats["errors"] += 1
+        return JSONResponse({"error": {"message": "stub: injected failure"}}, status_code=503)
+    prompt = req.messages[-1].content if req.messages else ""
+    content = f"[{req.model} ANSWER] {prompt[:80]}..."
+    usage = {
+        "prompt_tokens": len(prompt.split()),
+        "completion_tokens": len(content.split()),
+        "total_tokens": len(prompt.split()) + len(content.split()),
+    }
+    head = {"id": f"stub-{stats['requests']}", "created": int(time.time()), "model": req.model}
+    if req.stream:
+        include_usage = bool((req.stream_options or {}).get("include_usage"))
+        return StreamingResponse(_events(head, content, usage if include_usage else None),
+                                 media_type="text/event-stream")
+    return {
+        **head,
+        "object": "chat.completion",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": usage,
+    }
+
+
+async def _events(head: dict, content: str, usage: Optional[dict]):
+    def event(choices, **extra):
+        return f"data: {json.dumps({**head, 'object': 'chat.completion.chunk', 'choices': choices, **extra})}\n\n"
+
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        if i and TOKEN_MS:
+            await asyncio.sleep(TOKEN_MS / 1000)
+        piece = word if i == 0 else " " + word
+        yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+    yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    if usage is not None:
+        yield event([], usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+@contextmanager
+def running(port: int, latency_ms: float = LATENCY_MS, jitter_ms: float = JITTER_MS, timeout: float = 30.0,
+            token_ms: float = TOKEN_MS, error_rate: float = ERROR_RATE):
+    """Run the stub in a subprocess for the duration of a `with` block; yields its base URL."""
+    env = {
+        **os.environ,
+        "PYTHONPATH": str(REPO_ROOT),
+        "POR_STUB_LATENCY_MS": str(latency_ms),
+        "POR_STUB_JITTER_MS": str(jitter_ms),
+        "POR_STUB_TOKEN_MS": str(token_ms),
+        "POR_STUB_ERROR_RATE": str(error_rate),
+    }
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "benchmarks.runners.stub_model_server:app",
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT,
+        env=env,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if proc.poll() is not None:
+                raise RuntimeError(f"stub model server exited with code {proc.returncode}")
+            try:
+                with urllib.request.urlopen(f"{base_url}/health", timeout=1):
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"stub model server did not start within {timeout:.0f}s")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve fake chat completions with a fixed latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=JITTER_MS)
+    parser.add_argument("--token-ms", type=float, default=TOKEN_MS, help="Delay between streamed words")
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE, help="Fraction of calls answered with 503")
+    args = parser.parse_args()
+
+    import uvicorn
+
+    os.environ["POR_STUB_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["POR_STUB_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["POR_STUB_TOKEN_MS"] = str(args.token_ms)
+    os.environ["POR_STUB_ERROR_RATE"] = str(args.error_rate)
+    sys.path.insert(0, str(REPO_ROOT))
+    uvicorn.run("benchmarks.runners.stub_model_server:app", host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
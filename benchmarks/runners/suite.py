@@ -0,0 +1,70 @@
+"""
+Run the PoR benchmark in one process, on the offline dummy models.
+
+For every track config: one solo run per `models.solo` entry and one
+resonance run per `models.multi_pairs` entry, all tracks' tasks at once
+on a bounded number of workers. Each pair is then scored against the solo
+run of its first model. This is tournament.py with the dummy backend; use
+that against real endpoints.
+
+    python benchmarks/runners/suite.py --out-dir results/ --workers 4
+    python benchmarks/runners/suite.py --config benchmarks/configs/memory_v1.yaml
+
+Writes <out-dir>/<track>/{solo_<model>,resonance_<a>_<b>,eval_<a>_<b>}.jsonl
+and <out-dir>/summary.json with per-stage and per-item timings.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import load_config  # noqa: E402
+from benchmarks.runners.models import Models  # noqa: E402
+from benchmarks.runners.run_resonance_two_model import dummy_model  # noqa: E402
+from benchmarks.runners.tournament import (  # noqa: E402
+    DEFAULT_CONFIGS, union_config, format_summary, run_tournament,
+)
+
+DEFAULT_WORKERS = 16
+
+
+def run_suite(
+    configs: Sequence[str] = DEFAULT_CONFIGS,
+    out_dir="benchmark_results",
+    workers: Optional[int] = None,
+) -> dict:
+    """Run every track's solo and resonance items with `workers` tasks in flight, then score them."""
+    started = time.perf_counter()
+    cfgs = [load_config(path) for path in configs]
+    workers = workers or DEFAULT_WORKERS
+    models = Models.from_config(union_config(cfgs), concurrency=workers, dummy=dummy_model)
+    summary = asyncio.run(run_tournament(cfgs, out_dir, models, True, workers))
+    summary["stages"]["total"] = time.perf_counter() - started
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run solo, resonance and scoring for one or more tracks.")
+    parser.add_argument("--config", action="append", help="Track config (repeatable; default: all tracks)")
+    parser.add_argument("--out-dir", default="benchmark_results")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Tasks in flight at once (default {DEFAULT_WORKERS})")
+    args = parser.parse_args()
+
+    summary = run_suite(args.config or DEFAULT_CONFIGS, args.out_dir, args.workers)
+    print(format_summary(summary))
+    print(f"Saved benchmark summary → {Path(args.out_dir) / 'summary.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Per-call telemetry of benchmark runs: where the time and tokens went.
+
+Runners given --telemetry calls.jsonl write one record per model call (see
+models.py for the fields) and print this report when they finish; it can
+also be rebuilt from the file:
+
+    python benchmarks/runners/telemetry.py calls.jsonl --json calls_summary.json
+
+Latency percentiles cover calls that reached a model; cache hits are only
+counted. Records are grouped by model, by role (a / b in a resonance loop,
+solo) and by step, so it shows whether model A or B dominates wall time and
+how latency grows with the turn number.
+"""
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import JsonlWriter, completed_ids, iter_jsonl  # noqa: E402
+from benchmarks.runners.load_test import percentile  # noqa: E402
+
+GROUPS = ("model", "role", "step")
+PERCENTILES = (50, 95, 99)
+
+
+def open_sink(path, append: bool = False, fsync_every: int = 100) -> JsonlWriter:
+    """A writer for telemetry records; appending first cuts off a torn last record."""
+    if append:
+        completed_ids(path, key="model")
+    return JsonlWriter(path, append=append, fsync_every=fsync_every)
+
+
+def _new_group():
+    return {"calls": 0, "cached": 0, "errors": 0, "retries": 0, "wall": [], "ttft": [],
+            "prompt_tokens": 0, "completion_tokens": 0, "queue_ms": 0.0}
+
+
+def _finish(g: dict, total_wall: float) -> dict:
+    wall, ttft = sorted(g.pop("wall")), sorted(g.pop("ttft"))
+    g["wall_s"] = round(sum(wall) / 1000, 3)
+    g["wall_share"] = round(sum(wall) / total_wall, 4) if total_wall else 0.0
+    g["queue_s"] = round(g.pop("queue_ms") / 1000, 3)
+    g["wall_ms"] = {f"p{p}": round(percentile(wall, p), 3) for p in PERCENTILES} if wall else None
+    g["ttft_ms"] = {f"p{p}": round(percentile(ttft, p), 3) for p in PERCENTILES} if ttft else None
+    return g
+
+
+def summarize(records: Iterable[dict], groups=GROUPS) -> Dict:
+    """Counts, token totals and wall / TTFT percentiles per value of each of `groups`."""
+    by = {name: defaultdict(_new_group) for name in groups}
+    total = _new_group()
+    for r in records:
+        targets = [total] + [by[name][str(r[name])] for name in groups if r.get(name) is not None]
+        for g in targets:
+            g["calls"] += 1
+            if r.get("cached"):
+                g["cached"] += 1
+                continue
+            g["errors"] += r.get("error") is not None
+            g["retries"] += r.get("retries") or 0
+            g["queue_ms"] += r.get("queue_ms") or 0.0
+            g["wall"].append(r["wall_ms"])
+            if r.get("ttft_ms") is not None:
+                g["ttft"].append(r["ttft_ms"])
+            g["prompt_tokens"] += r.get("prompt_tokens") or 0
+            g["completion_tokens"] += r.get("completion_tokens") or 0
+    total_wall = sum(total["wall"])
+    return {
+        "total": _finish(total, total_wall),
+        **{name: {k: _finish(g, total_wall) for k, g in _sorted(by[name])} for name in groups},
+    }
+
+
+def _sorted(groups: dict):
+    # Steps sort numerically, everything else by name.
+    return sorted(groups.items(), key=lambda kv: (not kv[0].isdigit(), int(kv[0]) if kv[0].isdigit() else 0, kv[0]))
+
+
+def _fmt(p: Optional[dict]) -> str:
+    if not p:
+        return " ".join(f"{'-':>8}" for _ in PERCENTILES)
+    return f"{p['p50']:>8.1f} {p['p95']:>8.1f} {p['p99']:>8.1f}"
+
+
+def format_summary(summary: Dict) -> str:
+    header = (f"  {'':<16} {'calls':>7} {'cached':>7} {'retry':>6} {'err':>5} {'wall s':>9} {'share':>6}"
+              f" {'wall p50':>8} {'p95':>8} {'p99':>8} {'ttft p50':>8} {'p95':>8} {'p99':>8}"
+              f" {'tok in':>9} {'tok out':>9}")
+    lines = []
+    for name in ["total", *GROUPS]:
+        if name not in summary or (name != "total" and not summary[name]):
+            continue
+        rows = {"all": summary[name]} if name == "total" else summary[name]
+        lines.append(f"by {name}:" if name != "total" else "all calls:")
+        lines.append(header)
+        for key, g in rows.items():
+            lines.append(
+                f"  {key[:16]:<16} {g['calls']:>7} {g['cached']:>7} {g['retries']:>6} {g['errors']:>5}"
+                f" {g['wall_s']:>9.2f} {g['wall_share']:>6.1%} {_fmt(g['wall_ms'])} {_fmt(g['ttft_ms'])}"
+                f" {g['prompt_tokens']:>9} {g['completion_tokens']:>9}"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise per-call telemetry from a benchmark run.")
+    parser.add_argument("telemetry", help="JSONL written by a runner's --telemetry")
+    parser.add_argument("--json", help="Also write the summary as JSON here")
+    args = parser.parse_args()
+
+    summary = summarize(iter_jsonl(args.telemetry))
+    print(format_summary(summary))
+    if args.json:
+        Path(args.json).write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        print(f"Saved telemetry summary → {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+Run every solo model and model pair of one or more tracks as one tournament.
+
+    python benchmarks/runners/tournament.py --out-dir tournament/ \\
+        --backend http --base-url http://127.0.0.1:8900 --concurrency 128
+
+Each track config expands into work items: a solo run per `models.solo`
+entry (plus the first model of any pair not listed there, which its PoR-Gain
+is measured against) and a resonance run per `models.multi_pairs` entry.
+All items' tasks share one pool of --concurrency workers, taken round-robin
+across items, and one set of model clients, connection pools, response
+cache, rate limits and in-flight limit. Each pair is then scored against
+its first model's solo run.
+
+Writes <out-dir>/<track>/{solo_<model>,resonance_<a>_<b>,eval_<a>_<b>}.jsonl
+and <out-dir>/tournament.json with per-item counts and, per track, a
+PoR-Gain and PoR total matrix: rows are model A, columns model B, and
+entries are means over tasks (null where a pair was not run). suite.py
+(`por benchmark`) is the same run on the offline dummy models.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from benchmarks.runners.common import (  # noqa: E402
+    REPO_ROOT, JsonlWriter, add_output_args, completed_ids, for_each, iter_jsonl, iter_tasks, load_config,
+)
+from benchmarks.runners.distance import BACKENDS  # noqa: E402
+from benchmarks.runners.evaluate_por_score import DEFAULT_DISTANCE, evaluate_files, evaluate_sharded  # noqa: E402
+from benchmarks.runners.models import (  # noqa: E402
+    DummyClient, ModelError, Models, add_model_args, call_params, models_from_args,
+)
+from benchmarks.runners.response_cache import CacheMiss  # noqa: E402
+from benchmarks.runners.run_resonance_two_model import dummy_model, resonance_loop_async, resonance_result  # noqa: E402
+from benchmarks.runners.run_solo import dummy_solo_model, solo_result  # noqa: E402
+from benchmarks.runners.telemetry import format_summary as format_telemetry, open_sink, summarize  # noqa: E402
+
+DEFAULT_CONFIGS = tuple(
+    str(REPO_ROOT / "benchmarks" / "configs" / f"{track}_v1.yaml")
+    for track in ("reasoning", "memory", "creative")
+)
+
+
+@dataclass
+class WorkItem:
+    track: str
+    kind: str  # "solo" or "resonance"
+    models: Tuple[str, ...]
+    out: Path
+    rows: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    writer: Optional[JsonlWriter] = field(default=None, repr=False)
+
+    @property
+    def name(self) -> str:
+        return ",".join(self.models)
+
+
+def expand(cfg: dict, out_dir: Path) -> List[WorkItem]:
+    """A track's work items: solo runs first, then one resonance run per distinct pair."""
+    track = cfg["track"]
+    pairs = list(dict.fromkeys(tuple(p) for p in cfg["models"].get("multi_pairs", [])))
+    solo = list(dict.fromkeys([m["name"] for m in cfg["models"].get("solo", [])] + [a for a, _ in pairs]))
+    items = [WorkItem(track, "solo", (m,), out_dir / track / f"solo_{m}.jsonl") for m in solo]
+    items += [WorkItem(track, "resonance", (a, b), out_dir / track / f"resonance_{a}_{b}.jsonl") for a, b in pairs]
+    return items
+
+
+def _round_robin(iterators) -> Iterator:
+    active = deque(iterators)
+    while active:
+        it = active.popleft()
+        for value in it:
+            active.append(it)
+            yield value
+            break
+
+
+def union_config(cfgs: Sequence[dict]) -> dict:
+    """One config naming every solo model of every track (the first entry per name wins)."""
+    solo = {}
+    for cfg in cfgs:
+        for m in cfg["models"].get("solo", []):
+            solo.setdefault(m["name"], m)
+    return {"models": {"solo": list(solo.values())}}
+
+
+async def run_items(tracks: Dict[str, dict], items: List[WorkItem], models: Models, dummy: bool,
+                    concurrency: int, resume: bool = False, shard=None, fsync_every: int = 100):
+    """Run every item's tasks on one shared pool of `concurrency` workers."""
+    views = {}
+    for track, cfg in tracks.items():
+        params = call_params(cfg)
+        views[track, "solo"] = models.bind(
+            params, DummyClient(dummy_solo_model) if dummy else None, track=track
+        )
+        views[track, "resonance"] = models.bind(params, track=track)
+
+    def work(item: WorkItem):
+        done = completed_ids(item.out) if resume else set()
+        item.skipped = len(done)
+        item.writer = JsonlWriter(item.out, append=resume, fsync_every=fsync_every)
+        for task in iter_tasks(tracks[item.track], skip=done, shard=shard):
+            yield item, task
+
+    started = time.perf_counter()
+
+    async def one(work_item):
+        item, task = work_item
+        view = views[item.track, item.kind]
+        if item.kind == "solo":
+            ans = await view.complete(item.models[0], task["prompt"], task_id=task["id"], role="solo")
+            row = solo_result(item.track, task, item.models[0], ans)
+        else:
+            a, b = item.models
+            steps = tracks[item.track]["resonance"]["steps"]
+            turns = await resonance_loop_async(view, a, b, task["prompt"], steps, task["id"])
+            row = resonance_result(item.track, task, a, b, steps, turns)
+        item.writer.write(row)
+        item.rows += 1
+        item.seconds = time.perf_counter() - started
+
+    try:
+        await for_each(_round_robin(work(item) for item in items), one, concurrency)
+    finally:
+        for item in items:
+            if item.writer is not None:
+                item.writer.close()
+
+
+def score_pairs(tracks: Dict[str, dict], items: List[WorkItem], out_dir: Path, distance: str = DEFAULT_DISTANCE,
+                workers: int = 1) -> List[dict]:
+    """
+    Evaluate each resonance item against its first model's solo run; returns
+    one result per pair. Means cover the scored tasks; unscorable ones are
+    counted in "errors".
+    """
+    results = []
+    for item in items:
+        if item.kind != "resonance":
+            continue
+        a, b = item.models
+        cfg = tracks[item.track]
+        solo_path = out_dir / item.track / f"solo_{a}.jsonl"
+        eval_path = out_dir / item.track / f"eval_{a}_{b}.jsonl"
+        started = time.perf_counter()
+        if workers > 1:
+            evaluate_sharded(solo_path, item.out, cfg, eval_path, workers, distance=distance)
+        else:
+            evaluate_files(solo_path, item.out, cfg, eval_path, distance=distance)
+        n = errors = total = gain = 0
+        for r in iter_jsonl(eval_path):
+            if r.get("error"):
+                errors += 1
+                continue
+            n, total, gain = n + 1, total + r["por_total"], gain + r["por_gain"]
+        results.append({
+            "track": item.track,
+            "pair": [a, b],
+            "tasks": n,
+            "errors": errors,
+            "por_total": total / n if n else None,
+            "por_gain": gain / n if n else None,
+            "seconds": time.perf_counter() - started,
+            "out": str(eval_path),
+        })
+    return results
+
+
+def matrices(results: List[dict]) -> Dict[str, dict]:
+    """Per track: models (in first-seen order) and PoR-Gain / PoR total matrices, rows A and columns B."""
+    out = {}
+    for track in dict.fromkeys(r["track"] for r in results):
+        rows = [r for r in results if r["track"] == track]
+        names = list(dict.fromkeys(m for r in rows for m in r["pair"]))
+        index = {m: i for i, m in enumerate(names)}
+        gain = [[None] * len(names) for _ in names]
+        total = [[None] * len(names) for _ in names]
+        for r in rows:
+            a, b = (index[m] for m in r["pair"])
+            gain[a][b], total[a][b] = r["por_gain"], r["por_total"]
+        out[track] = {"models": names, "por_gain": gain, "por_total": total}
+    return out
+
+
+def format_matrix(track: str, m: dict, key: str = "por_gain") -> str:
+    width = max(8, *(len(n) for n in m["models"]))
+    lines = [f"{track} {key} (rows: model A, columns: model B)",
+             " " * width + "".join(f" {n:>{width}}" for n in m["models"])]
+    for name, row in zip(m["models"], m[key]):
+        cells = "".join(f" {'-':>{width}}" if v is None else f" {v:>+{width}.4f}" for v in row)
+        lines.append(f"{name:<{width}}{cells}")
+    return "\n".join(lines)
+
+
+async def run_tournament(cfgs: Sequence[dict], out_dir, models: Models, dummy: bool, concurrency: int,
+                         resume: bool = False, shard=None, fsync_every: int = 100,
+                         distance: str = DEFAULT_DISTANCE, eval_workers: int = 1) -> dict:
+    """Run and score every item of the track configs on `models`, which it closes. Returns the summary."""
+    tracks = {cfg["track"]: cfg for cfg in cfgs}
+    out_dir = Path(out_dir)
+    items = [item for cfg in cfgs for item in expand(cfg, out_dir)]
+
+    started = time.perf_counter()
+    try:
+        await run_items(tracks, items, models, dummy, concurrency, resume, shard, fsync_every)
+    finally:
+        if models.cache is not None:
+            print(f"Response cache: {models.cache.stats()}")
+        await models.close()
+    runs = time.perf_counter() - started
+
+    started = time.perf_counter()
+    results = score_pairs(tracks, items, out_dir, distance, eval_workers)
+    return {
+        "stages": {"runs": runs, "evaluate": time.perf_counter() - started},
+        "items": [
+            {"track": i.track, "kind": i.kind, "name": i.name, "rows": i.rows, "skipped": i.skipped,
+             "seconds": i.seconds, "out": str(i.out)}
+            for i in items
+        ],
+        "results": results,
+        "matrices": matrices(results),
+    }
+
+
+async def _run(args) -> dict:
+    cfgs = [load_config(path) for path in args.config or DEFAULT_CONFIGS]
+    models = models_from_args(union_config(cfgs), args, dummy_model)
+    telemetry = open_sink(args.telemetry, args.resume, args.fsync_every) if args.telemetry else None
+    models.telemetry = telemetry.write if telemetry else None
+    try:
+        summary = await run_tournament(cfgs, args.out_dir, models, args.backend == "dummy", args.concurrency,
+                                       args.resume, args.shard, args.fsync_every, args.distance,
+                                       args.eval_workers)
+    finally:
+        if telemetry is not None:
+            telemetry.close()
+    out_dir = Path(args.out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / "tournament.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    return summary
+
+
+def format_summary(summary: dict) -> str:
+    lines = [f"{'kind':<10} {'track':<10} {'item':<24} {'rows':>7} {'skipped':>7} {'s':>8}"]
+    for i in summary["items"]:
+        lines.append(f"{i['kind']:<10} {i['track']:<10} {i['name']:<24} {i['rows']:>7} {i['skipped']:>7} "
+                     f"{i['seconds']:8.2f}")
+    lines.append("")
+    for stage, seconds in summary["stages"].items():
+        lines.append(f"{stage:<10} {seconds:9.2f} s")
+    for track, m in summary["matrices"].items():
+        lines.append("")
+        lines.append(format_matrix(track, m))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run every solo model and pair of the track configs in one process.")
+    parser.add_argument("--config", action="append", help="Track config (repeatable; default: all tracks)")
+    parser.add_argument("--out-dir", default="tournament_results")
+    parser.add_argument("--distance", choices=BACKENDS, default=DEFAULT_DISTANCE, help="Evaluator turn distance")
+    parser.add_argument("--eval-workers", type=int, default=1, help="Evaluator processes per pair")
+    add_output_args(parser)
+    add_model_args(parser)
+    args = parser.parse_args()
+
+    try:
+        summary = asyncio.run(_run(args))
+    except (CacheMiss, ModelError) as e:
+        raise SystemExit(f"error: {e}")
+
+    if args.telemetry:
+        print(format_telemetry(summarize(iter_jsonl(args.telemetry))))
+    print(format_summary(summary))
+    print(f"Saved tournament summary → {Path(args.out_dir) / 'tournament.json'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Compact storage for resonance runs.
+
+Row packing: each turn's input is the previous turn's b_output (and the
+first input is the task prompt), so a resonance row stores every text at
+least twice. A packed row keeps each distinct text once in a per-row
+string table and turns as [input, a_output, b_output] indices into it:
+
+    {"mode": "resonance", "task_id": ..., "texts": ["prompt", "A1", "B1", ...],
+     "turns": [[0, 1, 2], [2, 3, 4], ...]}
+
+Packed rows are still JSONL lines, so resuming, sorting, sharding and
+merging work on them unchanged. Turn i is step i.
+
+Block compression: an output path ending in .gz or .zst is written as a
+series of independent gzip members / zstd frames, one per fsync block of
+lines. A crash can only tear the last block, which recover() cuts off.
+zstd needs the optional `zstandard` package.
+
+Readers:
+
+    iter_lines(path)    decoded lines of a plain or compressed file
+    iter_rows(path)     rows one at a time, packed or not
+    turns(row)          (step, input, a_output, b_output) of either layout
+"""
+import gzip
+import json
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+CODECS = {".gz": "gzip", ".zst": "zstd"}
+
+_READ_SIZE = 1 << 20
+
+
+def codec_for(path) -> str:
+    return CODECS.get(Path(path).suffix, "none")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("zstd output needs the zstandard package (pip install zstandard)") from None
+    return zstandard
+
+
+def compress_block(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    if codec == "zstd":
+        return _zstd().ZstdCompressor(level=3).compress(data)
+    return data
+
+
+def _decompressor(codec: str):
+    if codec == "gzip":
+        return zlib.decompressobj(wbits=31)
+    return _zstd().ZstdDecompressor().decompressobj()
+
+
+def iter_blocks(path) -> Iterator[Tuple[int, bytes]]:
+    """
+    (end offset, decompressed data) of each complete block of a compressed
+    file. An incomplete last block (a torn write) is not yielded.
+    """
+    codec = codec_for(path)
+    with open(path, "rb") as f:
+        d, out, offset, pending = _decompressor(codec), [], 0, b""
+        while True:
+            chunk = pending or f.read(_READ_SIZE)
+            pending = b""
+            if not chunk:
+                return
+            out.append(d.decompress(chunk))
+            if d.eof:
+                rest = d.unused_data
+                offset += len(chunk) - len(rest)
+                yield offset, b"".join(out)
+                d, out, pending = _decompressor(codec), [], rest
+            else:
+                offset += len(chunk)
+
+
+def iter_lines(path) -> Iterator[str]:
+    if codec_for(path) == "none":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+        return
+    for _, data in iter_blocks(path):
+        yield from data.decode("utf-8").splitlines(keepends=True)
+
+
+def recover(path) -> List[str]:
+    """Cut a torn last block off a compressed file; returns its complete lines."""
+    lines, good = [], 0
+    for good, data in iter_blocks(path):
+        lines.extend(data.decode("utf-8").splitlines(keepends=True))
+    with open(path, "r+b") as f:
+        f.truncate(good)
+    return lines
+
+
+def pack_row(row: dict) -> dict:
+    """Replace a row's turn dicts with a string table and index triples."""
+    texts: List[str] = []
+    index = {}
+
+    def ref(s: str) -> int:
+        i = index.get(s)
+        if i is None:
+            i = index[s] = len(texts)
+            texts.append(s)
+        return i
+
+    ids = [[ref(t["input"]), ref(t["a_output"]), ref(t["b_output"])] for t in row["turns"]]
+    packed = {k: v for k, v in row.items() if k != "turns"}
+    packed["texts"] = texts
+    packed["turns"] = ids
+    return packed
+
+
+def is_packed(row: dict) -> bool:
+    return "texts" in row
+
+
+def turns(row: dict) -> Iterator[Tuple[int, str, str, str]]:
+    """(step, input, a_output, b_output) for every turn, without expanding a packed row."""
+    if is_packed(row):
+        texts = row["texts"]
+        for step, (i, a, b) in enumerate(row["turns"]):
+            yield step, texts[i], texts[a], texts[b]
+    else:
+        for t in row["turns"]:
+            yield t["step"], t["input"], t["a_output"], t["b_output"]
+
+
+def unpack_row(row: dict) -> dict:
+    """The plain layout of a (possibly packed) row."""
+    if not is_packed(row):
+        return row
+    plain = {k: v for k, v in row.items() if k not in ("texts", "turns")}
+    plain["turns"] = [
+        {"step": step, "input": i, "a_output": a, "b_output": b} for step, i, a, b in turns(row)
+    ]
+    return plain
+
+
+def iter_rows(path) -> Iterator[dict]:
+    for line in iter_lines(path):
+        if line.strip():
+            yield json.loads(line)
@@ -1,117 +1,218 @@
+"""
+Regenerate the PoR docs visuals.
+
+    python docs/visuals/generate_all_por_visuals.py [--workers 4] [--force]
+
+or, from Python:
+
+    from docs.visuals.generate_all_por_visuals import build
+    build(seed=0)
+
+Each figure is a task with declared inputs: the trajectory parameters, its
+dpi, the source of the function that draws it and a digest of the engine
+and chart modules (por_core, app.charts, app.tasks). Tasks whose input hash
+and output file match the last build are skipped; the rest render in a
+process pool from one shared recorded trajectory (an .npy file, memory-
+mapped by the workers).
+"""
+import argparse
+import functools
+import hashlib
+import inspect
+import json
 import os
-import numpy as np
-import matplotlib.pyplot as plt
-
-from por_core.simulator import ResonanceSimulator
-from por_core.metrics import stability_score, coherence
-
-
-# -------------------------------------------------------------
-#  Ensure output directory exists
-# -------------------------------------------------------------
-OUTPUT_DIR = os.path.dirname(__file__)
-print("Saving images to:", OUTPUT_DIR)
-
-
-# -------------------------------------------------------------
-#  Run Resonance Simulation
-# -------------------------------------------------------------
-sim = ResonanceSimulator(chain_length=64)
-initial_chain = sim.chain.copy()
-
-history = []
-
-for _ in range(200):
-    sim.run_iterations(1)
-    history.append(sim.chain.copy())
-
-history = np.array(history)  # shape = (200, 64)
-
-
-# -------------------------------------------------------------
-#  Compute metrics
-# -------------------------------------------------------------
-final_stability = stability_score(sim.chain)
-final_coherence = coherence(sim.chain)
-
-print("Final Stability:", final_stability)
-print("Final Coherence:", final_coherence)
-
-
-# -------------------------------------------------------------
-#  1. Stabilization Curve
-# -------------------------------------------------------------
-stability_curve = [stability_score(h) for h in history]
-
-plt.figure(figsize=(8, 4))
-plt.plot(stability_curve, linewidth=2)
-plt.title("Stability Over Iterations", fontsize=14)
-plt.xlabel("Iteration")
-plt.ylabel("Stability Score")
-plt.grid(True)
-
-plt.savefig(os.path.join(OUTPUT_DIR, "1_stabilization_curve.png"), dpi=200)
-plt.close()
-
-
-# -------------------------------------------------------------
-#  2. Coherence Heatmap
-# -------------------------------------------------------------
-coherence_matrix = np.array([coherence(h) for h in history])
-
-plt.figure(figsize=(8, 4))
-plt.imshow(coherence_matrix.reshape(-1, 1), aspect='auto', cmap="viridis")
-plt.colorbar(label="Coherence")
-plt.title("Coherence Heatmap", fontsize=14)
-plt.xlabel("Time")
-plt.ylabel("Coherence Level")
-
-plt.savefig(os.path.join(OUTPUT_DIR, "2_coherence_heatmap.png"), dpi=200)
-plt.close()
-
-
-# -------------------------------------------------------------
-#  3. Resonance Locking Trajectory (3D)
-# -------------------------------------------------------------
-from mpl_toolkits.mplot3d import Axes3D  # noqa
-
-fig = plt.figure(figsize=(7, 5))
-ax = fig.add_subplot(111, projection="3d")
-
-x = np.arange(64)
-y = np.arange(len(history))
-X, Y = np.meshgrid(x, y)
-Z = history
-
-ax.plot_surface(X, Y, Z, cmap="plasma", linewidth=0, antialiased=True)
-
-ax.set_title("Resonance Locking Trajectory", fontsize=14)
-ax.set_xlabel("Chain Position")
-ax.set_ylabel("Iteration")
-ax.set_zlabel("Value")
-
-plt.savefig(os.path.join(OUTPUT_DIR, "3_resonance_locking.png"), dpi=200)
-plt.close()
-
-
-# -------------------------------------------------------------
-#  4. PoR Metrics Over Time
-# -------------------------------------------------------------
-stability_curve = [stability_score(h) for h in history]
-coherence_curve = [coherence(h) for h in history]
-
-plt.figure(figsize=(8, 4))
-plt.plot(stability_curve, label="Stability", linewidth=2)
-plt.plot(coherence_curve, label="Coherence", linewidth=2)
-plt.title("PoR Metrics Over Time", fontsize=14)
-plt.xlabel("Iteration")
-plt.ylabel("Metric Value")
-plt.legend()
-plt.grid(True)
-
-plt.savefig(os.path.join(OUTPUT_DIR, "4_por_metrics_over_time.png"), dpi=200)
-plt.close()
-
-
-print("\n✔ All PoR visuals generated successfully!")
-print("✔ Files saved in:", OUTPUT_DIR)
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np  # noqa: E402
+
+import por_core  # noqa: E402
+from por_core.config import PoRConfig  # noqa: E402
+from app import charts, tasks  # noqa: E402
+from app.cache import cache_key  # noqa: E402
+from app.charts import CHART_ROWS, DRAW, render_figure, sampled_history  # noqa: E402
+
+OUTPUT_DIR = Path(__file__).resolve().parent
+
+# Output file -> chart kind (see app.charts).
+FIGURES = {
+    "1_stabilization_curve.png": "stabilization",
+    "2_coherence_heatmap.png": "coherence",
+    "3_resonance_locking.png": "locking",
+    "4_por_metrics_over_time.png": "metrics",
+}
+
+
+def file_digest(path: Path) -> Optional[str]:
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+@functools.lru_cache(maxsize=None)
+def code_digest() -> str:
+    """Digest of the simulation and chart code: a change to any of it invalidates trajectories and figures."""
+    files = sorted(Path(por_core.__file__).parent.glob("*.py")) + [Path(charts.__file__), Path(tasks.__file__)]
+    h = hashlib.sha256()
+    for path in files:
+        h.update(path.relative_to(REPO_ROOT).as_posix().encode("utf-8") + b"\0")
+        h.update(hashlib.sha256(path.read_bytes()).digest())
+    return h.hexdigest()
+
+
+def task_inputs(kind: str, trajectory: dict, dpi: int) -> str:
+    """Hash of everything a figure depends on, including the code that draws it."""
+    draw = DRAW[kind][0]
+    return cache_key({
+        "kind": "visual",
+        "chart": kind,
+        "trajectory": trajectory,
+        "dpi": dpi,
+        "code": inspect.getsource(draw) + inspect.getsource(render_figure),
+        "modules": code_digest(),
+    })
+
+
+def record_trajectory(trajectory: dict, cache_dir: Path) -> Path:
+    """
+    Record the shared trajectory once per parameter set and engine code.
+    Returns the path of an .npy file holding the history, sampled every
+    max(1, steps // CHART_ROWS) steps.
+    """
+    key = cache_key({"kind": "trajectory", **trajectory, "modules": code_digest()})
+    path = cache_dir / f"trajectory-{key[:16]}.npy"
+    if not path.exists():
+        config = PoRConfig(
+            chain_length=trajectory["chain_length"],
+            noise_level=trajectory["noise_level"],
+            phase_strength=trajectory["phase_strength"],
+        )
+        _, history = sampled_history(trajectory["steps"], config, trajectory["seed"])
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp.npy")
+        np.save(tmp, history)
+        os.replace(tmp, path)
+    return path
+
+
+def render_task(kind: str, trajectory_path: str, every: int, out_path: str, dpi: int) -> str:
+    """Pool task: draw one figure from the shared trajectory; returns the output digest."""
+    history = np.load(trajectory_path, mmap_mode="r")
+    image = render_figure(kind, (np.arange(len(history)) + 1) * every, history, dpi=dpi)
+    out = Path(out_path)
+    tmp = out.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(image)
+    os.replace(tmp, out)
+    return hashlib.sha256(image).hexdigest()
+
+
+def build(
+    out_dir: Path = OUTPUT_DIR,
+    steps: int = 200,
+    chain_length: int = 64,
+    seed: int = 0,
+    dpi: int = 200,
+    workers: Optional[int] = None,
+    force: bool = False,
+    only: Optional[Iterable[str]] = None,
+) -> Dict[str, str]:
+    """
+    Bring the figures in `out_dir` up to date. Returns each output file's
+    outcome: "rendered", "skipped" or "failed: <error>".
+    """
+    out_dir = Path(out_dir)
+    cache_dir = out_dir / ".cache"
+    manifest_path = cache_dir / "manifest.json"
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        manifest = {}
+
+    defaults = PoRConfig()
+    trajectory = {
+        "steps": steps,
+        "chain_length": chain_length,
+        "seed": seed,
+        "noise_level": defaults.noise_level,
+        "phase_strength": defaults.phase_strength,
+    }
+
+    outcome, todo = {}, {}
+    for filename, kind in FIGURES.items():
+        if only and filename not in only and kind not in only:
+            continue
+        inputs = task_inputs(kind, trajectory, dpi)
+        entry = manifest.get(filename, {})
+        up_to_date = entry.get("inputs") == inputs and entry.get("output") == file_digest(out_dir / filename)
+        if up_to_date and not force:
+            outcome[filename] = "skipped"
+        else:
+            todo[filename] = (kind, inputs)
+
+    if todo:
+        trajectory_path = record_trajectory(trajectory, cache_dir)
+        every = max(1, steps // CHART_ROWS)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        with ProcessPoolExecutor(max_workers=min(len(todo), workers or os.cpu_count() or 1)) as pool:
+            futures = {
+                filename: pool.submit(render_task, kind, str(trajectory_path), every, str(out_dir / filename), dpi)
+                for filename, (kind, _) in todo.items()
+            }
+            for filename, future in futures.items():
+                try:
+                    digest = future.result()
+                except Exception as e:
+                    manifest.pop(filename, None)
+                    outcome[filename] = f"failed: {e}"
+                else:
+                    manifest[filename] = {"inputs": todo[filename][1], "output": digest}
+                    outcome[filename] = "rendered"
+
+        for stale in cache_dir.glob("trajectory-*.npy"):
+            if stale != trajectory_path:
+                stale.unlink()
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+    return {filename: outcome[filename] for filename in FIGURES if filename in outcome}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate the PoR docs visuals.")
+    parser.add_argument("--out", default=str(OUTPUT_DIR), help="Output directory")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--chain-length", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dpi", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Re-render even if nothing changed")
+    parser.add_argument("--only", nargs="+", help="Figure files or chart kinds to build")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    outcome = build(
+        out_dir=Path(args.out),
+        steps=args.steps,
+        chain_length=args.chain_length,
+        seed=args.seed,
+        dpi=args.dpi,
+        workers=args.workers,
+        force=args.force,
+        only=args.only,
+    )
+    for filename, result in outcome.items():
+        print(f"{result:>10}  {filename}")
+    print(f"Visuals in {args.out} up to date ({time.perf_counter() - started:.2f}s)")
+    if any(result.startswith("failed") for result in outcome.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,17 @@
 # por_core/__init__.py
 from .config import PoRConfig
-from .metrics import stability_score, coherence
+from .metrics import stability_score, coherence, stability_scores, coherence_scores
 from .phase_lock import phase_lock
 from .simulator import ResonanceSimulator
+from .ensemble import ResonanceEnsemble
 
 __all__ = [
     "PoRConfig",
     "stability_score",
     "coherence",
+    "stability_scores",
+    "coherence_scores",
     "phase_lock",
     "ResonanceSimulator",
+    "ResonanceEnsemble",
 ]
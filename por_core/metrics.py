@@ -16,8 +16,24 @@ def coherence(chain: np.ndarray) -> float:
     Coherence = normalized autocorrelation strength.
     Measures harmonic alignment across the chain.
     """
-    chain = chain - np.mean(chain)
-    autocorr = np.correlate(chain, chain, mode="full")
-    mid = len(autocorr) // 2
-    norm = autocorr[mid] if autocorr[mid] != 0 else 1e-6
-    return float(abs(autocorr[mid + 1] / norm))
+    return float(coherence_scores(chain))
+
+def stability_scores(chains: np.ndarray) -> np.ndarray:
+    """
+    Row-wise stability_score for a 2-D array (ensemble of chains or a
+    recorded history of snapshots).
+    """
+    variance = np.var(np.diff(chains, axis=-1), axis=-1)
+    return np.maximum(0.0, 1.0 - variance)
+
+def coherence_scores(chains: np.ndarray) -> np.ndarray:
+    """
+    Row-wise coherence for a 2-D array (also accepts a single chain).
+    Only the lag-0 and lag-1 autocorrelation terms are needed, so they
+    are summed directly instead of running a full np.correlate.
+    """
+    centered = chains - np.mean(chains, axis=-1, keepdims=True)
+    lag0 = np.sum(centered * centered, axis=-1)
+    lag1 = np.sum(centered[..., 1:] * centered[..., :-1], axis=-1)
+    norm = np.where(lag0 != 0, lag0, 1e-6)
+    return np.abs(lag1 / norm)
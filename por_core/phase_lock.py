@@ -6,9 +6,10 @@ def phase_lock(chain: np.ndarray, strength: float) -> np.ndarray:
     """
     Performs harmonic phase alignment.
     Moves values slightly toward local harmonic mean.
+    Works along the last axis, so a 2-D array locks every row at once.
     """
     new_chain = chain.copy()
-    for i in range(1, len(chain) - 1):
-        local_mean = (chain[i - 1] + chain[i] + chain[i + 1]) / 3
-        new_chain[i] = chain[i] + strength * (local_mean - chain[i])
+    inner = chain[..., 1:-1]
+    local_mean = (chain[..., :-2] + inner + chain[..., 2:]) / 3
+    new_chain[..., 1:-1] = inner + strength * (local_mean - inner)
     return new_chain
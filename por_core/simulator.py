@@ -1,5 +1,7 @@
 # por_core/simulator.py
 
+from typing import Optional
+
 import numpy as np
 from .config import PoRConfig
 from .metrics import stability_score, coherence
@@ -14,14 +16,20 @@ class ResonanceSimulator:
       - tracks stability & coherence over time
     """
 
-    def __init__(self, chain_length: int = 64):
-        self.config = PoRConfig(chain_length=chain_length)
-        self.chain = np.random.uniform(-1, 1, chain_length)
+    def __init__(
+        self,
+        chain_length: int = 64,
+        seed: Optional[int] = None,
+        config: Optional[PoRConfig] = None,
+    ):
+        self.config = config or PoRConfig(chain_length=chain_length)
+        self.rng = np.random.default_rng(seed)
+        self.chain = self.rng.uniform(-1, 1, self.config.chain_length)
 
     def step(self):
         """Single simulation step."""
         # noise injection
-        noise = np.random.normal(0, self.config.noise_level, len(self.chain))
+        noise = self.rng.normal(0, self.config.noise_level, len(self.chain))
         self.chain += noise
 
         # phase alignment
@@ -32,6 +40,18 @@ class ResonanceSimulator:
         for _ in range(steps):
             self.step()
 
+    def record(self, steps: int = 200, every: int = 1) -> np.ndarray:
+        """
+        Run N steps, keeping a copy of the chain every `every` steps.
+        Returns an array of shape (steps // every, chain_length).
+        """
+        history = np.empty((steps // every, len(self.chain)))
+        for i in range(len(history)):
+            self.run_iterations(every)
+            history[i] = self.chain
+        self.run_iterations(steps - len(history) * every)
+        return history
+
     def metrics(self):
         """Return stability & coherence."""
         return {
@@ -8,12 +8,20 @@ class CLIPLoader:
         self.model, self.preprocess = clip.load(model_name, self.device)
 
     def embed_text(self, text: str):
-        tokens = clip.tokenize([text]).to(self.device)
-        with torch.no_grad():
-            return self.model.encode_text(tokens).cpu().numpy()[0]
+        return self.embed_texts([text])[0]
 
     def embed_image(self, image_path: str):
-        image = Image.open(image_path).convert("RGB")
-        img_tensor = self.preprocess(image).unsqueeze(0).to(self.device)
+        return self.embed_images([image_path])[0]
+
+    def embed_texts(self, texts):
+        """Embed a list of texts in a single forward pass (cut to CLIP's 77-token context)."""
+        tokens = clip.tokenize(list(texts), truncate=True).to(self.device)
+        with torch.no_grad():
+            return self.model.encode_text(tokens).cpu().numpy()
+
+    def embed_images(self, image_paths):
+        """Embed a list of images in a single forward pass."""
+        images = [self.preprocess(Image.open(p).convert("RGB")) for p in image_paths]
+        img_tensor = torch.stack(images).to(self.device)
         with torch.no_grad():
-            return self.model.encode_image(img_tensor).cpu().numpy()[0]
+            return self.model.encode_image(img_tensor).cpu().numpy()
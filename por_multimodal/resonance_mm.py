@@ -1,9 +1,138 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
 import numpy as np
 
+
+_encoder = None
+_encoder_lock = threading.Lock()
+
+
+def get_encoder(model_name="ViT-B/32"):
+    """
+    Return the process-wide CLIP encoder, loading it on first use.
+    Loading CLIP is by far the slowest part of a comparison, so every
+    MultimodalResonance instance shares the same encoder.
+    """
+    global _encoder
+    if _encoder is None:
+        with _encoder_lock:
+            if _encoder is None:
+                from por_multimodal.clip_loader import CLIPLoader
+
+                _encoder = EmbeddingCache(CLIPLoader(model_name))
+    return _encoder
+
+
+class EmbeddingCache:
+    """
+    LRU cache of unit-normalised embeddings in front of an encoder.
+    Images are keyed by path + mtime + size, so an edited file is re-embedded.
+    """
+
+    def __init__(self, encoder, maxsize=4096):
+        self.encoder = encoder
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            vec = self._items.get(key)
+            if vec is not None:
+                self._items.move_to_end(key)
+            return vec
+
+    def _put(self, key, vec):
+        with self._lock:
+            self._items[key] = vec
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    @staticmethod
+    def _image_key(image_path):
+        st = os.stat(image_path)
+        return ("image", os.path.abspath(image_path), st.st_mtime_ns, st.st_size)
+
+    def texts(self, texts):
+        """Embed texts, encoding only the unique cache misses (in one batch)."""
+        return self._lookup([("text", t) for t in texts], texts, self.encoder.embed_texts)
+
+    def images(self, image_paths, errors=None):
+        """
+        Embed images, encoding only the unique cache misses (in one batch).
+        Given an `errors` dict, a missing or unreadable image is recorded
+        there by index instead of raising, and gets no row.
+        """
+        if errors is None:
+            keys = [self._image_key(p) for p in image_paths]
+            return self._lookup(keys, image_paths, self.encoder.embed_images)
+
+        readable = []
+        for i, path in enumerate(image_paths):
+            try:
+                readable.append((i, self._image_key(path)))
+            except OSError as e:
+                errors[i] = f"cannot read image: {e}"
+        try:
+            return self._lookup([k for _, k in readable], [image_paths[i] for i, _ in readable],
+                                self.encoder.embed_images)
+        except OSError:
+            pass
+
+        # Some image failed to decode: embed them one by one to find out which.
+        vecs, hits = [], []
+        for i, key in readable:
+            try:
+                vec, hit = self._lookup([key], [image_paths[i]], self.encoder.embed_images)
+            except OSError as e:
+                errors[i] = f"cannot read image: {e}"
+                continue
+            vecs.append(vec[0])
+            hits += hit
+        return (np.stack(vecs) if vecs else np.empty((0, 0), dtype=np.float32)), hits
+
+    def _lookup(self, keys, inputs, encode_batch):
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32), []
+        vecs = [self._get(k) for k in keys]
+        hits = [v is not None for v in vecs]
+
+        missing = OrderedDict()
+        for key, inp, vec in zip(keys, inputs, vecs):
+            if vec is None:
+                missing.setdefault(key, inp)
+
+        if missing:
+            encoded = _normalize(np.asarray(encode_batch(list(missing.values())), dtype=np.float32))
+            for key, vec in zip(missing, encoded):
+                # A copy, so a cached row does not keep the whole batch alive.
+                self._put(key, vec.copy())
+            fresh = dict(zip(missing, encoded))
+            vecs = [v if v is not None else fresh[k] for k, v in zip(keys, vecs)]
+
+        return np.stack(vecs), hits
+
+
+def _normalize(vecs):
+    norms = np.linalg.norm(vecs, axis=-1, keepdims=True)
+    return vecs / np.where(norms == 0, 1.0, norms)
+
+
 class MultimodalResonance:
-    def __init__(self, alpha=0.1, steps=150):
+    def __init__(self, alpha=0.1, steps=150, encoder=None):
         self.alpha = alpha
         self.steps = steps
+        self._encoder = encoder
+
+    @property
+    def encoder(self):
+        if self._encoder is None:
+            self._encoder = get_encoder()
+        return self._encoder
 
     def resonate(self, img_vec, txt_vec):
         img = img_vec.copy()
@@ -17,3 +146,75 @@ class MultimodalResonance:
             history.append(np.linalg.norm(img - txt))
 
         return img, txt, history
+
+    def distance_history(self, initial_distance):
+        """
+        Closed form of the `resonate` history.
+        Each step maps delta -> (1 - 2*alpha) * delta, so after step t the
+        distance is d0 * |1 - 2*alpha| ** t. Accepts a scalar or an array of d0.
+        """
+        rate = abs(1.0 - 2.0 * self.alpha)
+        decay = rate ** np.arange(1, self.steps + 1)
+        return np.multiply.outer(np.asarray(initial_distance, dtype=np.float64), decay)
+
+    def score(self, img_vecs, txt_vecs):
+        """
+        Resonance score in [0, 1] for unit-normalised embeddings:
+        1 - area under the distance history, relative to the history of a
+        maximally distant pair (d0 = 2).
+        """
+        d0 = np.linalg.norm(np.atleast_2d(img_vecs) - np.atleast_2d(txt_vecs), axis=-1)
+        history = self.distance_history(d0)
+        worst = self.distance_history(2.0).sum()
+        return 1.0 - history.sum(axis=-1) / worst, d0, history[:, -1]
+
+    def compare(self, image_path, text):
+        """
+        Score one image/text pair.
+        Returns the score plus timings (ms) for embedding and resonance.
+        """
+        batch = self.compare_batch([(image_path, text)])
+        result = batch["results"][0]
+        result["timings_ms"] = batch["timings_ms"]
+        return result
+
+    def compare_batch(self, pairs):
+        """
+        Score many (image_path, text) pairs.
+        Unique images and texts are embedded once, and all scores are
+        computed in one vectorised pass instead of running `resonate`.
+        A pair whose image is missing or unreadable gets an "error" instead
+        of a score.
+        """
+        image_paths = [p[0] for p in pairs]
+
+        t0 = time.perf_counter()
+        errors = {}
+        img_vecs, img_hits = self.encoder.images(image_paths, errors=errors)
+        ok = [i for i in range(len(pairs)) if i not in errors]
+        t1 = time.perf_counter()
+        txt_vecs, txt_hits = self.encoder.texts([pairs[i][1] for i in ok])
+        t2 = time.perf_counter()
+        if ok:
+            scores, d0, final = self.score(img_vecs, txt_vecs)
+        t3 = time.perf_counter()
+
+        results = [{"image_path": image_path, "text": text} for image_path, text in pairs]
+        for i, error in errors.items():
+            results[i]["error"] = error
+        for j, i in enumerate(ok):
+            results[i].update({
+                "score": float(scores[j]),
+                "initial_distance": float(d0[j]),
+                "final_distance": float(final[j]),
+                "cached": {"image": img_hits[j], "text": txt_hits[j]},
+            })
+        return {
+            "results": results,
+            "timings_ms": {
+                "embed_image": (t1 - t0) * 1000.0,
+                "embed_text": (t2 - t1) * 1000.0,
+                "resonance": (t3 - t2) * 1000.0,
+                "total": (t3 - t0) * 1000.0,
+            },
+        }
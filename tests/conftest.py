@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+# Keep the API's job store out of the working tree.
+os.environ.setdefault("POR_JOBS_DB", os.path.join(tempfile.mkdtemp(prefix="por-tests-"), "jobs.sqlite3"))
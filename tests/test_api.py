@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def test_batch_reports_invalid_items_per_item(client):
+    items = [
+        {"steps": 20, "chain_length": 16, "seed": 1},
+        {"steps": 20, "chain_length": 0, "seed": 2},
+        {"steps": 0, "chain_length": 16, "seed": 3},
+        {"steps": "many"},
+        {"steps": 20, "chain_length": 16, "seed": 4},
+    ]
+    r = client.post("/simulate/batch", json={"items": items})
+    assert r.status_code == 200
+    results = r.json()["results"]
+    assert [x["index"] for x in results] == list(range(len(items)))
+
+    for i in (0, 4):
+        assert results[i]["error"] is None
+        assert results[i]["result"]["stability"] is not None
+    for i in (1, 2, 3):
+        assert results[i]["result"] is None
+        assert results[i]["error"].startswith("invalid request")
+
+
+def test_invalid_items_are_not_cached(client):
+    item = {"steps": 20, "chain_length": 0, "seed": 5}
+    for _ in range(2):
+        results = client.post("/simulate/batch", json={"items": [item]}).json()["results"]
+        assert results[0]["result"] is None and results[0]["error"]
+
+
+def test_jobs_are_charged_to_the_client_budget(client, monkeypatch):
+    from app.api import scheduler
+
+    monkeypatch.setattr(scheduler, "client_rate", 1.0)
+    monkeypatch.setattr(scheduler, "client_burst", 10_000.0)
+    monkeypatch.setattr(scheduler, "job_backlog", 0.0)
+    monkeypatch.setattr(scheduler, "buckets", {})
+    job = {"steps": 100, "chain_length": 64, "seed": 11}
+    headers = {"X-Client-Id": "job-test"}
+
+    first = client.post("/jobs", json=job, headers=headers)
+    assert first.status_code == 202
+    # The same request is deduplicated to the queued job and not charged again.
+    again = client.post("/jobs", json=job, headers=headers)
+    assert again.status_code == 202 and again.json()["deduplicated"]
+    assert again.json()["id"] == first.json()["id"]
+
+    r = client.post("/jobs", json={**job, "seed": 12}, headers=headers)
+    assert r.status_code == 429
+    assert "Retry-After" in r.headers
+
+
+@pytest.mark.parametrize("route", ["submit_job", "cancel_job", "cancel_stream"])
+def test_loop_bound_routes_run_on_the_event_loop(route):
+    # These touch asyncio queues and tasks, which are not thread-safe; a
+    # sync route would run them on a threadpool thread.
+    import app.api
+
+    assert asyncio.iscoroutinefunction(getattr(app.api, route))
+
+
+def test_cancel_unknown_stream(client):
+    assert client.delete("/simulate/stream/nope").status_code == 404
+
+
+def test_coalesced_simulations_are_charged_once(monkeypatch):
+    import httpx
+
+    import app.api
+
+    charged = []
+
+    async def admit(client, cost):
+        charged.append(client)
+        return "interactive"
+
+    async def main():
+        release = asyncio.Event()
+
+        async def dispatch(cost, fn, *args, lane):
+            await release.wait()
+            return fn(*args)
+
+        monkeypatch.setattr(app.api.scheduler, "admit", admit)
+        monkeypatch.setattr(app.api, "dispatch", dispatch)
+        req = {"steps": 20, "chain_length": 16, "seed": 424242}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            first = asyncio.ensure_future(c.post("/simulate", json=req))
+            while not app.api.cache.pending(app.api.SimulateRequest(**req).cache_key()):
+                await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(c.post("/simulate", json=req))
+            await asyncio.sleep(0.05)
+            release.set()
+            return await first, await second
+
+    first, second = asyncio.run(main())
+    assert first.status_code == second.status_code == 200
+    assert [first.headers["X-Cache"], second.headers["X-Cache"]] == ["MISS", "COALESCED"]
+    assert len(charged) == 1
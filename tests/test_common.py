@@ -0,0 +1,64 @@
+import json
+
+import pytest
+
+from benchmarks.runners.common import JsonlWriter, completed_ids, iter_jsonl
+from benchmarks.runners.turnstore import compress_block, pack_row, unpack_row
+
+TASK_IDS = [f"t{i}" for i in range(8)]
+
+
+def row(task_id):
+    return {
+        "mode": "resonance",
+        "task_id": task_id,
+        "turns": [
+            {"step": 0, "input": "prompt", "a_output": task_id, "b_output": "echo"},
+            {"step": 1, "input": "echo", "a_output": "echo", "b_output": "echo"},
+        ],
+    }
+
+
+def resume(path, pack):
+    """What a runner does on --resume: skip finished ids, append the rest."""
+    done = completed_ids(path)
+    with JsonlWriter(path, append=True, fsync_every=2) as out:
+        for task_id in TASK_IDS:
+            if task_id not in done:
+                out.write(pack(row(task_id)))
+    return done
+
+
+@pytest.mark.parametrize("pack", [lambda r: r, pack_row], ids=["plain", "compact"])
+def test_resume_after_torn_line(tmp_path, pack):
+    path = tmp_path / "out.jsonl"
+    with JsonlWriter(path) as out:
+        for task_id in TASK_IDS[:5]:
+            out.write(pack(row(task_id)))
+    line = json.dumps(pack(row(TASK_IDS[5]))).encode("utf-8")
+    with open(path, "ab") as f:
+        f.write(line[: len(line) // 2])
+
+    assert resume(path, pack) == set(TASK_IDS[:5])
+    rows = list(iter_jsonl(path))
+    assert [r["task_id"] for r in rows] == TASK_IDS
+    assert [unpack_row(r) for r in rows] == [row(t) for t in TASK_IDS]
+
+
+def test_resume_compressed_compact_run_after_torn_block(tmp_path):
+    path = tmp_path / "out.jsonl.gz"
+    with JsonlWriter(path, fsync_every=2) as out:
+        for task_id in TASK_IDS[:5]:
+            out.write(pack_row(row(task_id)))
+    # The writer died while writing the block holding t5 and t6.
+    block = "".join(json.dumps(pack_row(row(t))) + "\n" for t in TASK_IDS[5:7])
+    torn = compress_block(block.encode("utf-8"), "gzip")
+    with open(path, "ab") as f:
+        f.write(torn[: len(torn) // 2])
+
+    assert resume(path, pack_row) == set(TASK_IDS[:5])
+    rows = list(iter_jsonl(path))
+    assert [r["task_id"] for r in rows] == TASK_IDS
+    assert all("texts" in r for r in rows)
+    assert [unpack_row(r) for r in rows] == [row(t) for t in TASK_IDS]
+    assert resume(path, pack_row) == set(TASK_IDS)
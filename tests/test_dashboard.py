@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app.dashboard as dashboard
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(dashboard.app) as c:
+        yield c
+
+
+def test_active_runs_are_capped(client, monkeypatch):
+    monkeypatch.setattr(dashboard, "RUNS_MAX_ACTIVE", 1)
+    first = client.post("/runs", json={"steps": 1_000_000, "chain_length": 64, "seed": 1})
+    assert first.status_code == 202
+    run_id = first.json()["run_id"]
+
+    second = client.post("/runs", json={"steps": 100, "chain_length": 16})
+    assert second.status_code == 429 and "Retry-After" in second.headers
+
+    assert client.delete(f"/runs/{run_id}").status_code == 200
+    for _ in range(100):
+        if client.get(f"/runs/{run_id}").json()["status"] == "cancelled":
+            break
+        time.sleep(0.05)
+    assert client.post("/runs", json={"steps": 10, "chain_length": 16}).status_code == 202
+
+
+def test_run_steps_are_bounded(client):
+    r = client.post("/runs", json={"steps": dashboard.CHART_MAX_STEPS + 1, "chain_length": 16})
+    assert r.status_code == 422
+
+
+def test_cancel_runs_on_the_event_loop():
+    assert asyncio.iscoroutinefunction(dashboard.cancel_run)
+
+
+def test_chart_chain_length_is_bounded(client):
+    r = client.get("/charts/locking.png", params={"chain_length": dashboard.CHART_MAX_CHAIN_LENGTH + 1})
+    assert r.status_code == 422
+    assert str(dashboard.CHART_MAX_CHAIN_LENGTH) in r.json()["detail"]
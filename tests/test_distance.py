@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from benchmarks.runners.distance import EmbeddingDistance, NgramEncoder
+
+TEXTS = ["The chain locks in phase.", "a", "", "ab", "Résonance ✓", "the chain locks in phase."]
+
+
+def ngram_count(text, ngrams=(2, 3, 4)):
+    padded = len(text) + 2
+    return sum(max(padded - n + 1, 0) for n in ngrams)
+
+
+def test_identical_strings_are_zero():
+    engine = EmbeddingDistance(NgramEncoder())
+    d = engine.distances(TEXTS, list(TEXTS))
+    assert np.array_equal(d, np.zeros(len(TEXTS)))
+
+
+def test_reversed_string_is_in_unit_interval():
+    engine = EmbeddingDistance(NgramEncoder())
+    texts = ["resonance benchmark", "ab", "phase locking of coupled oscillators"]
+    d = engine.distances(texts, [t[::-1] for t in texts])
+    assert np.all((d > 0) & (d <= 1))
+
+
+def test_ngrams_do_not_span_batched_texts():
+    encoder = NgramEncoder()
+    batched = encoder.embed_texts(TEXTS)
+    single = np.concatenate([encoder.embed_texts([t]) for t in TEXTS])
+    assert np.array_equal(batched, single)
+    assert batched.sum(axis=1).tolist() == [ngram_count(t) for t in TEXTS]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 1024])
+def test_distances_are_deterministic(batch_size):
+    a = ["alpha beta", "gamma", "alpha beta", "delta epsilon"]
+    b = ["alpha betas", "gamma ray", "zeta", "epsilon delta"]
+    first = EmbeddingDistance(NgramEncoder(), batch_size=batch_size).distances(a, b)
+    engine = EmbeddingDistance(NgramEncoder())
+    assert np.array_equal(engine.distances(a, b), first)
+    # Second call is served from the embedding cache.
+    assert np.array_equal(engine.distances(a, b), first)
@@ -0,0 +1,136 @@
+import json
+import random
+
+import pytest
+
+from benchmarks.runners.evaluate_por_score import evaluate, evaluate_files, evaluate_sharded
+from benchmarks.runners.joins import Unsorted, external_sort, merge_join, partition, sorted_rows
+
+CFG = {"weights": {"w1": 0.4, "w2": 0.3, "w3": 0.3}}
+
+
+def _write(path, rows):
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    return path
+
+
+def _res(task_id, steps=3, tag=""):
+    turns = [{"step": s, "input": f"{task_id} in {s}{tag}", "a_output": f"a {task_id} {s} " * (s + 1),
+              "b_output": f"b {task_id} {s}{tag}"} for s in range(steps)]
+    return {"mode": "resonance", "task_id": task_id, "model_pair": ["a", "b"], "steps": steps, "turns": turns}
+
+
+def _solo(task_id, score):
+    return {"mode": "solo", "task_id": task_id, "model_name": "a", "response": "x", "task_score": score}
+
+
+def _by_id(rows):
+    return {r["task_id"]: r for r in rows}
+
+
+@pytest.fixture
+def runs():
+    ids = [f"t{i:03d}" for i in range(40)]
+    res = [_res(t, steps=1 + i % 5) for i, t in enumerate(ids)]
+    # t005 has no solo row.
+    solo = [_solo(t, 0.25 + (i % 4) * 0.1) for i, t in enumerate(ids) if t != "t005"]
+    return res, solo
+
+
+# -- joins
+
+
+def test_sorted_rows_rejects_unsorted(tmp_path):
+    path = _write(tmp_path / "rows.jsonl", [{"task_id": "b"}, {"task_id": "a"}])
+    with pytest.raises(Unsorted):
+        list(sorted_rows(path))
+
+
+def test_external_sort_spills_and_keeps_file_order_for_equal_keys(tmp_path):
+    rows = [{"task_id": f"t{random.Random(i).randrange(10)}", "n": i} for i in range(50)]
+    path = _write(tmp_path / "rows.jsonl", rows)
+    out = [json.loads(line) for _, line in external_sort(path, str(tmp_path), chunk_rows=7)]
+    assert out == sorted(rows, key=lambda r: r["task_id"])
+    assert not list(tmp_path.glob("*.run"))
+
+
+def test_partition_is_stable_and_complete(tmp_path):
+    rows = [{"task_id": f"t{i}"} for i in range(30)]
+    path = _write(tmp_path / "rows.jsonl", rows + rows)
+    (buckets,) = partition([path], 3, tmp_path)
+    seen = []
+    for b in buckets:
+        ids = {json.loads(line)["task_id"] for line in b.read_text().splitlines()}
+        seen += ids
+    assert sorted(seen) == sorted(r["task_id"] for r in rows)
+
+
+def test_merge_join_left_outer_last_duplicate_wins():
+    left = [("a", "a1"), ("b", "b1"), ("b", "b2"), ("d", "d1")]
+    right = [("a", "A1"), ("a", "A2"), ("c", "C1"), ("d", "D1")]
+    assert list(merge_join(iter(left), iter(right))) == [("a", "a1", "A2"), ("b", "b2", None), ("d", "d1", "D1")]
+
+
+# -- evaluate_files
+
+
+def test_sorted_inputs_match_evaluate(tmp_path, runs):
+    res, solo = runs
+    out = tmp_path / "eval.jsonl"
+    n = evaluate_files(_write(tmp_path / "solo.jsonl", solo), _write(tmp_path / "res.jsonl", res), CFG, out,
+                       batch_size=7)
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert n == len(rows) == len(res)
+    assert [r["task_id"] for r in rows] == sorted(r["task_id"] for r in res)
+    assert _by_id(rows) == _by_id(evaluate(solo, res, CFG))
+    assert _by_id(rows)["t005"]["solo_score"] == 0 and _by_id(rows)["t005"]["por_gain"] == 0
+
+
+def test_unsorted_inputs_match_evaluate(tmp_path, runs):
+    res, solo = runs
+    random.Random(1).shuffle(res)
+    random.Random(2).shuffle(solo)
+    out = tmp_path / "eval.jsonl"
+    evaluate_files(_write(tmp_path / "solo.jsonl", solo), _write(tmp_path / "res.jsonl", res), CFG, out,
+                   tmp_dir=str(tmp_path), chunk_rows=6, batch_size=5)
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [r["task_id"] for r in rows] == sorted(r["task_id"] for r in res)
+    assert _by_id(rows) == _by_id(evaluate(solo, res, CFG))
+
+
+def test_sharded_inputs_match_evaluate(tmp_path, runs):
+    res, solo = runs
+    random.Random(3).shuffle(res)
+    out = tmp_path / "eval.jsonl"
+    n = evaluate_sharded(_write(tmp_path / "solo.jsonl", solo), _write(tmp_path / "res.jsonl", res), CFG, out,
+                         workers=3, tmp_dir=str(tmp_path))
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert n == len(rows) == len(res)
+    assert _by_id(rows) == _by_id(evaluate(solo, res, CFG))
+
+
+def test_duplicate_ids_resolve_to_the_last_row(tmp_path, runs):
+    res, solo = runs
+    res = res + [_res("t003", steps=2, tag=" again")]
+    solo = solo + [_solo("t003", 0.9)]
+    out = tmp_path / "eval.jsonl"
+    evaluate_files(_write(tmp_path / "solo.jsonl", solo), _write(tmp_path / "res.jsonl", res), CFG, out,
+                   tmp_dir=str(tmp_path), chunk_rows=6)
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert len(rows) == len({r["task_id"] for r in res})
+    assert _by_id(rows) == _by_id(evaluate(solo, res, CFG))
+    assert _by_id(rows)["t003"]["solo_score"] == 0.9
+
+
+def test_row_without_turns_is_reported_not_fatal(tmp_path, runs):
+    res, solo = runs
+    res[7]["turns"] = []
+    out = tmp_path / "eval.jsonl"
+    evaluate_files(_write(tmp_path / "solo.jsonl", solo), _write(tmp_path / "res.jsonl", res), CFG, out)
+    rows = _by_id(json.loads(line) for line in out.read_text().splitlines())
+    assert len(rows) == len(res)
+    empty = rows[res[7]["task_id"]]
+    assert empty["error"] and empty["harmonic_score"] is None and empty["drift_score"] is None
+    assert "error" not in rows[res[8]["task_id"]]
+    assert rows == _by_id(evaluate(solo, res, CFG))
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,87 @@
+import asyncio
+import os
+import pickle
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app import jobs as jobs_module
+from app.jobs import JobManager, JobStore
+from app.tasks import advance
+from por_core.config import PoRConfig
+from por_core.simulator import ResonanceSimulator
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+REQUEST = {"steps": 40, "chain_length": 16, "seed": 7, "noise_level": 0.01, "phase_strength": 0.1}
+
+
+def test_cancelled_job_checkpoints_last_finished_chunk(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs_module, "JOB_CHUNK_COST", 10 * REQUEST["chain_length"])
+    started = asyncio.Event()
+
+    async def dispatch(cost, fn, sim, *args):
+        if args[0] == 0:
+            return fn(sim, *args)
+        # An inline chunk that advanced the shared simulator before being cancelled.
+        sim.run_iterations(3)
+        started.set()
+        await asyncio.Event().wait()
+
+    async def main():
+        manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), dispatch, workers=1)
+        job_id, _ = manager.submit(REQUEST, None)
+        manager.start()
+        await started.wait()
+        await manager.stop()
+        return JobStore(str(tmp_path / "jobs.sqlite3")).get(job_id)
+
+    row = asyncio.run(main())
+    assert row["steps_done"] == 10
+
+    config = PoRConfig(chain_length=16, noise_level=0.01, phase_strength=0.1)
+    expected, _ = advance(ResonanceSimulator(seed=7, config=config), 0, 10, 40, 40)
+    np.testing.assert_array_equal(pickle.loads(row["checkpoint"]).chain, expected.chain)
+
+
+def test_importing_the_api_does_not_open_the_job_store(tmp_path):
+    env = {**os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    env.pop("POR_JOBS_DB", None)
+    subprocess.run([sys.executable, "-c", "import app.api"], cwd=tmp_path, env=env, check=True)
+    assert not (tmp_path / ".por").exists()
+
+
+def test_identical_submissions_create_and_admit_one_job(tmp_path):
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), dispatch=None)
+    admitted = []
+
+    def admit():
+        time.sleep(0.05)  # widen the race window
+        admitted.append(1)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(manager.submit(REQUEST, "same", admit)))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len({job_id for job_id, _ in results}) == 1
+    assert sorted(dedup for _, dedup in results) == [False, True, True, True]
+    assert len(admitted) == 1
+
+
+def test_refused_submission_creates_no_job(tmp_path):
+    manager = JobManager(JobStore(str(tmp_path / "jobs.sqlite3")), dispatch=None)
+
+    def refuse():
+        raise RuntimeError("over budget")
+
+    with pytest.raises(RuntimeError):
+        manager.submit(REQUEST, "key", refuse)
+    assert manager.store.counts() == {}
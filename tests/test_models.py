@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+
+from benchmarks.runners.models import Completion, DummyClient, ModelError, Models, OpenAIChatClient
+from benchmarks.runners.response_cache import ResponseCache
+
+
+class FakeHttp:
+    """Answers every request with one canned (status, body)."""
+
+    def __init__(self, body: bytes, status: int = 200):
+        self.status, self.body = status, body
+
+    async def request(self, method, path, body=b"", headers=None, on_data=None, on_start=None):
+        if on_start is not None:
+            on_start()
+        if on_data is not None:
+            on_data(self.body)
+        return self.status, self.body
+
+    async def close(self):
+        pass
+
+
+def _client(body: bytes) -> OpenAIChatClient:
+    client = OpenAIChatClient("http://127.0.0.1:1", stream=True)
+    client.http = FakeHttp(body)
+    return client
+
+
+def _sse(*events) -> bytes:
+    return "".join(f"data: {json.dumps(e)}\n\n" for e in events).encode() + b"data: [DONE]\n\n"
+
+
+def test_streamed_events():
+    body = _sse({"choices": [{"delta": {"content": "Hel"}}]}, {"choices": [{"delta": {"content": "lo"}}]},
+                {"choices": [], "usage": {"prompt_tokens": 3, "completion_tokens": 2}})
+    result = asyncio.run(_client(body).complete("m", "hi"))
+    assert (result.text, result.prompt_tokens, result.completion_tokens) == ("Hello", 3, 2)
+    assert result.ttft is not None
+
+
+def test_stream_ignored_by_endpoint_falls_back_to_json():
+    body = json.dumps({"choices": [{"message": {"content": "Hello"}}], "usage": {"prompt_tokens": 3}}).encode()
+    result = asyncio.run(_client(body).complete("m", "hi"))
+    assert (result.text, result.prompt_tokens) == ("Hello", 3)
+
+
+def test_unparseable_stream_is_a_model_error():
+    with pytest.raises(ModelError):
+        asyncio.run(_client(b'{"error": "nope"}').complete("m", "hi"))
+
+
+def test_empty_answers_are_not_cached(tmp_path):
+    class Empty(DummyClient):
+        async def complete(self, model, prompt, temperature=None, max_tokens=None):
+            return Completion("")
+
+    cache = ResponseCache(str(tmp_path / "responses.sqlite"))
+    models = Models({}, Empty(lambda prompt, model: ""), cache=cache)
+    assert asyncio.run(models.complete("m", "hi")) == ""
+    assert cache.stats()["writes"] == 0
@@ -0,0 +1,80 @@
+import hashlib
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from por_multimodal.resonance_mm import EmbeddingCache, MultimodalResonance
+
+
+def _vec(data: bytes):
+    return np.frombuffer(hashlib.sha256(data).digest(), dtype=np.uint8).astype(np.float32)
+
+
+class FakeEncoder:
+    """Embeds by hashing; an image file holding b"bad" fails to decode."""
+
+    def embed_texts(self, texts):
+        return np.stack([_vec(t.encode()) for t in texts])
+
+    def embed_images(self, image_paths):
+        vecs = []
+        for path in image_paths:
+            with open(path, "rb") as f:
+                data = f.read()
+            if data == b"bad":
+                raise OSError(f"cannot identify image file {path!r}")
+            vecs.append(_vec(data))
+        return np.stack(vecs)
+
+
+@pytest.fixture
+def mm():
+    return MultimodalResonance(encoder=EmbeddingCache(FakeEncoder()))
+
+
+def test_empty_batch(mm):
+    batch = mm.compare_batch([])
+    assert batch["results"] == []
+    assert set(batch["timings_ms"]) == {"embed_image", "embed_text", "resonance", "total"}
+
+
+def test_bad_images_fail_per_item(mm, tmp_path):
+    cat, dog, bad = tmp_path / "cat.png", tmp_path / "dog.png", tmp_path / "bad.png"
+    cat.write_bytes(b"cat")
+    dog.write_bytes(b"dog")
+    bad.write_bytes(b"bad")
+    pairs = [(str(cat), "a cat"), (str(tmp_path / "missing.png"), "a cat"), (str(bad), "a cat"), (str(dog), "a dog")]
+
+    results = mm.compare_batch(pairs)["results"]
+    assert [r["image_path"] for r in results] == [p for p, _ in pairs]
+    assert "cannot read image" in results[1]["error"] and "score" not in results[1]
+    assert "cannot read image" in results[2]["error"] and "score" not in results[2]
+
+    alone = mm.compare_batch([pairs[0], pairs[3]])["results"]
+    for got, want in zip([results[0], results[3]], alone):
+        assert "error" not in got
+        assert got["score"] == pytest.approx(want["score"])
+
+
+def test_all_images_missing(mm, tmp_path):
+    results = mm.compare_batch([(str(tmp_path / "missing.png"), "a cat")])["results"]
+    assert "error" in results[0]
+
+
+def test_api_batch_limits(mm, monkeypatch):
+    import app.api
+
+    monkeypatch.setattr(app.api, "MultimodalResonance", MultimodalResonance)
+    monkeypatch.setattr(app.api, "_mm", mm)
+    monkeypatch.setattr(app.api, "BATCH_MAX_ITEMS", 2)
+    client = TestClient(app.api.app)
+
+    r = client.post("/multimodal/batch", json={"items": []})
+    assert r.status_code == 200 and r.json()["results"] == []
+
+    items = [{"image_path": "missing.png", "text": "a cat"}] * 3
+    assert client.post("/multimodal/batch", json={"items": items}).status_code == 413
+    r = client.post("/multimodal/batch", json={"items": items[:2]})
+    assert r.status_code == 200
+    assert all("error" in x for x in r.json()["results"])
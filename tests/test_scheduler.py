@@ -0,0 +1,30 @@
+import pytest
+
+from app.scheduler import CostScheduler, OverBudget
+
+
+def test_jobs_are_charged_to_the_client_budget():
+    scheduler = CostScheduler(client_rate=100.0, client_burst=1000.0, job_backlog=10.0)
+    # Burst plus ten seconds of refill may be queued at once...
+    scheduler.admit_job("a", 1500)
+    scheduler.admit_job("a", 500)
+    # ...and beyond that the client is told when to come back.
+    with pytest.raises(OverBudget) as e:
+        scheduler.admit_job("a", 500)
+    assert e.value.retry_after == 5
+    # Budgets are per client.
+    scheduler.admit_job("b", 2000)
+
+
+def test_job_larger_than_the_backlog_never_fits():
+    scheduler = CostScheduler(client_rate=100.0, client_burst=1000.0, job_backlog=10.0)
+    with pytest.raises(OverBudget) as e:
+        scheduler.admit_job("a", 2001)
+    assert e.value.retry_after is None
+    assert "/jobs" not in str(e.value)
+
+
+def test_jobs_are_free_without_budgets():
+    scheduler = CostScheduler()
+    scheduler.admit_job("a", 10**12)
+    assert scheduler.admitted["bulk"] == 1
@@ -0,0 +1,21 @@
+import json
+
+from benchmarks.runners.common import iter_jsonl, load_config, load_tasks
+from benchmarks.runners.suite import DEFAULT_CONFIGS, run_suite
+
+
+def test_suite_runs_and_scores_every_pair(tmp_path):
+    config = DEFAULT_CONFIGS[0]
+    cfg = load_config(config)
+    tasks = load_tasks(cfg)
+    summary = run_suite([config], tmp_path, workers=4)
+
+    track_dir = tmp_path / cfg["track"]
+    for model in cfg["models"]["solo"]:
+        assert len(list(iter_jsonl(track_dir / f"solo_{model['name']}.jsonl"))) == len(tasks)
+    for a, b in cfg["models"]["multi_pairs"]:
+        rows = list(iter_jsonl(track_dir / f"eval_{a}_{b}.jsonl"))
+        assert sorted(r["task_id"] for r in rows) == sorted(t["id"] for t in tasks)
+
+    assert [r["pair"] for r in summary["results"]] == [list(p) for p in cfg["models"]["multi_pairs"]]
+    assert json.loads((tmp_path / "summary.json").read_text()) == summary
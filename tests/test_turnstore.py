@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from benchmarks.runners import turnstore
+from benchmarks.runners.common import JsonlWriter
+from benchmarks.runners.turnstore import compress_block, iter_lines, iter_rows, pack_row, recover, turns, unpack_row
+
+
+def resonance_row(outputs):
+    """A plain resonance row whose turn inputs chain through the b_outputs."""
+    rows, prev = [], "prompt"
+    for step, (a, b) in enumerate(outputs):
+        rows.append({"step": step, "input": prev, "a_output": a, "b_output": b})
+        prev = b
+    return {"mode": "resonance", "task_id": "t1", "turns": rows}
+
+
+def test_pack_round_trip_with_repeated_texts():
+    # A and B settle into echoing each other, so most texts repeat.
+    row = resonance_row([("A1", "B1"), ("same", "same"), ("same", "same"), ("prompt", "B1")])
+    packed = pack_row(row)
+
+    assert packed["texts"] == ["prompt", "A1", "B1", "same"]
+    assert packed["turns"] == [[0, 1, 2], [2, 3, 3], [3, 3, 3], [3, 0, 2]]
+    assert list(turns(packed)) == list(turns(row))
+    assert unpack_row(json.loads(json.dumps(packed))) == row
+    assert unpack_row(row) is row
+
+
+def test_iter_lines_spans_blocks(tmp_path, monkeypatch):
+    # A tiny read size makes blocks straddle read chunks as well.
+    monkeypatch.setattr(turnstore, "_READ_SIZE", 7)
+    path = tmp_path / "out.jsonl.gz"
+    rows = [{"task_id": f"t{i}", "n": i} for i in range(10)]
+    with JsonlWriter(path, fsync_every=3) as w:
+        for r in rows:
+            w.write(r)
+
+    assert len(list(turnstore.iter_blocks(path))) == 4
+    assert [json.loads(line) for line in iter_lines(path)] == rows
+    assert list(iter_rows(path)) == rows
+
+
+def test_recover_cuts_torn_gzip_member(tmp_path):
+    path = tmp_path / "out.jsonl.gz"
+    blocks = [b'{"task_id": "a"}\n{"task_id": "b"}\n', b'{"task_id": "c"}\n']
+    complete = b"".join(compress_block(b, "gzip") for b in blocks)
+    torn = compress_block(b'{"task_id": "d"}\n{"task_id": "e"}\n', "gzip")
+    path.write_bytes(complete + torn[: len(torn) // 2])
+
+    lines = recover(path)
+
+    assert [json.loads(line)["task_id"] for line in lines] == ["a", "b", "c"]
+    assert path.read_bytes() == complete
+    assert recover(path) == lines
+
+
+@pytest.mark.parametrize("cut", [1, 10])
+def test_recover_drops_member_torn_in_header(tmp_path, cut):
+    path = tmp_path / "out.jsonl.gz"
+    complete = compress_block(b'{"task_id": "a"}\n', "gzip")
+    path.write_bytes(complete + compress_block(b'{"task_id": "b"}\n', "gzip")[:cut])
+
+    assert [json.loads(line)["task_id"] for line in recover(path)] == ["a"]
+    assert path.read_bytes() == complete
@@ -0,0 +1,13 @@
+from docs.visuals import generate_all_por_visuals as visuals
+
+TRAJECTORY = {"steps": 20, "chain_length": 8, "seed": 0, "noise_level": 0.01, "phase_strength": 0.1}
+
+
+def test_engine_code_changes_invalidate_figures_and_trajectories(tmp_path, monkeypatch):
+    inputs = visuals.task_inputs("stabilization", TRAJECTORY, 50)
+    first = visuals.record_trajectory(TRAJECTORY, tmp_path)
+    assert visuals.record_trajectory(TRAJECTORY, tmp_path) == first
+
+    monkeypatch.setattr(visuals, "code_digest", lambda: "edited")
+    assert visuals.task_inputs("stabilization", TRAJECTORY, 50) != inputs
+    assert visuals.record_trajectory(TRAJECTORY, tmp_path) != first